@@ -0,0 +1,73 @@
+"""
+Benchmark calendar invite generation against the previous icalendar path
+
+Run from the project root:
+    python -m benchmarks.bench_ics --count 5000
+"""
+import argparse
+import time
+import uuid
+from datetime import datetime, timedelta
+from icalendar import Calendar, Event
+from utils import calendar_utils
+from utils.calendar_utils import create_calendar_invite, create_invite_description
+from benchmarks.synthetic import COACH_INFO, make_bookings
+
+def create_calendar_invite_icalendar(booking_info, coach_info):
+    """The original invite builder: a full icalendar object graph per booking"""
+    cal = Calendar()
+    cal.add('prodid', '-//Pitching Lessons Scheduler//mxm.dk//')
+    cal.add('version', '2.0')
+
+    event = Event()
+    event.add('summary', f'Pitching Lesson with {coach_info["name"]}')
+    event.add('dtstart', booking_info['datetime'])
+    event.add('dtend', booking_info['datetime'] + timedelta(hours=1))
+    event.add('dtstamp', datetime.now())
+    event.add('uid', str(uuid.uuid4()))
+    event.add('description', create_invite_description(booking_info, coach_info))
+    event.add('location', 'Pitching Facility')
+
+    cal.add_component(event)
+    return cal.to_ical()
+
+def time_invites(builder, bookings):
+    """Return seconds taken to build an invite for every booking"""
+    started = time.perf_counter()
+    for booking in bookings:
+        builder(booking, COACH_INFO)
+    return time.perf_counter() - started
+
+def check_valid(bookings):
+    """Parse template output with icalendar to confirm it round-trips"""
+    for booking in bookings:
+        event = Calendar.from_ical(create_calendar_invite(booking, COACH_INFO)).walk('VEVENT')[0]
+        assert str(event['uid']) == f"{booking['booking_id']}@pitching-lessons"
+        assert event['dtstart'].dt == booking['datetime']
+        assert str(event['description']) == create_invite_description(booking, COACH_INFO)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=5000, help="number of bookings")
+    args = parser.parse_args()
+
+    bookings = make_bookings(args.count)
+    check_valid(bookings[:100])
+
+    calendar_utils._invite_cache.clear()
+    calendar_utils._invite_cache.maxsize = max(args.count, calendar_utils._invite_cache.maxsize)
+
+    results = [
+        ('icalendar (previous)', time_invites(create_calendar_invite_icalendar, bookings)),
+        ('template, cold cache', time_invites(create_calendar_invite, bookings)),
+        ('template, warm cache', time_invites(create_calendar_invite, bookings)),
+    ]
+
+    baseline = results[0][1]
+    print(f"{args.count} invites")
+    for label, seconds in results:
+        per_invite = seconds / args.count * 1e6
+        print(f"  {label:<22} {seconds:8.3f}s  {per_invite:8.1f} us/invite  {baseline / seconds:6.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Measure the memory each in-memory booking representation costs per booking
+
+Run from the project root:
+    python -m benchmarks.bench_memory
+    python -m benchmarks.bench_memory --count 100000 --output memory.json
+
+Loads seeded synthetic bookings into a temporary SQLite store, then reads
+them all back three ways and records the bytes each one keeps alive
+(traced with tracemalloc):
+    dict            one dict per booking with a datetime, as rows used to be read
+    Booking         slotted records with epoch-minute times and interned levels
+    BookingColumns  array-backed, dictionary-encoded columns
+"""
+import argparse
+import gc
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from utils.booking_record import BOOKING_FIELDS, BookingColumns
+from utils.booking_store import BookingStore, _ALL_BOOKINGS_SQL
+from benchmarks.synthetic import make_bookings
+
+def dict_row(row):
+    """Convert a bookings row the way the store did before Booking records"""
+    booking = dict(zip(BOOKING_FIELDS, row))
+    booking['datetime'] = datetime.fromisoformat(booking['datetime'])
+    return booking
+
+def traced(build):
+    """Run build(), returning its result, the bytes it keeps alive, its peak bytes and seconds taken"""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - started
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, retained, peak, seconds
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=1000000, help="number of bookings")
+    parser.add_argument('--seed', type=int, default=0, help="seed for the synthetic bookings")
+    parser.add_argument('--output', help="write the results as JSON to this path")
+    args = parser.parse_args()
+
+    db_dir = tempfile.mkdtemp(prefix='pitching_memory_')
+    try:
+        store = BookingStore(os.path.join(db_dir, 'bookings.db'))
+        store.bulk_add_bookings(make_bookings(args.count, seed=args.seed), notify=False)
+
+        # (name, build) pairs; each build reads every booking back from the store
+        representations = [
+            ('dict', lambda: [dict_row(row) for row in store._conn.execute(_ALL_BOOKINGS_SQL)]),
+            ('Booking', lambda: list(store.iter_bookings())),
+            ('BookingColumns', lambda: BookingColumns(store.iter_bookings())),
+        ]
+        results = []
+        for name, build in representations:
+            bookings, retained, peak, seconds = traced(build)
+            results.append({
+                'name': name,
+                'count': len(bookings),
+                'bytes_per_booking': retained / len(bookings),
+                'peak_bytes_per_booking': peak / len(bookings),
+                'total_mb': retained / 2 ** 20,
+                'build_seconds': seconds
+            })
+            if name == 'dict':
+                shallow = sys.getsizeof(bookings[0])
+            elif name == 'Booking':
+                shallow_record = sys.getsizeof(bookings[0])
+            del bookings
+        store.close()
+    finally:
+        shutil.rmtree(db_dir, ignore_errors=True)
+
+    baseline = results[0]['bytes_per_booking']
+    print(f"{args.count} bookings (shallow size: dict {shallow} B, Booking {shallow_record} B)")
+    print(f"{'representation':<16} {'bytes/booking':>14} {'peak/booking':>13} {'total MB':>9} {'build s':>8} {'vs dict':>8}")
+    for record in results:
+        print(
+            f"{record['name']:<16} {record['bytes_per_booking']:>14.1f} {record['peak_bytes_per_booking']:>13.1f} "
+            f"{record['total_mb']:>9.1f} {record['build_seconds']:>8.2f} {baseline / record['bytes_per_booking']:>7.1f}x"
+        )
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump({'count': args.count, 'seed': args.seed, 'results': results}, output_file, indent=2)
+        print(f"Saved {args.output}")
+
+if __name__ == '__main__':
+    main()
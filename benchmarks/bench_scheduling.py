@@ -0,0 +1,160 @@
+"""
+Benchmark the calendar and scheduling hot paths at increasing booking counts
+
+Run from the project root:
+    python -m benchmarks.bench_scheduling
+    python -m benchmarks.bench_scheduling --sizes 1000,100000 --compare benchmarks/results/scheduling-abc1234.json
+
+Each benchmark runs a fixed batch of operations for several rounds and
+records the fastest and median time per operation. Results are written as
+JSON (by default to benchmarks/results/scheduling-<commit>.json) so runs on
+different commits can be compared with --compare.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime, timedelta
+from statistics import median
+from utils import calendar_utils
+from utils.availability_rules import compile_availability
+from utils.calendar_utils import (
+    create_calendar_invite, format_booking_summary, get_available_slots, get_slot_capacity_info,
+    get_upcoming_bookings, is_slot_available
+)
+from utils.intervals import LessonIntervals
+from config.settings import default_weekly_availability
+from benchmarks.synthetic import COACH_INFO, make_bookings
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+def git_commit():
+    """Get the short hash of the checked-out commit, or None outside a git checkout"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def measure(operation, items, rounds, before_round=None):
+    """Time operation(item) over every item for each round, returning per-op seconds per round"""
+    timings = []
+    for _ in range(rounds):
+        if before_round:
+            before_round()
+        started = time.perf_counter()
+        for item in items:
+            operation(item)
+        timings.append((time.perf_counter() - started) / len(items))
+    return timings
+
+def benchmark_size(size, seed, rounds, sample):
+    """Run every benchmark against size bookings and return their result records"""
+    rng = random.Random(seed)
+    bookings = make_bookings(size, seed=seed)
+    availability = compile_availability(default_weekly_availability())
+
+    started = time.perf_counter()
+    lessons = LessonIntervals.from_bookings(bookings)
+    index_seconds = time.perf_counter() - started
+
+    # Query points drawn from the same year the bookings cover
+    start = bookings[0]['datetime'].date()
+    dates = [start + timedelta(days=rng.randrange(365)) for _ in range(sample)]
+    moments = [
+        (day, datetime.min.replace(hour=rng.randrange(8, 20), minute=rng.choice([0, 15, 30, 45])).time())
+        for day in dates
+    ]
+    booking_sample = rng.sample(bookings, min(sample, size))
+
+    def create_invite(booking):
+        return create_calendar_invite(booking, COACH_INFO)
+
+    # (name, operation, items, setup before each round)
+    benchmarks = [
+        ('get_available_slots', lambda day: get_available_slots(day, availability, lessons), dates, None),
+        ('is_slot_available', lambda moment: is_slot_available(*moment, lessons), moments, None),
+        ('get_slot_capacity_info', lambda moment: get_slot_capacity_info(*moment, lessons), moments, None),
+        ('get_upcoming_bookings', lambda days_ahead: get_upcoming_bookings(bookings, days_ahead), [7] * 5, None),
+        ('format_booking_summary', format_booking_summary, booking_sample, None),
+        ('create_calendar_invite (cold)', create_invite, booking_sample, calendar_utils._invite_cache.clear),
+        ('create_calendar_invite (warm)', create_invite, booking_sample, None),
+    ]
+
+    results = [{
+        'name': 'LessonIntervals.from_bookings',
+        'size': size,
+        'ops': 1,
+        'per_op_us_min': index_seconds * 1e6,
+        'per_op_us_median': index_seconds * 1e6
+    }]
+    calendar_utils._invite_cache.maxsize = max(len(booking_sample), calendar_utils._invite_cache.maxsize)
+    for name, operation, items, before_round in benchmarks:
+        timings = measure(operation, items, rounds, before_round)
+        results.append({
+            'name': name,
+            'size': size,
+            'ops': len(items),
+            'per_op_us_min': min(timings) * 1e6,
+            'per_op_us_median': median(timings) * 1e6
+        })
+    return results
+
+def load_results(path):
+    """Load a saved results file keyed by (name, size)"""
+    with open(path, encoding='utf-8') as results_file:
+        saved = json.load(results_file)
+    return {(record['name'], record['size']): record for record in saved['results']}
+
+def print_results(results, baseline=None):
+    """Print a results table, with the change against a baseline run if given"""
+    print(f"{'benchmark':<32} {'bookings':>9} {'min us/op':>12} {'median us/op':>13}" + ("   vs baseline" if baseline else ""))
+    for record in results:
+        line = f"{record['name']:<32} {record['size']:>9} {record['per_op_us_min']:>12.2f} {record['per_op_us_median']:>13.2f}"
+        previous = baseline.get((record['name'], record['size'])) if baseline else None
+        if previous:
+            line += f"   {record['per_op_us_min'] / previous['per_op_us_min']:6.2f}x"
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help="comma-separated booking counts")
+    parser.add_argument('--seed', type=int, default=0, help="seed for the synthetic bookings and queries")
+    parser.add_argument('--rounds', type=int, default=5, help="timed rounds per benchmark")
+    parser.add_argument('--sample', type=int, default=2000, help="operations per round")
+    parser.add_argument('--output', help="results JSON path (default: benchmarks/results/scheduling-<commit>.json)")
+    parser.add_argument('--compare', help="earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    results = []
+    for size in (int(size) for size in args.sizes.split(',')):
+        results.extend(benchmark_size(size, args.seed, args.rounds, args.sample))
+
+    print_results(results, load_results(args.compare) if args.compare else None)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"scheduling-{commit or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as output_file:
+        json.dump({
+            'meta': {
+                'commit': commit,
+                'created_at': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'seed': args.seed,
+                'rounds': args.rounds,
+                'sample': args.sample
+            },
+            'results': results
+        }, output_file, indent=2)
+    print(f"Saved {output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+"""
+Simulate many parents booking at once by driving concurrent AppTest sessions
+
+Run from the project root:
+    python -m benchmarks.load_test --sessions 50
+    python -m benchmarks.load_test --sessions 100 --workers 10 --history 100000 --date-spread 2 --durations 60:2,90:1,120:1
+
+Each session opens main.py, picks a coach, a date and a lesson length,
+chooses one of the offered times, fills in the contact form and confirms.
+Sessions are spread over worker processes that all book against one
+SQLite database, since AppTest can only run one script at a time per
+process. Within a worker, sessions take turns one script run at a time,
+so every session is mid-booking at once as on registration night.
+
+Reports p50/p95/p99 script-run latency, throughput, booking outcomes and
+any coach and moment that ended up over capacity. AppTest always reruns
+the whole script, so latencies are an upper bound on what fragment reruns
+cost in a browser.
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from benchmarks.synthetic import make_bookings
+
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main.py')
+
+def parse_mix(text):
+    """Parse '60:3,90:1' into ([60, 90], [3, 1]) choices and weights"""
+    choices, weights = [], []
+    for part in text.split(','):
+        value, _, weight = part.partition(':')
+        choices.append(int(value))
+        weights.append(float(weight or 1))
+    return choices, weights
+
+def percentile(values, fraction):
+    """Get the nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+def widget(widgets, label):
+    """Find a widget by its label, or None if it is not on the page"""
+    return next((item for item in widgets if item.label == label), None)
+
+def booking_steps(number, options):
+    """
+    Yield once after queueing each interaction of one parent's booking
+    The caller runs the script between steps; the final value sent back
+    is the outcome.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(options['seed'] * 100003 + number)
+    at = AppTest.from_file(MAIN_SCRIPT, default_timeout=options['timeout'])
+    yield at
+
+    # Any coach, or one of the specific coaches
+    coach_picker = widget(at.selectbox, "Coach:")
+    if rng.random() >= options['any_coach_share'] and len(coach_picker.options) > 1:
+        coach_picker.select_index(rng.randrange(1, len(coach_picker.options)))
+        yield at
+
+    at.date_input[0].set_value(datetime.now().date() + timedelta(days=1 + rng.randrange(options['date_spread'])))
+    yield at
+
+    widget(at.selectbox, "Lesson length:").set_value(rng.choices(*options['durations'])[0])
+    yield at
+
+    time_picker = widget(at.selectbox, "Choose a time:")
+    if time_picker is None:
+        return 'no_slots'
+    time_picker.select_index(rng.randrange(min(len(time_picker.options), options['popular_slots'])))
+    yield at
+
+    at.text_input(key="contact_name").set_value(f"Load Parent {number}")
+    at.text_input(key="contact_email").set_value(f"parent{number}@example.com")
+    at.text_input(key="contact_phone").set_value("(555) 010-0000")
+    yield at
+
+    next(button for button in at.button if 'Confirm Booking' in button.label).click()
+    yield at
+    if any('Booking confirmed' in message.value for message in at.success):
+        return 'booked'
+    if any('just filled up' in message.value for message in at.error):
+        return 'slot_full'
+    return 'not_confirmed'
+
+def run_worker(session_numbers, options, start_barrier, results):
+    """Interleave several sessions' script runs in one process, reporting latencies and outcomes"""
+    latencies = []
+    outcomes = []
+    sessions = [booking_steps(number, options) for number in session_numbers]
+
+    # Simulated email delivery prints to stdout; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        pending = [(session, next(session)) for session in sessions]
+        start_barrier.wait()
+        started = time.time()
+        while pending:
+            still_running = []
+            for session, at in pending:
+                try:
+                    run_started = time.perf_counter()
+                    at.run()
+                    latencies.append(time.perf_counter() - run_started)
+                    if at.exception:
+                        raise RuntimeError(at.exception[0].value)
+                    still_running.append((session, next(session)))
+                except StopIteration as stop:
+                    outcomes.append(stop.value)
+                except Exception as e:
+                    outcomes.append(f"error: {e}")
+            pending = still_running
+        finished = time.time()
+
+    results.put({'latencies': latencies, 'outcomes': outcomes, 'started': started, 'finished': finished})
+
+def find_overbooked(store, max_slots_per_time, start, end):
+    """Get (coach_id, moment, count) for every moment in [start, end) over capacity"""
+    from utils.intervals import LessonIntervals, booking_end
+
+    lessons_by_coach = {}
+    for booking in store.bookings_between(start, end):
+        lessons_by_coach.setdefault(booking['coach_id'], []).append((booking['datetime'], booking_end(booking)))
+
+    overbooked = []
+    for coach_id, ranges in lessons_by_coach.items():
+        intervals = LessonIntervals.from_ranges(ranges)
+        # Concurrency can only rise at a lesson start
+        for lesson_start in sorted({lesson_start for lesson_start, _ in ranges}):
+            count = intervals.active_at(lesson_start)
+            if count > max_slots_per_time:
+                overbooked.append((coach_id, lesson_start.isoformat(), count))
+    return overbooked
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=50, help="number of simulated parents")
+    parser.add_argument('--workers', type=int, default=4, help="worker processes the sessions are spread over")
+    parser.add_argument('--history', type=int, default=1000, help="past bookings loaded before the run")
+    parser.add_argument('--date-spread', type=int, default=3, help="sessions book within this many days from tomorrow")
+    parser.add_argument('--popular-slots', type=int, default=3, help="sessions pick among the first N offered times")
+    parser.add_argument('--durations', default='60:3,90:1,120:1', help="lesson length mix as minutes:weight")
+    parser.add_argument('--any-coach-share', type=float, default=0.5, help="share of sessions searching every coach")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=60, help="seconds allowed per script run")
+    parser.add_argument('--output', help="write the report as JSON to this path")
+    args = parser.parse_args()
+
+    # Every worker books against one fresh database; workers inherit the path
+    db_dir = tempfile.mkdtemp(prefix='pitching_load_')
+    os.environ['BOOKINGS_DB_PATH'] = os.path.join(db_dir, 'bookings.db')
+    from config.settings import DEFAULT_COACH_ID, APP_SETTINGS
+    from utils.booking_store import BookingStore
+
+    durations = parse_mix(args.durations)
+    unknown = set(durations[0]) - set(APP_SETTINGS['lesson_durations_minutes'])
+    if unknown:
+        parser.error(f"lesson lengths must be among {APP_SETTINGS['lesson_durations_minutes']}, not {sorted(unknown)}")
+
+    store = BookingStore(os.environ['BOOKINGS_DB_PATH'])
+    today = datetime.combine(datetime.now().date(), datetime.min.time())
+    if args.history:
+        store.bulk_add_bookings(
+            make_bookings(args.history, seed=args.seed, start=today - timedelta(days=365), coach_ids=[DEFAULT_COACH_ID]),
+            notify=False
+        )
+
+    options = {
+        'seed': args.seed,
+        'timeout': args.timeout,
+        'any_coach_share': args.any_coach_share,
+        'date_spread': args.date_spread,
+        'popular_slots': args.popular_slots,
+        'durations': durations
+    }
+    workers = max(1, min(args.workers, args.sessions))
+    context = multiprocessing.get_context('spawn')
+    start_barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=run_worker, args=(range(worker, args.sessions, workers), options, start_barrier, results))
+        for worker in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    latencies = [latency for report in reports for latency in report['latencies']]
+    elapsed = max(report['finished'] for report in reports) - min(report['started'] for report in reports)
+    counts = {}
+    for report in reports:
+        for outcome in report['outcomes']:
+            counts[outcome] = counts.get(outcome, 0) + 1
+
+    max_slots_per_time = APP_SETTINGS['max_students_per_slot']
+    overbooked = find_overbooked(store, max_slots_per_time, today, today + timedelta(days=args.date_spread + 2))
+    store.close()
+
+    report = {
+        'sessions': args.sessions,
+        'workers': workers,
+        'history': args.history,
+        'script_runs': len(latencies),
+        'latency_ms': {
+            label: round(percentile(latencies, fraction) * 1000, 1) if latencies else None
+            for label, fraction in (('p50', 0.50), ('p95', 0.95), ('p99', 0.99))
+        },
+        'elapsed_seconds': round(elapsed, 2),
+        'script_runs_per_second': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'bookings_per_second': round(counts.get('booked', 0) / elapsed, 2) if elapsed else None,
+        'outcomes': counts,
+        'overbooked_slots': overbooked
+    }
+
+    print(f"{args.sessions} sessions over {workers} workers, {args.history} past bookings")
+    print(f"  script runs:   {report['script_runs']} in {report['elapsed_seconds']}s ({report['script_runs_per_second']}/s)")
+    print(f"  latency:       p50 {report['latency_ms']['p50']} ms, p95 {report['latency_ms']['p95']} ms, p99 {report['latency_ms']['p99']} ms")
+    print(f"  outcomes:      {', '.join(f'{outcome} {count}' for outcome, count in sorted(counts.items()))}")
+    print(f"  bookings/sec:  {report['bookings_per_second']}")
+    print(f"  overbooked:    {len(overbooked) or 'none'}")
+    for coach_id, moment, count in overbooked:
+        print(f"    {coach_id} at {moment}: {count} students (max {max_slots_per_time})")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(report, output_file, indent=2)
+        print(f"Saved {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Seeded synthetic bookings for benchmarks
+
+The same seed always yields the same bookings relative to the start date,
+so runs on different commits measure identical workloads.
+"""
+import random
+from datetime import datetime, timedelta
+
+EXPERIENCE_LEVELS = ['Beginner', 'Intermediate', 'Advanced', 'High School', 'College']
+LESSON_DURATIONS = [60, 60, 60, 90, 120]  # one-hour lessons are the most common
+COACH_IDS = ['head-coach', 'coach-2', 'coach-3']
+LOCATION_IDS = ['main-facility', 'north-field']
+
+# Student details are drawn from a fixed pool so a million bookings stay small
+STUDENT_POOL_SIZE = 5000
+
+COACH_INFO = {
+    'name': 'Coach Mike Johnson',
+    'email': 'coach@pitchinglessons.com',
+    'phone': '(555) 123-4567',
+    'rates': '$75 per hour session',
+    'payment_methods': 'Cash or Venmo accepted',
+    'venmo_handle': '@CoachMike-Baseball'
+}
+
+def make_bookings(count, seed=0, start=None, days=365, coach_ids=COACH_IDS):
+    """
+    Generate count bookings spread over days from start (default: today),
+    ordered by lesson time. Lessons start on the quarter hour between 8 AM
+    and 8 PM.
+    """
+    rng = random.Random(seed)
+    start = start or datetime.combine(datetime.now().date(), datetime.min.time())
+    students = [
+        (f"Student {number}", f"student{number}@example.com", f"(555) {number % 1000:03d}-{number % 10000:04d}")
+        for number in range(min(count, STUDENT_POOL_SIZE))
+    ]
+
+    offsets = sorted(
+        rng.randrange(days) * 24 * 60 + 8 * 60 + rng.randrange(48) * 15
+        for _ in range(count)
+    )
+    bookings = []
+    for number, offset in enumerate(offsets):
+        name, email, phone = students[rng.randrange(len(students))]
+        bookings.append({
+            'booking_id': f"{number:08x}",
+            'name': name,
+            'email': email,
+            'phone': phone,
+            'datetime': start + timedelta(minutes=offset),
+            'duration_minutes': rng.choice(LESSON_DURATIONS),
+            'coach_id': rng.choice(coach_ids),
+            'location_id': rng.choice(LOCATION_IDS),
+            'experience_level': rng.choice(EXPERIENCE_LEVELS),
+            'special_requests': ''
+        })
+    return bookings
@@ -1,30 +1,42 @@
 import streamlit as st
+from utils.coaches import location_label
+from utils.metrics import timed
 
+@timed()
 def show_about_page():
     """Display the about page"""
     
-    st.header("About Your Coach")
+    st.header("About Our Coaches")
+    
+    for coach_info in st.session_state.coaches.values():
+        show_coach_profile(coach_info)
+        st.markdown("---")
+    
+    show_coaching_details()
+
+def show_coach_profile(coach_info):
+    """Display one coach's bio and contact details"""
     
     col1, col2 = st.columns([1, 2])
     
     with col1:
         st.image("https://via.placeholder.com/300x400/4CAF50/FFFFFF?text=Coach+Photo", 
-                caption=st.session_state.coach_info['name'])
+                caption=coach_info['name'])
     
     with col2:
-        st.subheader(st.session_state.coach_info['name'])
-        st.write(st.session_state.coach_info['bio'])
+        st.subheader(coach_info['name'])
+        st.write(coach_info['bio'])
         
         st.markdown("**Contact Information:**")
-        st.write(f"📧 {st.session_state.coach_info['email']}")
-        st.write(f"📞 {st.session_state.coach_info['phone']}")
-        st.write(f"💰 {st.session_state.coach_info['rates']}")
-        st.write(f"💳 **Payment:** {st.session_state.coach_info['payment_methods']}")
-        if 'venmo_handle' in st.session_state.coach_info:
-            st.write(f"**Venmo:** {st.session_state.coach_info['venmo_handle']}")
-    
-    st.markdown("---")
-    show_coaching_details()
+        st.write(f"📧 {coach_info['email']}")
+        st.write(f"📞 {coach_info['phone']}")
+        st.write(f"💰 {coach_info['rates']}")
+        st.write(f"💳 **Payment:** {coach_info['payment_methods']}")
+        if 'venmo_handle' in coach_info:
+            st.write(f"**Venmo:** {coach_info['venmo_handle']}")
+        location = location_label(st.session_state.locations, coach_info['location_id'])
+        if location:
+            st.write(f"📍 {location}")
 
 def show_coaching_details():
     """Display detailed coaching information"""
@@ -1,40 +1,80 @@
+import os
 import streamlit as st
+import numpy as np
 import pandas as pd
-from datetime import datetime
-from utils.calendar_utils import format_booking_summary, get_upcoming_bookings
+from datetime import datetime, timedelta
+from utils.calendar_utils import format_booking_summary
+from utils.intervals import booking_duration, booking_end
+from utils.booking_store import get_booking_store, NOT_FOUND, RESCHEDULED
+from utils.reminders import send_reminder_emails, sync_reminder_scheduler
+from utils.ics_feed import get_coach_feed
+from utils.bookings_frame import get_bookings_frame, SORTABLE_COLUMNS
+from utils.export import export_bookings_csv, EXPORT_COLUMNS
+from utils.data_transfer import export_all_data, import_data, SETTINGS_VALIDATORS
+from utils.booking_stats import get_booking_stats
+from utils.booking_archive import archive_bookings, get_booking_archive, retention_cutoff
+from utils.slot_cache import slot_cache_stats
+from utils.metrics import (
+    metrics_enabled, metrics_summary, render_prometheus, reset_metrics, set_metrics_enabled, timed, write_prometheus
+)
+from utils.analytics import compute_booking_analytics
+from utils.availability_rules import format_ranges, parse_ranges
+from utils.coaches import coach_for_booking, location_label, new_entity_id
+from utils.settings_store import get_settings_store, SHARED_SECTIONS
+from config.settings import ICS_FEED_CONFIG, APP_SETTINGS, METRICS_CONFIG, RETENTION_CONFIG, load_shared_settings
 
+@timed()
 def show_admin_page():
     """Display the admin panel"""
     
     st.header("Admin Panel")
     st.write("*Note: In production, this would be password protected*")
     
+    # Availability, feed and profile pages act on one coach at a time
+    coaches = st.session_state.coaches
+    coach_id = st.selectbox(
+        "Coach",
+        list(coaches),
+        format_func=lambda coach_id: coaches[coach_id]['name'],
+        key="admin_coach"
+    )
+    
     # Create admin sub-tabs
-    admin_tab1, admin_tab2, admin_tab3 = st.tabs(["📅 Availability", "📋 Bookings", "⚙️ Settings"])
+    admin_tab1, admin_tab2, admin_tab3, admin_tab4, admin_tab5 = st.tabs(
+        ["📅 Availability", "📋 Bookings", "📈 Analytics", "⚙️ Settings", "⏱️ Performance"]
+    )
     
     with admin_tab1:
-        show_availability_settings()
+        show_availability_settings(coach_id)
     
     with admin_tab2:
-        show_bookings_management()
+        show_bookings_management(coach_id)
     
     with admin_tab3:
-        show_coach_settings()
+        show_analytics()
+    
+    with admin_tab4:
+        show_coach_settings(coach_id)
+    
+    with admin_tab5:
+        show_performance()
 
-def show_availability_settings():
-    """Display and manage availability settings"""
+def show_availability_settings(coach_id):
+    """Display and manage one coach's availability settings"""
     
-    st.subheader("Set Weekly Availability")
-    st.write("Configure your available hours for each day of the week.")
+    st.subheader(f"Set Weekly Availability for {st.session_state.coaches[coach_id]['name']}")
+    st.write("Configure the available hours for each day of the week.")
     
-    for day in st.session_state.availability.keys():
-        col1, col2, col3, col4 = st.columns([2, 1, 2, 2])
+    availability = st.session_state.availability[coach_id]
+    edited = {}
+    for day, day_info in availability.items():
+        col1, col2, col3, col4, col5 = st.columns([2, 1, 2, 2, 3])
         
         with col1:
             enabled = st.checkbox(
                 day,
-                value=st.session_state.availability[day]['enabled'],
-                key=f"enabled_{day}"
+                value=day_info['enabled'],
+                key=f"enabled_{coach_id}_{day}"
             )
         
         with col2:
@@ -47,38 +87,130 @@ def show_availability_settings():
             if enabled:
                 start_time = st.time_input(
                     "Start",
-                    value=datetime.strptime(st.session_state.availability[day]['start'], '%H:%M').time(),
-                    key=f"start_{day}"
+                    value=datetime.strptime(day_info['start'], '%H:%M').time(),
+                    key=f"start_{coach_id}_{day}"
                 )
         
         with col4:
             if enabled:
                 end_time = st.time_input(
                     "End",
-                    value=datetime.strptime(st.session_state.availability[day]['end'], '%H:%M').time(),
-                    key=f"end_{day}"
+                    value=datetime.strptime(day_info['end'], '%H:%M').time(),
+                    key=f"end_{coach_id}_{day}"
+                )
+        
+        with col5:
+            if enabled:
+                breaks_text = st.text_input(
+                    "Breaks",
+                    value=format_ranges(day_info.get('breaks', [])),
+                    placeholder="12:00-13:00",
+                    key=f"breaks_{coach_id}_{day}"
                 )
         
-        # Update session state
-        st.session_state.availability[day]['enabled'] = enabled
+        # Collect the edited hours; they reach students once saved
+        day_info = dict(day_info, enabled=enabled)
         if enabled:
-            st.session_state.availability[day]['start'] = start_time.strftime('%H:%M')
-            st.session_state.availability[day]['end'] = end_time.strftime('%H:%M')
+            day_info['start'] = start_time.strftime('%H:%M')
+            day_info['end'] = end_time.strftime('%H:%M')
+            try:
+                day_info['breaks'] = parse_ranges(breaks_text)
+            except ValueError:
+                st.error(f"{day} breaks must look like 12:00-13:00, 15:00-15:15, between 00:00 and 24:00")
+        edited[day] = day_info
     
     if st.button("💾 Save Availability Settings"):
+        availability = dict(st.session_state.availability)
+        availability[coach_id] = edited
+        save_shared_settings({'availability': availability})
         st.success("Availability settings saved successfully!")
+    
+    st.markdown("---")
+    show_availability_exceptions(coach_id)
+
+def save_shared_settings(sections):
+    """Save edited settings sections for every session and reload this session's copies"""
+    get_settings_store().save(sections)
+    load_shared_settings()
+
+def show_availability_exceptions(coach_id):
+    """Display and manage one coach's holidays and one-off date overrides"""
+    
+    st.subheader("Holidays & Date Overrides")
+    exceptions = st.session_state.availability_exceptions[coach_id]
+    today = datetime.now().date()
+    
+    def save_exceptions(updated):
+        all_exceptions = dict(st.session_state.availability_exceptions)
+        all_exceptions[coach_id] = updated
+        save_shared_settings({'availability_exceptions': all_exceptions})
+        return updated
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.write("**Blackout dates** (closed all day)")
+        blackout_date = st.date_input("Date", value=today, min_value=today, key=f"blackout_date_{coach_id}")
+        if st.button("➕ Add Blackout Date"):
+            day = blackout_date.isoformat()
+            if day not in exceptions['blackout_dates']:
+                exceptions = save_exceptions(dict(exceptions, blackout_dates=sorted(exceptions['blackout_dates'] + [day])))
+        
+        for day in exceptions['blackout_dates']:
+            day_col, remove_col = st.columns([3, 1])
+            with day_col:
+                st.write(datetime.strptime(day, '%Y-%m-%d').strftime('%A, %B %d, %Y'))
+            with remove_col:
+                if st.button("Remove", key=f"remove_blackout_{coach_id}_{day}"):
+                    save_exceptions(dict(exceptions, blackout_dates=[d for d in exceptions['blackout_dates'] if d != day]))
+                    st.rerun()
+    
+    with col2:
+        st.write("**Date overrides** (replace the weekly hours)")
+        override_date = st.date_input("Date", value=today, min_value=today, key=f"override_date_{coach_id}")
+        override_hours = st.text_input("Hours", placeholder="09:00-12:00, 14:00-18:00", key=f"override_hours_{coach_id}")
+        if st.button("➕ Add Override"):
+            try:
+                ranges = parse_ranges(override_hours)
+            except ValueError:
+                st.error("Hours must look like 09:00-12:00, 14:00-18:00, between 00:00 and 24:00")
+            else:
+                exceptions = save_exceptions(dict(
+                    exceptions, date_overrides=dict(exceptions['date_overrides'], **{override_date.isoformat(): ranges})
+                ))
+        
+        for day, ranges in sorted(exceptions['date_overrides'].items()):
+            day_col, remove_col = st.columns([3, 1])
+            with day_col:
+                hours = format_ranges(ranges) or "Closed"
+                st.write(f"{datetime.strptime(day, '%Y-%m-%d').strftime('%a, %b %d, %Y')}: {hours}")
+            with remove_col:
+                if st.button("Remove", key=f"remove_override_{coach_id}_{day}"):
+                    save_exceptions(dict(
+                        exceptions, date_overrides={d: r for d, r in exceptions['date_overrides'].items() if d != day}
+                    ))
+                    st.rerun()
 
-def show_bookings_management():
+def show_bookings_management(coach_id):
     """Display and manage current bookings"""
     
     st.subheader("Booking Management")
     
-    if not st.session_state.bookings:
+    # Outcome of a cancel or reschedule from the previous run
+    notice = st.session_state.pop('booking_card_notice', None)
+    if notice:
+        st.success(notice)
+    
+    store = get_booking_store()
+    frame = get_bookings_frame()
+    
+    if not len(frame):
         st.info("No bookings yet.")
         return
     
     # Show upcoming bookings
-    upcoming = get_upcoming_bookings(st.session_state.bookings, days_ahead=7)
+    now = datetime.now()
+    upcoming = store.bookings_between(now, now + timedelta(days=7))
     
     if upcoming:
         st.write("### Upcoming Bookings (Next 7 Days)")
@@ -86,38 +218,140 @@ def show_bookings_management():
             show_booking_card(booking)
         st.markdown("---")
     
+    # Look a booking up by ID (the primary key)
+    lookup_id = st.text_input("Find booking by ID", key="booking_lookup_id").strip()
+    if lookup_id:
+        found = get_booking_store().get_booking(lookup_id)
+        if found:
+            show_booking_card(found, key_prefix="lookup")
+        else:
+            st.warning(f"No confirmed booking with ID {lookup_id}")
+    
     # Show all bookings in table format
     st.write("### All Bookings")
     
-    bookings_data = [format_booking_summary(booking) for booking in 
-                    sorted(st.session_state.bookings, key=lambda x: x['datetime'])]
-    
-    bookings_df = pd.DataFrame(bookings_data)
-    
     # Add action buttons
     col1, col2 = st.columns([3, 1])
     
     with col1:
-        st.dataframe(bookings_df, use_container_width=True)
+        show_bookings_table(frame)
     
     with col2:
         if st.button("📧 Send Reminder Emails"):
-            st.info("Reminder emails would be sent to upcoming students")
+            result = send_reminder_emails(st.session_state.coaches, st.session_state.locations)
+            if result['sent'] or result['failed']:
+                st.success(f"Sent {result['sent']} reminder emails")
+                if result['failed']:
+                    st.warning(f"{result['failed']} reminders could not be sent")
+            else:
+                st.info("No lessons in the next 24 hours need a reminder")
         
-        if st.button("📊 Export Bookings"):
-            csv = bookings_df.to_csv(index=False)
-            st.download_button(
-                label="Download CSV",
-                data=csv,
-                file_name=f"bookings_{datetime.now().strftime('%Y%m%d')}.csv",
-                mime="text/csv"
-            )
+        with st.expander("📊 Export Bookings"):
+            show_bookings_export()
+        
+        # Selected coach's calendar feed; only re-serialized when their bookings change
+        coach_info = st.session_state.coaches[coach_id]
+        feed = get_coach_feed(coach_id)
+        feed.write_if_changed(coach_info, st.session_state.locations)
+        feed_etag, feed_data = feed.render(coach_info, st.session_state.locations)
+        st.download_button(
+            label="📆 Coach Calendar (.ics)",
+            data=feed_data,
+            file_name=f"coach_calendar_{coach_id}.ics",
+            mime="text/calendar"
+        )
+        st.caption(f"Feed {feed_etag} · also saved to `{ICS_FEED_CONFIG['path'].format(coach_id=coach_id)}`")
     
     # Booking statistics
     show_booking_statistics()
 
-def show_booking_card(booking):
-    """Display a single booking in card format"""
+def show_bookings_table(frame):
+    """Display one page of the bookings table with sorting and date filtering"""
+    
+    coaches = st.session_state.coaches
+    filter_col, coach_col, sort_col, order_col, size_col = st.columns([2, 2, 1, 1, 1])
+    
+    with filter_col:
+        date_range = st.date_input("Lesson dates", value=(), key="bookings_date_range")
+    with coach_col:
+        coach_filter = st.selectbox(
+            "Coach",
+            [None] + list(coaches),
+            format_func=lambda coach_id: "All coaches" if coach_id is None else coaches[coach_id]['name'],
+            key="bookings_coach"
+        )
+    with sort_col:
+        sort_label = st.selectbox("Sort by", list(SORTABLE_COLUMNS), key="bookings_sort")
+    with order_col:
+        descending = st.selectbox("Order", ["Ascending", "Descending"], key="bookings_order") == "Descending"
+    with size_col:
+        page_size = st.selectbox("Rows", [25, 50, 100], key="bookings_page_size")
+    
+    start_date = date_range[0] if len(date_range) > 0 else None
+    end_date = date_range[1] if len(date_range) > 1 else start_date
+    
+    # Total for the current filter, so the page selector knows its range
+    _, total = frame.query(start_date, end_date, limit=0, coach_id=coach_filter)
+    page_count = max((total + page_size - 1) // page_size, 1)
+    if st.session_state.get('bookings_page', 1) > page_count:
+        st.session_state.bookings_page = page_count
+    page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, key="bookings_page")
+    
+    rows, total = frame.query(
+        start_date,
+        end_date,
+        sort_by=SORTABLE_COLUMNS[sort_label],
+        descending=descending,
+        offset=(page - 1) * page_size,
+        limit=page_size,
+        coach_id=coach_filter
+    )
+    
+    # Only the visible page is formatted
+    table = pd.DataFrame([
+        dict(format_booking_summary(booking), Coach=coaches.get(booking['coach_id'], {}).get('name', booking['coach_id']))
+        for booking in rows
+    ])
+    st.dataframe(table, width="stretch")
+    st.caption(f"Showing {len(rows)} of {total} bookings")
+
+def show_bookings_export():
+    """Stream a filtered bookings CSV to a temporary file and offer it for download"""
+    
+    date_range = st.date_input("Lesson dates", value=(), key="export_date_range")
+    columns = st.multiselect("Columns", EXPORT_COLUMNS, default=EXPORT_COLUMNS, key="export_columns")
+    compress = st.checkbox("Gzip compress", key="export_gzip")
+    
+    if st.button("Prepare Export", disabled=not columns):
+        start = end = None
+        if len(date_range) > 0:
+            start = datetime.combine(date_range[0], datetime.min.time())
+            end = datetime.combine(date_range[-1] + timedelta(days=1), datetime.min.time())
+        
+        # Replace the previous export file, if any
+        previous_path = st.session_state.get('export_path')
+        if previous_path and os.path.exists(previous_path):
+            os.remove(previous_path)
+        
+        st.session_state.export_path = export_bookings_csv(
+            start, end, columns, compress=compress, coaches=st.session_state.coaches
+        )
+    
+    export_path = st.session_state.get('export_path')
+    if export_path and os.path.exists(export_path):
+        compressed = export_path.endswith('.gz')
+        with open(export_path, 'rb') as export_file:
+            st.download_button(
+                label="Download CSV",
+                data=export_file,
+                file_name=f"bookings_{datetime.now().strftime('%Y%m%d')}.csv" + ('.gz' if compressed else ''),
+                mime="application/gzip" if compressed else "text/csv"
+            )
+
+def show_booking_card(booking, key_prefix="card"):
+    """Display a single booking in card format with cancel and reschedule actions"""
+    
+    booking_id = booking['booking_id']
     
     col1, col2, col3 = st.columns([2, 2, 1])
     
@@ -127,26 +361,105 @@ def show_booking_card(booking):
         st.write(f"📞 {booking['phone']}")
     
     with col2:
+        coach_info = coach_for_booking(st.session_state.coaches, booking)
+        st.write(f"🧢 {coach_info['name'] if coach_info else booking['coach_id']}")
+        st.write(f"📍 {location_label(st.session_state.locations, booking['location_id']) or booking['location_id']}")
         st.write(f"📅 {booking['datetime'].strftime('%A, %B %d')}")
-        st.write(f"🕐 {booking['datetime'].strftime('%I:%M %p')}")
+        st.write(f"🕐 {booking['datetime'].strftime('%I:%M %p')} – {booking_end(booking).strftime('%I:%M %p')}")
         st.write(f"🎯 {booking['experience_level']}")
     
     with col3:
-        if st.button(f"Cancel", key=f"cancel_{booking['booking_id']}"):
-            if st.button(f"Confirm Cancel", key=f"confirm_cancel_{booking['booking_id']}"):
-                st.session_state.bookings = [
-                    b for b in st.session_state.bookings 
-                    if b['booking_id'] != booking['booking_id']
-                ]
-                st.success("Booking cancelled")
+        st.caption(f"ID {booking_id}")
+        # Cancelling takes a second click, remembered across the rerun
+        if st.session_state.get('confirm_cancel_id') == booking_id:
+            if st.button("Confirm Cancel", key=f"{key_prefix}_confirm_cancel_{booking_id}", type="primary"):
+                get_booking_store().cancel_booking(booking_id)
+                st.session_state.confirm_cancel_id = None
+                st.session_state.booking_card_notice = "Booking cancelled"
                 st.rerun()
+        elif st.button("Cancel", key=f"{key_prefix}_cancel_{booking_id}"):
+            st.session_state.confirm_cancel_id = booking_id
+            st.rerun()
+    
+    with st.expander("🔁 Reschedule"):
+        show_reschedule_form(booking, key_prefix)
     
     st.markdown("---")
 
+def show_reschedule_form(booking, key_prefix):
+    """Move a booking to another time, keeping the coach's capacity"""
+    
+    booking_id = booking['booking_id']
+    session_settings = st.session_state.session_settings
+    durations = APP_SETTINGS['lesson_durations_minutes']
+    
+    # Same booking window as the student page: today up to max_booking_days_ahead
+    min_date = datetime.now().date()
+    max_date = min_date + timedelta(days=APP_SETTINGS['max_booking_days_ahead'])
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        new_date = st.date_input(
+            "New date",
+            value=min(max(booking['datetime'].date(), min_date), max_date),
+            min_value=min_date,
+            max_value=max_date,
+            key=f"{key_prefix}_reschedule_date_{booking_id}"
+        )
+    
+    with col2:
+        new_time = st.time_input(
+            "New time",
+            value=booking['datetime'].time(),
+            step=timedelta(minutes=session_settings['slot_granularity_minutes']),
+            key=f"{key_prefix}_reschedule_time_{booking_id}"
+        )
+    
+    with col3:
+        duration = st.selectbox(
+            "Lesson length",
+            options=durations,
+            index=durations.index(booking_duration(booking)) if booking_duration(booking) in durations else 0,
+            format_func=lambda x: f"{x} minutes",
+            key=f"{key_prefix}_reschedule_duration_{booking_id}"
+        )
+    
+    if st.button("Move Lesson", key=f"{key_prefix}_reschedule_{booking_id}"):
+        new_datetime = datetime.combine(new_date, new_time)
+        
+        # The picker bounds the date but not a time earlier today
+        if not min_date <= new_date <= max_date or new_datetime < datetime.now():
+            st.error(f"Pick a time from now up to {APP_SETTINGS['max_booking_days_ahead']} days ahead.")
+            return
+        
+        # Only offer what the booking page would: a start inside the coach's
+        # hours, breaks and date exceptions, on the slot granularity
+        slot_starts = st.session_state.compiled_availability[booking['coach_id']].slot_starts(
+            new_date, duration, session_settings['slot_granularity_minutes']
+        )
+        if new_time.hour * 60 + new_time.minute not in slot_starts:
+            st.error("The coach isn't available for a lesson of that length at that time. Pick another time.")
+            return
+        
+        result = get_booking_store().reschedule_booking(
+            booking_id, new_datetime, duration, max_slots_per_time=session_settings['max_students_per_slot']
+        )
+        if result['status'] == RESCHEDULED:
+            st.session_state.booking_card_notice = f"Lesson moved to {new_datetime.strftime('%A, %B %d at %I:%M %p')}"
+            st.rerun()
+        elif result['status'] == NOT_FOUND:
+            st.error("This booking no longer exists.")
+        else:
+            st.error("That time is full for this coach. Pick another time.")
+
 def show_booking_statistics():
     """Display booking statistics"""
     
-    if not st.session_state.bookings:
+    stats = get_booking_stats()
+    total_bookings = stats.total
+    
+    if not total_bookings:
         return
     
     st.subheader("Booking Statistics")
@@ -154,87 +467,265 @@ def show_booking_statistics():
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        total_bookings = len(st.session_state.bookings)
         st.metric("Total Bookings", total_bookings)
     
     with col2:
-        upcoming_count = len(get_upcoming_bookings(st.session_state.bookings, 30))
-        st.metric("Upcoming (30 days)", upcoming_count)
+        st.metric("Upcoming (30 days)", stats.upcoming(30), help=f"{stats.upcoming(7)} in the next 7 days")
     
     with col3:
-        # Calculate revenue (assuming $75 per session)
-        total_revenue = total_bookings * 75
-        st.metric("Total Revenue", f"${total_revenue}")
+        # Revenue at each coach's rate in the coach settings
+        total_revenue = stats.revenue({
+            coach_id: coach_info['rates'] for coach_id, coach_info in st.session_state.coaches.items()
+        })
+        st.metric("Total Revenue", f"${total_revenue:,.0f}" if total_revenue is not None else "—")
+    
+    with col4:
+        # Average over days that have at least one lesson
+        st.metric("Avg Bookings/Day", round(stats.average_per_day(), 1))
+
+def show_analytics():
+    """Display utilization analytics for a date range"""
+    import altair as alt
+    
+    st.subheader("Utilization Analytics")
+    
+    coaches = st.session_state.coaches
+    compiled = st.session_state.compiled_availability
+    today = datetime.now().date()
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        date_range = st.date_input(
+            "Lesson dates",
+            value=(today - timedelta(days=90), today + timedelta(days=APP_SETTINGS['max_booking_days_ahead'])),
+            key="analytics_date_range"
+        )
+    with col2:
+        coach_id = st.selectbox(
+            "Coach",
+            [None] + list(coaches),
+            format_func=lambda coach_id: "All coaches" if coach_id is None else coaches[coach_id]['name'],
+            key="analytics_coach"
+        )
+    if len(date_range) < 2:
+        st.info("Pick a start and end date.")
+        return
+    
+    # The whole shop's capacity is every coach's open slots combined
+    analytics = compute_booking_analytics(
+        date_range[0],
+        date_range[1],
+        [compiled[coach] for coach in coaches] if coach_id is None else compiled[coach_id],
+        max_slots_per_time=st.session_state.session_settings['max_students_per_slot'],
+        coach_id=coach_id,
+        duration_minutes=st.session_state.session_settings['session_duration_minutes'],
+        granularity_minutes=st.session_state.session_settings['slot_granularity_minutes']
+    )
+    
+    if not analytics['total']:
+        st.info("No bookings in this date range.")
+        return
+    
+    col1, col2, col3, col4 = st.columns(4)
+    lead_times = analytics['lead_times']
     
+    with col1:
+        st.metric("Bookings", analytics['confirmed'])
+    with col2:
+        st.metric("Cancellation Rate", f"{analytics['cancellation_rate']:.0%}")
+    with col3:
+        median_days = lead_times['median_days']
+        st.metric("Median Lead Time", f"{median_days:.1f} days" if median_days is not None else "—")
     with col4:
-        # Calculate average bookings per day for available days
-        available_days = sum(1 for day_info in st.session_state.availability.values() if day_info['enabled'])
-        avg_bookings = round(total_bookings / max(available_days, 1), 1) if available_days > 0 else 0
-        st.metric("Avg Bookings/Day", avg_bookings)
+        fill_rates = analytics['fill_rates']
+        overall = np.nanmean(fill_rates.to_numpy()) if fill_rates.notna().any().any() else None
+        st.metric("Avg Slot Fill Rate", f"{overall:.0%}" if overall is not None else "—")
+    
+    st.write("### Fill Rate by Weekday and Hour")
+    cells = fill_rates.stack().reset_index()
+    cells.columns = ['weekday', 'hour', 'fill_rate']
+    cells['time'] = cells['hour'].map(lambda h: datetime.min.replace(hour=int(h)).strftime('%I %p'))
+    chart = alt.Chart(cells).mark_rect().encode(
+        x=alt.X('time:O', title=None, sort=alt.SortField('hour')),
+        y=alt.Y('weekday:O', title=None, sort=list(fill_rates.index)),
+        color=alt.Color('fill_rate:Q', title='Fill rate', scale=alt.Scale(domain=[0, 1], scheme='oranges')),
+        tooltip=['weekday', 'time', alt.Tooltip('fill_rate:Q', format='.0%')]
+    )
+    st.altair_chart(chart, width="stretch")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.write("### Lead Time (days booked ahead)")
+        st.bar_chart(lead_times['histogram'])
+    
+    with col2:
+        st.write("### Experience Level Mix")
+        st.bar_chart(analytics['level_mix'])
 
-def show_coach_settings():
+def show_import_result(result):
+    """Apply imported settings and report what was loaded"""
+    
+    # Coaches, locations and availability are shared; testimonials stay with this session
+    shared = {section: data for section, data in result['settings'].items() if section in SHARED_SECTIONS}
+    if shared:
+        save_shared_settings(shared)
+    for section, data in result['settings'].items():
+        if section not in shared:
+            st.session_state[section] = data
+    
+    st.success(
+        f"Imported {result['bookings_imported']} bookings"
+        f" ({result['bookings_skipped']} skipped)"
+        + (f" and {', '.join(result['settings'])}" if result['settings'] else "")
+    )
+    for error in result['errors']:
+        st.warning(error)
+
+def show_coach_settings(coach_id):
     """Display coach settings and configuration"""
     
+    coach_info = st.session_state.coaches[coach_id]
+    locations = st.session_state.locations
+    
     st.subheader("Coach Information Settings")
     
-    # Editable coach information
+    # Editable coach information; keys are per coach so switching coaches reloads the form
     col1, col2 = st.columns(2)
     
     with col1:
-        name = st.text_input("Coach Name", value=st.session_state.coach_info['name'])
-        email = st.text_input("Email", value=st.session_state.coach_info['email'])
-        phone = st.text_input("Phone", value=st.session_state.coach_info['phone'])
+        name = st.text_input("Coach Name", value=coach_info['name'], key=f"coach_name_{coach_id}")
+        email = st.text_input("Email", value=coach_info['email'], key=f"coach_email_{coach_id}")
+        phone = st.text_input("Phone", value=coach_info['phone'], key=f"coach_phone_{coach_id}")
+        location_id = st.selectbox(
+            "Location",
+            list(locations),
+            index=list(locations).index(coach_info['location_id']) if coach_info['location_id'] in locations else 0,
+            format_func=lambda location_id: locations[location_id]['name'],
+            key=f"coach_location_{coach_id}"
+        )
     
     with col2:
-        rates = st.text_input("Rates", value=st.session_state.coach_info['rates'])
-        payment_methods = st.text_input("Payment Methods", value=st.session_state.coach_info['payment_methods'])
-        venmo_handle = st.text_input("Venmo Handle", value=st.session_state.coach_info.get('venmo_handle', ''))
+        rates = st.text_input("Rates", value=coach_info['rates'], key=f"coach_rates_{coach_id}")
+        payment_methods = st.text_input("Payment Methods", value=coach_info['payment_methods'], key=f"coach_payment_{coach_id}")
+        venmo_handle = st.text_input("Venmo Handle", value=coach_info.get('venmo_handle', ''), key=f"coach_venmo_{coach_id}")
     
-    bio = st.text_area("Bio", value=st.session_state.coach_info['bio'], height=100)
+    bio = st.text_area("Bio", value=coach_info['bio'], height=100, key=f"coach_bio_{coach_id}")
     
     if st.button("💾 Save Coach Settings"):
-        st.session_state.coach_info.update({
+        coaches = dict(st.session_state.coaches)
+        coaches[coach_id] = dict(coach_info, **{
             'name': name,
             'email': email,
             'phone': phone,
             'rates': rates,
             'payment_methods': payment_methods,
             'venmo_handle': venmo_handle,
-            'bio': bio
+            'bio': bio,
+            'location_id': location_id
         })
+        save_shared_settings({'coaches': coaches})
         st.success("Coach settings saved successfully!")
     
     st.markdown("---")
     
+    # Coaches and locations
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("Add a Coach")
+        new_coach_name = st.text_input("New coach name", key="new_coach_name")
+        if st.button("➕ Add Coach", disabled=not new_coach_name):
+            new_coach_id = new_entity_id(new_coach_name, st.session_state.coaches)
+            coaches = dict(st.session_state.coaches)
+            coaches[new_coach_id] = dict(coach_info, name=new_coach_name, email='', phone='', bio='', venmo_handle='')
+            save_shared_settings({'coaches': coaches})
+            st.success(f"Added {new_coach_name}. Select them above to set their details and hours.")
+    
+    with col2:
+        st.subheader("Locations")
+        for location in locations.values():
+            st.write(f"📍 **{location['name']}**" + (f" · {location['address']}" if location.get('address') else ""))
+        new_location_name = st.text_input("New location name", key="new_location_name")
+        new_location_address = st.text_input("Address", key="new_location_address")
+        if st.button("➕ Add Location", disabled=not new_location_name):
+            locations = dict(locations)
+            locations[new_entity_id(new_location_name, locations)] = {
+                'name': new_location_name,
+                'address': new_location_address
+            }
+            save_shared_settings({'locations': locations})
+            st.rerun()
+    
+    st.markdown("---")
+    
     # Session settings
     st.subheader("Session Settings")
     
-    col1, col2 = st.columns(2)
+    session_settings = st.session_state.session_settings
+    col1, col2, col3 = st.columns(3)
     
     with col1:
         max_students = st.number_input(
             "Maximum students per time slot",
             min_value=1,
             max_value=10,
-            value=3,
-            help="How many students can book the same time slot for group lessons"
+            value=session_settings['max_students_per_slot'],
+            help="How many students can be on the field at the same time for group lessons"
         )
     
     with col2:
+        durations = APP_SETTINGS['lesson_durations_minutes']
         session_duration = st.selectbox(
             "Session Duration",
-            options=[60, 90, 120],
-            index=0,
+            options=durations,
+            index=durations.index(session_settings['session_duration_minutes']),
+            format_func=lambda x: f"{x} minutes",
+            help="Default lesson length; students can pick any offered length"
+        )
+    
+    with col3:
+        granularities = [15, 30, 60]
+        slot_granularity = st.selectbox(
+            "Start times every",
+            options=granularities,
+            index=granularities.index(session_settings['slot_granularity_minutes']),
             format_func=lambda x: f"{x} minutes"
         )
     
+    # Open slot lookups are shared by every student session
+    cache_stats = slot_cache_stats()
+    lookups = cache_stats['hits'] + cache_stats['misses']
+    st.caption(
+        f"Slot cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses"
+        + (f" ({cache_stats['hits'] / lookups:.0%} hit rate)" if lookups else "")
+        + f" · {cache_stats['size']}/{cache_stats['maxsize']} entries"
+    )
+    
     # Notification settings
     st.subheader("Notification Settings")
     
-    email_notifications = st.checkbox("Send email notifications", value=True)
-    reminder_emails = st.checkbox("Send reminder emails 24h before session", value=True)
+    notification_settings = st.session_state.notification_settings
+    email_notifications = st.checkbox(
+        "Send email notifications",
+        value=notification_settings['email_notifications'],
+        help="Confirmation emails to the student and coach when a lesson is booked"
+    )
+    reminder_emails = st.checkbox("Send reminder emails 24h before session", value=notification_settings['reminder_emails'])
     
     if st.button("💾 Save Session Settings"):
+        save_shared_settings({
+            'session_settings': {
+                'max_students_per_slot': max_students,
+                'session_duration_minutes': session_duration,
+                'slot_granularity_minutes': slot_granularity
+            },
+            'notification_settings': {
+                'email_notifications': email_notifications,
+                'reminder_emails': reminder_emails
+            }
+        })
+        sync_reminder_scheduler(st.session_state.notification_settings)
         st.success("Session settings saved successfully!")
     
     st.markdown("---")
@@ -246,23 +737,92 @@ def show_coach_settings():
     
     with col1:
         if st.button("📥 Export All Data"):
-            # Create export data
-            export_data = {
-                'bookings': st.session_state.bookings,
-                'availability': st.session_state.availability,
-                'coach_info': st.session_state.coach_info,
-                'testimonials': st.session_state.testimonials
-            }
-            st.download_button(
-                label="Download JSON Export",
-                data=str(export_data),
-                file_name=f"pitching_lessons_data_{datetime.now().strftime('%Y%m%d')}.json",
-                mime="application/json"
+            previous_path = st.session_state.get('data_export_path')
+            if previous_path and os.path.exists(previous_path):
+                os.remove(previous_path)
+            
+            # Stream bookings and settings to a newline-delimited JSON file
+            st.session_state.data_export_path = export_all_data(
+                {section: st.session_state[section] for section in SETTINGS_VALIDATORS}
             )
+        
+        data_export_path = st.session_state.get('data_export_path')
+        if data_export_path and os.path.exists(data_export_path):
+            with open(data_export_path, 'rb') as export_file:
+                st.download_button(
+                    label="Download JSON Export",
+                    data=export_file,
+                    file_name=f"pitching_lessons_data_{datetime.now().strftime('%Y%m%d')}.ndjson",
+                    mime="application/x-ndjson"
+                )
+        
+        uploaded_file = st.file_uploader("Import data export", type=["ndjson", "jsonl", "json"])
+        if uploaded_file is not None and st.button("📤 Import Data"):
+            show_import_result(import_data(uploaded_file))
     
     with col2:
         if st.button("🗑️ Clear All Bookings", type="secondary"):
             if st.button("⚠️ Confirm Delete All", type="secondary"):
-                st.session_state.bookings = []
+                get_booking_store().clear_bookings()
                 st.success("All bookings cleared!")
                 st.rerun()
+    
+    # Past lessons move to compressed monthly archive files
+    st.subheader("Data Retention")
+    
+    archive_summary = get_booking_archive().summary()
+    st.caption(
+        f"Archive: {archive_summary['rows']} bookings in {archive_summary['partitions']} monthly files "
+        f"at `{RETENTION_CONFIG['path']}`. Archived lessons still count in analytics, statistics and exports."
+    )
+    
+    archive_after_days = st.number_input(
+        "Archive lessons older than (days)",
+        min_value=1,
+        max_value=3650,
+        value=RETENTION_CONFIG['archive_after_days'],
+        key="archive_after_days"
+    )
+    if st.button("📦 Archive Past Bookings"):
+        result = archive_bookings(retention_cutoff(archive_after_days))
+        if result['archived']:
+            st.success(f"Archived {result['archived']} bookings from {', '.join(result['months'])}")
+        else:
+            st.info("No bookings older than the cutoff.")
+
+def show_performance():
+    """Display timing histograms for page renders and calendar/email calls"""
+    
+    st.subheader("Performance")
+    st.write("Time spent per page render and per calendar/email call, across every session in this process.")
+    
+    enabled = st.toggle("Record timings", value=metrics_enabled(), help="Off by default; adds a few microseconds per call while on")
+    if enabled != metrics_enabled():
+        set_metrics_enabled(enabled)
+    
+    rows = metrics_summary()
+    if rows:
+        st.dataframe(rows, hide_index=True, width="stretch")
+        st.caption("Percentiles are estimated from histogram buckets.")
+    else:
+        st.info("No timings recorded yet." if enabled else "Turn on timing recording to start collecting measurements.")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.download_button(
+            label="Download Prometheus Metrics",
+            data=render_prometheus(),
+            file_name="metrics.prom",
+            mime="text/plain"
+        )
+    
+    with col2:
+        if st.button("💾 Write Metrics File"):
+            st.success(f"Metrics written to `{write_prometheus()}`")
+        st.caption(f"Path: `{METRICS_CONFIG['path']}`")
+    
+    with col3:
+        if st.button("🧹 Reset Timings"):
+            reset_metrics()
+            st.rerun()
@@ -1,148 +1,364 @@
 import streamlit as st
 from datetime import datetime, timedelta
-import uuid
-from utils.email_utils import send_confirmation_email
-from utils.calendar_utils import get_available_slots
+from utils.email_utils import queue_confirmation_email, get_email_status
+from utils.booking_store import get_booking_store, RESERVED, SLOT_FULL
+from utils.slot_cache import get_open_slots
+from utils.coaches import location_label
+from utils.metrics import timed
+from config.settings import APP_SETTINGS
 
+ANY_COACH = None  # Coach picker choice that searches every coach
+MISSING_DETAILS = 'missing_details'  # Booking notice when contact details are incomplete
+
+@timed()
 def show_scheduler_page():
     """Display the main scheduling page"""
     
     st.header("Schedule Your Pitching Lesson")
     
+    coaches = st.session_state.coaches
+    coach_choice = st.selectbox(
+        "Coach:",
+        [ANY_COACH] + list(coaches),
+        format_func=lambda coach_id: "Any available coach" if coach_id is ANY_COACH else coaches[coach_id]['name']
+    )
+    
+    # The heatmap (and pandas behind it) is only built when asked for
+    if st.toggle("🗓️ See open slots for the next month", key="show_heatmap"):
+        show_availability_heatmap(coach_choice)
+    
+    show_booking_panel(coach_choice)
+
+@st.fragment
+@timed()
+def show_booking_panel(coach_choice):
+    """
+    Display the slot picker, contact form, booking summary and email status as one fragment
+    Changing the date, length or time, or confirming a booking, reruns only
+    this panel, which redraws the picker and summary with the new spots.
+    The contact form is a fragment of its own inside it, so typing contact
+    details never recomputes open slots.
+    """
+    
+    # A booking changes the spots the heatmap shows, so only when it is
+    # open does a booking rerun the whole page
+    if st.session_state.pop('booking_made', False) and st.session_state.get('show_heatmap'):
+        st.rerun()
+    
     col1, col2 = st.columns([1, 1])
     
     with col1:
-        st.subheader("Select Date & Time")
-        
-        # Date selection
-        min_date = datetime.now().date()
-        max_date = min_date + timedelta(days=30)  # Allow booking 30 days in advance
-        
-        selected_date = st.date_input(
-            "Choose a date:",
-            min_value=min_date,
-            max_value=max_date,
-            value=min_date
-        )
-        
-        # Get available slots
-        available_slots = get_available_slots(
-            selected_date, 
-            st.session_state.availability, 
-            st.session_state.bookings
-        )
-        
-        if available_slots:
-            # Format slot options to show availability
-            slot_options = []
-            slot_mapping = {}
-            
-            for slot in available_slots:
-                time_str = slot['time'].strftime('%I:%M %p')
-                availability_str = f"{time_str} ({slot['available_spots']}/{slot['total_spots']} spots available)"
-                slot_options.append(availability_str)
-                slot_mapping[availability_str] = slot['time']
-            
-            selected_time_str = st.selectbox(
-                "Choose a time:",
-                slot_options
-            )
-            
-            selected_time = slot_mapping[selected_time_str] if selected_time_str else None
-            
-            # Show group lesson info
-            if selected_time:
-                slot_info = next(slot for slot in available_slots if slot['time'] == selected_time)
-                if slot_info['total_spots'] > 1:
-                    st.info(f"ℹ️ This is a group lesson slot. Up to {slot_info['total_spots']} students can train together.")
-        else:
-            st.warning("No available slots for this date. Please choose another date.")
-            selected_time = None
+        selected_slot = show_slot_picker(coach_choice)
     
     with col2:
-        st.subheader("Your Information")
+        show_contact_form()
+    
+    st.markdown("---")
+    
+    show_booking_summary(selected_slot)
+    
+    if 'email_job_id' in st.session_state:
+        show_email_status()
+
+@timed()
+def show_slot_picker(coach_choice):
+    """Display the date, lesson length and time picker, returning the picked slot or None"""
+    
+    st.subheader("Select Date & Time")
+    coaches = st.session_state.coaches
+    
+    # Date selection
+    min_date = datetime.now().date()
+    max_date = min_date + timedelta(days=APP_SETTINGS['max_booking_days_ahead'])
+    
+    selected_date = st.date_input(
+        "Choose a date:",
+        min_value=min_date,
+        max_value=max_date,
+        value=min_date
+    )
+    
+    session_settings = st.session_state.session_settings
+    durations = APP_SETTINGS['lesson_durations_minutes']
+    default_duration = session_settings['session_duration_minutes']
+    duration_minutes = st.selectbox(
+        "Lesson length:",
+        durations,
+        index=durations.index(default_duration) if default_duration in durations else 0,
+        format_func=lambda x: f"{x} minutes"
+    )
+    
+    # Get available slots
+    available_slots = find_available_slots(
+        coach_choice,
+        selected_date,
+        duration_minutes,
+        session_settings
+    )
+    
+    selected_slot = None
+    if available_slots:
+        # Format slot options to show availability
+        slot_options = []
+        slot_mapping = {}
         
-        name = st.text_input("Full Name*", placeholder="Enter your full name")
-        email = st.text_input("Email Address*", placeholder="your@email.com")
-        phone = st.text_input("Phone Number*", placeholder="(555) 123-4567")
+        for slot in available_slots:
+            time_str = slot['time'].strftime('%I:%M %p')
+            if coach_choice is ANY_COACH:
+                time_str = f"{time_str} with {coaches[slot['coach_id']]['name']}"
+            availability_str = f"{time_str} ({slot['available_spots']}/{slot['total_spots']} spots available)"
+            slot_options.append(availability_str)
+            slot_mapping[availability_str] = slot
         
-        # Additional information
-        experience_level = st.selectbox(
-            "Experience Level:",
-            ["Beginner", "Intermediate", "Advanced", "High School", "College"]
+        selected_time_str = st.selectbox(
+            "Choose a time:",
+            slot_options
         )
         
-        special_requests = st.text_area(
-            "Special Requests or Goals:",
-            placeholder="Any specific areas you'd like to focus on..."
+        slot_info = slot_mapping[selected_time_str] if selected_time_str else None
+        if slot_info:
+            selected_slot = {
+                'date': selected_date,
+                'time': slot_info['time'],
+                'duration_minutes': duration_minutes,
+                'coach_id': slot_info['coach_id']
+            }
+        
+        # Show group lesson info
+        if slot_info and slot_info['total_spots'] > 1:
+            st.info(f"ℹ️ This is a group lesson slot. Up to {slot_info['total_spots']} students can train together.")
+    else:
+        st.warning("No available slots for this date. Please choose another date.")
+    
+    return selected_slot
+
+@st.fragment
+@timed()
+def show_contact_form():
+    """Display the student's contact details form"""
+    
+    st.subheader("Your Information")
+    
+    st.text_input("Full Name*", placeholder="Enter your full name", key="contact_name")
+    st.text_input("Email Address*", placeholder="your@email.com", key="contact_email")
+    st.text_input("Phone Number*", placeholder="(555) 123-4567", key="contact_phone")
+    
+    # Additional information
+    st.selectbox(
+        "Experience Level:",
+        ["Beginner", "Intermediate", "Advanced", "High School", "College"],
+        key="contact_experience_level"
+    )
+    
+    st.text_area(
+        "Special Requests or Goals:",
+        placeholder="Any specific areas you'd like to focus on...",
+        key="contact_special_requests"
+    )
+
+def find_available_slots(coach_choice, selected_date, duration_minutes, session_settings):
+    """Get open slots for one coach, or merged across every coach, each tagged with its coach_id"""
+    compiled = st.session_state.compiled_availability
+    coach_ids = list(st.session_state.coaches) if coach_choice is ANY_COACH else [coach_choice]
+    return get_open_slots(
+        selected_date,
+        {coach_id: compiled[coach_id] for coach_id in coach_ids},
+        max_slots_per_time=session_settings['max_students_per_slot'],
+        duration_minutes=duration_minutes,
+        granularity_minutes=session_settings['slot_granularity_minutes']
+    )
+
+def show_availability_heatmap(coach_choice=ANY_COACH):
+    """Display remaining spots for the whole booking window as a heatmap"""
+    import altair as alt
+    import pandas as pd
+    from utils.availability_matrix import get_availability_matrix
+    
+    start_date = datetime.now().date()
+    days = APP_SETTINGS['max_booking_days_ahead'] + 1
+    window_start = datetime.combine(start_date, datetime.min.time())
+    window_end = window_start + timedelta(days=days)
+    max_slots = st.session_state.session_settings['max_students_per_slot']
+    coach_ids = list(st.session_state.coaches) if coach_choice is ANY_COACH else [coach_choice]
+    
+    # Spots left per coach, summed over the coaches being searched
+    matrices = [
+        get_availability_matrix(
+            start_date,
+            days,
+            st.session_state.compiled_availability[coach_id],
+            get_booking_store().lessons_between(window_start, window_end, coach_id),
+            max_slots_per_time=max_slots
         )
+        for coach_id in coach_ids
+    ]
+    matrix = pd.concat(matrices).groupby(level=0).sum(min_count=1).sort_index(axis=1)
     
-    st.markdown("---")
+    # Long format for charting; closed slots are left blank
+    cells = matrix.stack().reset_index()
+    cells.columns = ['date', 'hour', 'spots']
+    if cells.empty:
+        st.info("No open slots in the booking window.")
+        return
     
-    # Booking summary and confirmation
-    if selected_time and name and email and phone:
-        show_booking_summary(selected_date, selected_time, name, email, phone, experience_level, special_requests)
-    else:
-        if selected_time:
-            st.info("Please fill in all required fields to complete your booking.")
+    cells['date'] = cells['date'].map(lambda d: d.strftime('%a %b %d'))
+    cells['time'] = cells['hour'].map(lambda h: datetime.min.replace(hour=int(h)).strftime('%I %p'))
+    
+    chart = alt.Chart(cells).mark_rect().encode(
+        x=alt.X('time:O', title=None, sort=alt.SortField('hour')),
+        y=alt.Y('date:O', title=None, sort=None),
+        color=alt.Color(
+            'spots:Q',
+            title='Spots left',
+            scale=alt.Scale(domain=[0, max_slots * len(coach_ids)], scheme='greens')
+        ),
+        tooltip=['date', 'time', 'spots']
+    )
+    st.altair_chart(chart, width="stretch")
+    st.caption("Darker cells have more open spots. Pick a date below to book.")
 
-def show_booking_summary(selected_date, selected_time, name, email, phone, experience_level, special_requests):
-    """Display booking summary and handle confirmation"""
+@timed()
+def show_booking_summary(slot):
+    """Display the booking summary for the picked slot and handle confirmation"""
+    
+    # Result of the confirm button's callback, run before this redraw
+    notice = st.session_state.pop('booking_notice', None)
+    if notice == RESERVED:
+        show_booking_confirmed()
+    elif notice == SLOT_FULL:
+        st.error("😕 Sorry, that time slot just filled up. Please choose another time.")
+    
+    if not slot:
+        return
     
-    booking_datetime = datetime.combine(selected_date, selected_time)
+    coach_info = st.session_state.coaches[slot['coach_id']]
     
     st.subheader("Booking Summary")
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.write("**Date:**", selected_date.strftime('%A, %B %d, %Y'))
+        st.write("**Date:**", slot['date'].strftime('%A, %B %d, %Y'))
     with col2:
-        st.write("**Time:**", selected_time.strftime('%I:%M %p'))
+        st.write("**Time:**", slot['time'].strftime('%I:%M %p'))
     with col3:
-        st.write("**Duration:**", "1 hour")
+        st.write("**Duration:**", f"{slot['duration_minutes']} minutes")
     
-    st.write("**Student:**", name)
-    st.write("**Rate:**", st.session_state.coach_info['rates'])
+    st.write("**Coach:**", coach_info['name'])
+    st.write("**Location:**", location_label(st.session_state.locations, coach_info['location_id']) or "TBD")
+    st.write("**Rate:**", coach_info['rates'])
     
-    st.info(f"💳 **Payment:** {st.session_state.coach_info['payment_methods']}")
-    if 'venmo_handle' in st.session_state.coach_info:
-        st.write(f"Venmo: **{st.session_state.coach_info['venmo_handle']}**")
+    st.info(f"💳 **Payment:** {coach_info['payment_methods']}")
+    if 'venmo_handle' in coach_info:
+        st.write(f"Venmo: **{coach_info['venmo_handle']}**")
     
-    if st.button("📅 Confirm Booking", type="primary"):
-        handle_booking_confirmation(
-            name, email, phone, booking_datetime, 
-            experience_level, special_requests
-        )
+    # The booking is made in the callback, before the panel redraws, so the
+    # picker above already shows the spots left after it
+    st.button("📅 Confirm Booking", type="primary", on_click=confirm_booking, args=(slot,))
+    if notice == MISSING_DETAILS:
+        st.info("Please fill in all required fields to complete your booking.")
 
-def handle_booking_confirmation(name, email, phone, booking_datetime, experience_level, special_requests):
+def confirm_booking(slot):
+    """Book the picked slot; the confirm button's callback"""
+    
+    # Contact details are read at confirm time, so typing them doesn't rerun the summary
+    name = st.session_state.get('contact_name')
+    email = st.session_state.get('contact_email')
+    phone = st.session_state.get('contact_phone')
+    if not (name and email and phone):
+        st.session_state.booking_notice = MISSING_DETAILS
+        return
+    
+    handle_booking_confirmation(
+        name, email, phone,
+        datetime.combine(slot['date'], slot['time']),
+        slot['duration_minutes'],
+        slot['coach_id'],
+        st.session_state.get('contact_experience_level'),
+        st.session_state.get('contact_special_requests', '')
+    )
+
+def handle_booking_confirmation(name, email, phone, booking_datetime, duration_minutes, coach_id, experience_level, special_requests):
     """Process the booking confirmation"""
     
+    coach_info = st.session_state.coaches[coach_id]
+    
     # Create booking
     booking = {
         'name': name,
         'email': email,
         'phone': phone,
         'datetime': booking_datetime,
+        'duration_minutes': duration_minutes,
+        'coach_id': coach_id,
+        'location_id': coach_info['location_id'],
         'experience_level': experience_level,
-        'special_requests': special_requests,
-        'booking_id': str(uuid.uuid4())[:8]
+        'special_requests': special_requests
     }
     
-    st.session_state.bookings.append(booking)
+    # Re-check capacity and insert in one step; another parent may have
+    # taken the last spot since this page was rendered. The store assigns
+    # the booking ID.
+    reservation = get_booking_store().reserve_booking(
+        booking, max_slots_per_time=st.session_state.session_settings['max_students_per_slot']
+    )
+    st.session_state.booking_notice = reservation['status']
     
-    # Send confirmation email (simulated)
-    if send_confirmation_email(booking, st.session_state.coach_info):
-        st.success("🎉 Booking confirmed! You will receive a confirmation email shortly.")
-        st.balloons()
-        
-        # Show next steps
-        st.markdown("### What's Next?")
-        st.write("1. Check your email for confirmation details")
-        st.write("2. Add the lesson to your calendar")
-        st.write("3. Prepare payment (cash or Venmo)")
-        st.write("4. Arrive 10 minutes early with your glove")
+    if reservation['status'] == RESERVED:
+        booking['booking_id'] = reservation['booking_id']
         
+        # Queue confirmation emails; delivery happens in the background.
+        # No job is queued when the admin has email notifications off.
+        email_job_id = queue_confirmation_email(
+            booking, coach_info, location_label(st.session_state.locations, booking['location_id'])
+        )
+        if email_job_id:
+            st.session_state.email_job_id = email_job_id
+            st.session_state.email_coach_id = coach_id
+        else:
+            st.session_state.pop('email_job_id', None)
+        st.session_state.booking_made = True
+
+def show_booking_confirmed():
+    """Display the booking confirmation and next steps"""
+    
+    emailed = 'email_job_id' in st.session_state
+    if emailed:
+        st.success("🎉 Booking confirmed! You will receive a confirmation email shortly.")
     else:
+        st.success("🎉 Booking confirmed!")
+    st.balloons()
+    
+    # Show next steps
+    st.markdown("### What's Next?")
+    steps = [
+        "Add the lesson to your calendar",
+        "Prepare payment (cash or Venmo)",
+        "Arrive 10 minutes early with your glove"
+    ]
+    if emailed:
+        steps.insert(0, "Check your email for confirmation details")
+    for number, step in enumerate(steps, start=1):
+        st.write(f"{number}. {step}")
+
+@st.fragment
+def show_email_status():
+    """Display the delivery status of the last confirmation email"""
+    
+    job = get_email_status(st.session_state.email_job_id)
+    if not job:
+        return
+    
+    if job['status'] == 'sent':
+        st.caption("📧 Confirmation email sent.")
+    elif job['status'] == 'failed':
+        coach_info = st.session_state.coaches.get(st.session_state.get('email_coach_id'))
         st.error("Booking saved but email notification failed. Please contact the coach directly.")
-        st.write(f"**Coach Email:** {st.session_state.coach_info['email']}")
-        st.write(f"**Coach Phone:** {st.session_state.coach_info['phone']}")
+        if coach_info:
+            st.write(f"**Coach Email:** {coach_info['email']}")
+            st.write(f"**Coach Phone:** {coach_info['phone']}")
+    else:
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            st.caption(f"📧 Sending confirmation email ({job['sent']}/{job['total']} sent, attempt {max(job['attempts'], 1)})...")
+        with col2:
+            st.button("🔄 Refresh status", key="refresh_email_status")
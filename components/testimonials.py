@@ -1,5 +1,7 @@
 import streamlit as st
+from utils.metrics import timed
 
+@timed()
 def show_testimonials_page():
     """Display the testimonials page"""
     
@@ -105,14 +107,16 @@ def show_call_to_action():
         """)
     
     with col2:
-        if st.button("📅 Schedule Your First Lesson", type="primary", use_container_width=True):
+        if st.button("📅 Schedule Your First Lesson", type="primary", width="stretch"):
             st.switch_page("Schedule Lesson")
         
         st.markdown("---")
         
         st.markdown("**Quick Contact:**")
-        st.write(f"📧 {st.session_state.coach_info['email']}")
-        st.write(f"📞 {st.session_state.coach_info['phone']}")
+        for coach_info in st.session_state.coaches.values():
+            st.write(f"**{coach_info['name']}**")
+            st.write(f"📧 {coach_info['email']}")
+            st.write(f"📞 {coach_info['phone']}")
 
 def show_parent_info():
     """Display information specifically for parents"""
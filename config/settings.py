@@ -1,32 +1,75 @@
+import os
 import streamlit as st
+from utils.availability_rules import default_exceptions
+
+def default_weekly_availability():
+    """Get the weekly hours a new coach starts with"""
+    return {
+        'Monday': {'enabled': True, 'start': '09:00', 'end': '17:00', 'breaks': []},
+        'Tuesday': {'enabled': True, 'start': '09:00', 'end': '17:00', 'breaks': []},
+        'Wednesday': {'enabled': True, 'start': '09:00', 'end': '17:00', 'breaks': []},
+        'Thursday': {'enabled': True, 'start': '09:00', 'end': '17:00', 'breaks': []},
+        'Friday': {'enabled': True, 'start': '09:00', 'end': '17:00', 'breaks': []},
+        'Saturday': {'enabled': True, 'start': '08:00', 'end': '16:00', 'breaks': []},
+        'Sunday': {'enabled': False, 'start': '10:00', 'end': '14:00', 'breaks': []}
+    }
+
+def default_shared_settings():
+    """Get the coaches, locations, availability and session settings a new install starts with"""
+    return {
+        # Coaches and locations are keyed by ID; bookings store the IDs
+        'locations': {
+            DEFAULT_LOCATION_ID: {
+                'name': 'Pitching Facility',
+                'address': '123 Baseball Drive, Your City, State 12345'
+            }
+        },
+        'coaches': {
+            DEFAULT_COACH_ID: {
+                'name': 'Coach Mike Johnson',
+                'email': 'coach@pitchinglessons.com',
+                'phone': '(555) 123-4567',
+                'bio': 'Former college pitcher with 15+ years coaching experience',
+                'rates': '$75 per hour session',
+                'payment_methods': 'Cash or Venmo accepted',
+                'venmo_handle': '@CoachMike-Baseball',
+                'location_id': DEFAULT_LOCATION_ID
+            }
+        },
+        # Availability is partitioned per coach: {coach_id: weekly template}
+        'availability': {DEFAULT_COACH_ID: default_weekly_availability()},
+        'availability_exceptions': {DEFAULT_COACH_ID: default_exceptions()},
+        'session_settings': {
+            'max_students_per_slot': APP_SETTINGS['max_students_per_slot'],
+            'session_duration_minutes': APP_SETTINGS['session_duration_minutes'],
+            'slot_granularity_minutes': APP_SETTINGS['slot_granularity_minutes']
+        },
+        'notification_settings': {
+            'email_notifications': True,
+            'reminder_emails': True
+        }
+    }
+
+def load_shared_settings():
+    """Point this session at the current shared settings and compiled availability"""
+    from utils.settings_store import get_settings_store
+
+    sections, compiled_availability = get_settings_store().snapshot()
+    for section, data in sections.items():
+        st.session_state[section] = data
+    st.session_state.compiled_availability = compiled_availability
 
 def initialize_session_state():
     """Initialize all session state variables"""
     
-    if 'bookings' not in st.session_state:
-        st.session_state.bookings = []
-
-    if 'availability' not in st.session_state:
-        st.session_state.availability = {
-            'Monday': {'enabled': True, 'start': '09:00', 'end': '17:00'},
-            'Tuesday': {'enabled': True, 'start': '09:00', 'end': '17:00'},
-            'Wednesday': {'enabled': True, 'start': '09:00', 'end': '17:00'},
-            'Thursday': {'enabled': True, 'start': '09:00', 'end': '17:00'},
-            'Friday': {'enabled': True, 'start': '09:00', 'end': '17:00'},
-            'Saturday': {'enabled': True, 'start': '08:00', 'end': '16:00'},
-            'Sunday': {'enabled': False, 'start': '10:00', 'end': '14:00'}
-        }
+    # Bookings are shared across sessions in the booking store (utils/booking_store.py),
+    # and coaches, locations, availability and session settings in the settings
+    # store (utils/settings_store.py). Each run reads their current copies.
+    load_shared_settings()
 
-    if 'coach_info' not in st.session_state:
-        st.session_state.coach_info = {
-            'name': 'Coach Mike Johnson',
-            'email': 'coach@pitchinglessons.com',
-            'phone': '(555) 123-4567',
-            'bio': 'Former college pitcher with 15+ years coaching experience',
-            'rates': '$75 per hour session',
-            'payment_methods': 'Cash or Venmo accepted',
-            'venmo_handle': '@CoachMike-Baseball'
-        }
+    # Automatic reminders follow the shared setting from the first page load
+    from utils.reminders import sync_reminder_scheduler
+    sync_reminder_scheduler(st.session_state.notification_settings)
 
     if 'testimonials' not in st.session_state:
         st.session_state.testimonials = [
@@ -40,13 +83,50 @@ EMAIL_CONFIG = {
     'smtp_server': 'smtp.gmail.com',
     'smtp_port': 587,
     'sender_email': 'your-email@gmail.com',
-    'sender_password': 'your-app-password'  # Use app-specific password for Gmail
+    'sender_password': 'your-app-password',  # Use app-specific password for Gmail
+    'enabled': False,  # Simulate delivery until SMTP is configured
+    'use_tls': True,
+    'timeout': 10,
+    'pool_size': 2,  # Authenticated SMTP connections kept open
+    'worker_count': 2,  # Background delivery threads
+    'queue_size': 100,  # Pending jobs before new submissions are rejected
+    'max_retries': 3,
+    'retry_backoff_seconds': 2
+}
+
+# Booking storage (SQLite database shared by all sessions)
+DATABASE_CONFIG = {
+    'path': os.environ.get('BOOKINGS_DB_PATH', 'data/bookings.db')
+}
+
+# Retention: lessons older than the cutoff move out of the database into
+# gzipped, month-partitioned archive files
+RETENTION_CONFIG = {
+    'archive_after_days': int(os.environ.get('BOOKINGS_ARCHIVE_AFTER_DAYS', '90')),
+    'path': os.environ.get('BOOKINGS_ARCHIVE_PATH', 'data/archive')
+}
+
+# Bookings made before coaches and locations existed belong to these
+DEFAULT_COACH_ID = 'head-coach'
+DEFAULT_LOCATION_ID = 'main-facility'
+
+# Coach calendar subscription feeds, one file per coach
+ICS_FEED_CONFIG = {
+    'path': os.environ.get('COACH_FEED_PATH', 'data/coach_calendar_{coach_id}.ics')
+}
+
+# Timing of page renders and calendar/email calls, shown in the admin panel
+METRICS_CONFIG = {
+    'enabled': os.environ.get('PERF_METRICS', '') == '1',
+    'path': os.environ.get('PERF_METRICS_PATH', 'data/metrics.prom')  # Prometheus text-format export
 }
 
 # Application settings
 APP_SETTINGS = {
     'max_booking_days_ahead': 30,
-    'session_duration_hours': 1,
+    'session_duration_minutes': 60,  # Default lesson length
+    'lesson_durations_minutes': [60, 90, 120],  # Lengths students can book
+    'slot_granularity_minutes': 60,  # Minutes between offered start times
     'timezone': 'America/New_York',
     'max_students_per_slot': 3  # Allow up to 3 students per time slot
 }
@@ -1,12 +1,6 @@
 import streamlit as st
-from datetime import datetime, timedelta
-import pandas as pd
-import uuid
 
-from utils.email_utils import send_confirmation_email
-from utils.calendar_utils import get_available_slots
 from config.settings import initialize_session_state
-from components import about, testimonials, admin, scheduler
 
 # Page configuration
 st.set_page_config(
@@ -15,6 +9,29 @@ st.set_page_config(
     layout="wide"
 )
 
+# Pages import their component on first visit, so heavy dependencies like
+# pandas only load when a page that needs them is opened
+
+def schedule_page():
+    """Schedule Lesson page"""
+    from components import scheduler
+    scheduler.show_scheduler_page()
+
+def about_page():
+    """About page"""
+    from components import about
+    about.show_about_page()
+
+def testimonials_page():
+    """Testimonials page"""
+    from components import testimonials
+    testimonials.show_testimonials_page()
+
+def admin_page():
+    """Admin page"""
+    from components import admin
+    admin.show_admin_page()
+
 def main():
     # Initialize session state
     initialize_session_state()
@@ -22,20 +39,17 @@ def main():
     st.title("⚾ Elite Pitching Lessons")
     st.markdown("---")
     
-    # Create tabs
-    tab1, tab2, tab3, tab4 = st.tabs(["📅 Schedule Lesson", "👨‍🏫 About", "💬 Testimonials", "⚙️ Admin"])
-    
-    with tab1:
-        scheduler.show_scheduler_page()
-    
-    with tab2:
-        about.show_about_page()
-    
-    with tab3:
-        testimonials.show_testimonials_page()
-    
-    with tab4:
-        admin.show_admin_page()
+    # Only the selected page runs on each rerun
+    page = st.navigation(
+        [
+            st.Page(schedule_page, title="Schedule Lesson", icon="📅", url_path="schedule", default=True),
+            st.Page(about_page, title="About", icon="👨‍🏫", url_path="about"),
+            st.Page(testimonials_page, title="Testimonials", icon="💬", url_path="testimonials"),
+            st.Page(admin_page, title="Admin", icon="⚙️", url_path="admin")
+        ],
+        position="top"
+    )
+    page.run()
 
 if __name__ == "__main__":
     main()
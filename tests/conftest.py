@@ -0,0 +1,37 @@
+import os
+import sys
+import pytest
+
+# Tests import the app's packages (config, utils) from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.booking_archive import BookingArchive
+from utils.booking_store import BookingStore
+
+@pytest.fixture
+def store(tmp_path):
+    """A booking store on a fresh database file"""
+    store = BookingStore(str(tmp_path / 'bookings.db'))
+    yield store
+    store.close()
+
+@pytest.fixture
+def archive(tmp_path):
+    """A booking archive in a fresh directory"""
+    return BookingArchive(str(tmp_path / 'archive'))
+
+@pytest.fixture
+def make_booking():
+    """Get a factory for new booking dicts: make_booking(when, duration_minutes=60, coach_id='coach-a', name='Student')"""
+    def make(when, duration_minutes=60, coach_id='coach-a', name='Student'):
+        return {
+            'name': name,
+            'email': 'student@example.com',
+            'phone': '555-0100',
+            'datetime': when,
+            'experience_level': 'Beginner',
+            'special_requests': '',
+            'duration_minutes': duration_minutes,
+            'coach_id': coach_id
+        }
+    return make
@@ -0,0 +1,58 @@
+"""Fill rates in compute_fill_rates"""
+from datetime import date, datetime
+import pandas as pd
+import pytest
+from utils.analytics import compute_fill_rates
+from utils.availability_rules import WEEKDAYS, compile_availability
+
+MONDAY = date(2030, 6, 3)
+
+def _availability(start='16:00', end='20:00'):
+    return compile_availability({
+        day: {'enabled': day == 'Monday', 'start': start, 'end': end, 'breaks': []} for day in WEEKDAYS
+    })
+
+def _history(*lessons):
+    """Build a history frame from (start datetime, duration_minutes[, status]) tuples"""
+    return pd.DataFrame({
+        'datetime': pd.to_datetime([lesson[0] for lesson in lessons]),
+        'status': [lesson[2] if len(lesson) > 2 else 'confirmed' for lesson in lessons],
+        'duration_minutes': [lesson[1] for lesson in lessons]
+    })
+
+def test_lesson_counts_towards_every_hour_it_covers():
+    history = _history((datetime(2030, 6, 3, 16), 120))
+
+    rates = compute_fill_rates(history, MONDAY, MONDAY, [_availability()], 2)
+
+    assert list(rates.columns) == [16, 17, 18, 19]
+    assert rates.loc['Monday', 16] == pytest.approx(0.5)
+    assert rates.loc['Monday', 17] == pytest.approx(0.5)
+    assert rates.loc['Monday', 18] == 0
+
+def test_lesson_off_the_hour_is_split_by_minutes():
+    history = _history((datetime(2030, 6, 3, 16, 30), 90))
+
+    rates = compute_fill_rates(history, MONDAY, MONDAY, [_availability()], 1, granularity_minutes=30)
+
+    assert rates.loc['Monday', 16] == pytest.approx(0.5)
+    assert rates.loc['Monday', 17] == pytest.approx(1.0)
+
+def test_capacity_follows_lesson_length_and_granularity():
+    # 90-minute lessons every 30 minutes in 16:00-17:45 can only start at 16:00
+    availability = _availability(end='17:45')
+    history = _history((datetime(2030, 6, 3, 16), 90))
+
+    rates = compute_fill_rates(history, MONDAY, MONDAY, [availability], 1,
+                               duration_minutes=90, granularity_minutes=30)
+
+    assert list(rates.columns) == [16, 17]
+    assert rates.loc['Monday', 16] == pytest.approx(1.0)
+    assert rates.loc['Monday', 17] == pytest.approx(1.0)
+
+def test_cancelled_lessons_are_not_counted():
+    history = _history((datetime(2030, 6, 3, 16), 60, 'cancelled'))
+
+    rates = compute_fill_rates(history, MONDAY, MONDAY, [_availability()], 1)
+
+    assert rates.loc['Monday', 16] == 0
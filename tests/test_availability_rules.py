@@ -0,0 +1,67 @@
+"""Weekly hours, breaks and date exceptions compiled by CompiledAvailability"""
+from datetime import date, time
+import pytest
+from utils.availability_rules import WEEKDAYS, compile_availability, parse_minutes, parse_ranges
+from utils.calendar_utils import get_available_slots
+
+MONDAY = date(2030, 6, 3)
+TUESDAY = date(2030, 6, 4)
+
+def _weekly(start='09:00', end='17:00', breaks=()):
+    return {
+        day: {'enabled': day in ('Monday', 'Tuesday'), 'start': start, 'end': end, 'breaks': list(breaks)}
+        for day in WEEKDAYS
+    }
+
+@pytest.mark.parametrize('value, minutes', [('00:00', 0), ('9:05', 545), ('23:59', 1439), ('24:00', 1440)])
+def test_parse_minutes_accepts_times_in_a_day(value, minutes):
+    assert parse_minutes(value) == minutes
+
+@pytest.mark.parametrize('value', ['24:01', '25:30', '10:60', '-1:00', '10:-5', '10', '10:00:00', 'ten:00'])
+def test_parse_minutes_rejects_times_outside_a_day(value):
+    with pytest.raises(ValueError):
+        parse_minutes(value)
+
+def test_parse_ranges_rejects_hours_past_midnight():
+    with pytest.raises(ValueError):
+        parse_ranges('22:00-25:30')
+    with pytest.raises(ValueError):
+        parse_ranges('12:00-11:00')
+    assert parse_ranges('22:00-24:00, 12:00-12:30') == [
+        {'start': '22:00', 'end': '24:00'}, {'start': '12:00', 'end': '12:30'}
+    ]
+
+def test_breaks_are_removed_from_the_day():
+    rules = compile_availability(_weekly(breaks=parse_ranges('12:00-13:00, 15:00-15:15')))
+
+    assert rules.open_intervals(MONDAY) == [(540, 720), (780, 900), (915, 1020)]
+    assert rules.slot_starts(MONDAY) == [540, 600, 660, 780, 840, 915]
+    assert not rules.is_open(MONDAY, 690, 750)
+    assert rules.is_open(MONDAY, 780, 900)
+
+def test_blackout_closes_the_whole_day():
+    rules = compile_availability(_weekly(), {'blackout_dates': [MONDAY.isoformat()], 'date_overrides': {}})
+
+    assert rules.open_intervals(MONDAY) == []
+    assert rules.slot_starts(TUESDAY)[0] == 540
+    assert rules.exception_dates_between(MONDAY, TUESDAY) == [MONDAY]
+
+def test_override_replaces_the_weekly_hours_for_one_date():
+    rules = compile_availability(_weekly(), {
+        'blackout_dates': [],
+        'date_overrides': {MONDAY.isoformat(): parse_ranges('18:00-20:00, 06:00-07:00')}
+    })
+
+    assert rules.open_intervals(MONDAY) == [(360, 420), (1080, 1200)]
+    assert rules.open_intervals(TUESDAY) == [(540, 1020)]
+
+def test_override_running_to_midnight_stays_on_its_date():
+    rules = compile_availability(_weekly(), {
+        'blackout_dates': [],
+        'date_overrides': {MONDAY.isoformat(): parse_ranges('22:00-24:00')}
+    })
+
+    assert rules.slot_starts(MONDAY) == [1320, 1380]
+    mask = rules.hourly_slot_mask(MONDAY, 2)
+    assert mask[0].nonzero()[0].tolist() == [22, 23]
+    assert [slot['time'] for slot in get_available_slots(MONDAY, rules, [])] == [time(22), time(23)]
@@ -0,0 +1,79 @@
+"""Moving past lessons into the archive and reading both tiers back"""
+import json
+import os
+from datetime import datetime
+from utils.booking_archive import (
+    BookingArchive, MANIFEST_NAME, archive_bookings, booking_history_columns, iter_all_bookings, iter_all_rows
+)
+
+CUTOFF = datetime(2030, 6, 1)
+START = datetime(2030, 1, 1)
+END = datetime(2031, 1, 1)
+
+def _add_lessons(store, make_booking):
+    """Add lessons in April, May and June, cancelling one in May; returns their IDs in lesson order"""
+    booking_ids = [
+        store.add_booking(make_booking(datetime(2030, 4, 15, 16))),
+        store.add_booking(make_booking(datetime(2030, 5, 6, 17), coach_id='coach-b')),
+        store.add_booking(make_booking(datetime(2030, 5, 20, 16))),
+        store.add_booking(make_booking(datetime(2030, 6, 3, 16))),
+    ]
+    store.cancel_booking(booking_ids[2])
+    return booking_ids
+
+def test_archive_moves_past_rows_of_any_status(store, archive, make_booking):
+    booking_ids = _add_lessons(store, make_booking)
+
+    result = archive_bookings(CUTOFF, store=store, archive=archive)
+
+    assert result == {'archived': 3, 'months': ['2030-04', '2030-05']}
+    assert [row['booking_id'] for row in store.iter_rows()] == [booking_ids[3]]
+    assert [row['status'] for row in archive.iter_rows()] == ['confirmed', 'confirmed', 'cancelled']
+    assert archive.summary() == {'partitions': 2, 'rows': 3, 'confirmed': {'coach-a': 1, 'coach-b': 1}, 'days': 2}
+
+def test_both_tiers_read_back_as_one_history(store, archive, make_booking):
+    booking_ids = _add_lessons(store, make_booking)
+    archive_bookings(CUTOFF, store=store, archive=archive)
+
+    bookings = list(iter_all_bookings(START, END, store=store, archive=archive))
+    assert [booking.booking_id for booking in bookings] == [booking_ids[0], booking_ids[1], booking_ids[3]]
+    assert bookings[1].coach_id == 'coach-b'
+    assert bookings[1].datetime == datetime(2030, 5, 6, 17)
+
+    rows = list(iter_all_rows(START, END, store=store, archive=archive))
+    assert [row['booking_id'] for row in rows] == booking_ids
+
+    columns = booking_history_columns(START, END, coach_id='coach-a', store=store, archive=archive)
+    assert columns['status'] == ['confirmed', 'cancelled', 'confirmed']
+    assert columns['duration_minutes'] == [60, 60, 60]
+
+def test_archiving_twice_is_harmless(store, archive, make_booking):
+    _add_lessons(store, make_booking)
+
+    # A run that wrote May's partition but stopped before deleting the rows
+    archive.write_partition('2030-05', store.rows_between(datetime(2030, 5, 1), CUTOFF))
+    archive_bookings(CUTOFF, store=store, archive=archive)
+    summary = archive.summary()
+
+    assert archive_bookings(CUTOFF, store=store, archive=archive) == {'archived': 0, 'months': []}
+    assert archive.summary() == summary
+    assert summary['rows'] == 3
+    assert len(archive.booking_ids('2030-05')) == 2
+
+def test_lost_manifest_is_recounted_from_partitions(store, archive, make_booking):
+    _add_lessons(store, make_booking)
+    archive_bookings(CUTOFF, store=store, archive=archive)
+    summary = archive.summary()
+    manifest_path = os.path.join(archive.directory, MANIFEST_NAME)
+
+    # One month missing, then a torn write, then no manifest at all
+    with open(manifest_path, 'w', encoding='utf-8') as manifest_file:
+        json.dump({'2030-04': {'rows': 1, 'confirmed': {'coach-a': 1}, 'days': 1}}, manifest_file)
+    assert BookingArchive(archive.directory).summary() == summary
+
+    with open(manifest_path, 'w', encoding='utf-8') as manifest_file:
+        manifest_file.write('{"2030-04": ')
+    assert BookingArchive(archive.directory).summary() == summary
+
+    os.remove(manifest_path)
+    assert BookingArchive(archive.directory).summary() == summary
@@ -0,0 +1,46 @@
+"""BookingStats counters kept current from store events"""
+import random
+from datetime import datetime, timedelta
+from utils.booking_stats import BookingStats
+
+NOW = datetime(2030, 6, 3, 13, 25)
+
+def _expected_upcoming(lessons, days_ahead):
+    return sum(NOW <= when <= NOW + timedelta(days=days_ahead) for when in lessons.values())
+
+def test_counters_track_adds_and_cancels(store, archive, make_booking):
+    store.add_booking(make_booking(NOW + timedelta(days=2)))
+    stats = BookingStats(store, archive)
+    cancelled = store.add_booking(make_booking(NOW + timedelta(days=3)))
+    store.add_booking(make_booking(NOW - timedelta(days=1), coach_id='coach-b'))
+    store.cancel_booking(cancelled)
+
+    assert stats.total == 2
+    assert stats.upcoming(30, now=NOW) == 1
+    assert stats.average_per_day() == 1
+    assert stats.revenue({'coach-a': '$75 per hour', 'coach-b': '$50'}) == 125
+
+def test_upcoming_matches_a_full_scan(store, archive, make_booking):
+    stats = BookingStats(store, archive)
+    rng = random.Random(7)
+    lessons = {}
+    for _ in range(300):
+        when = NOW + timedelta(minutes=rng.randrange(-40 * 24 * 60, 40 * 24 * 60))
+        lessons[store.add_booking(make_booking(when))] = when
+    for booking_id in rng.sample(sorted(lessons), 100):
+        store.cancel_booking(booking_id)
+        del lessons[booking_id]
+
+    for days_ahead in (0, 1, 7, 30, 90):
+        assert stats.upcoming(days_ahead, now=NOW) == _expected_upcoming(lessons, days_ahead)
+    assert stats.total == len(lessons)
+
+def test_lessons_far_outside_the_tree_are_counted(store, archive, make_booking):
+    stats = BookingStats(store, archive)
+    store.add_booking(make_booking(NOW + timedelta(days=5)))
+    store.add_booking(make_booking(NOW - timedelta(days=3000)))
+    store.add_booking(make_booking(NOW + timedelta(days=3000)))
+
+    assert stats.upcoming(10, now=NOW) == 1
+    assert stats.upcoming(4000, now=NOW) == 2
+    assert stats.total == 3
@@ -0,0 +1,154 @@
+"""Capacity checks, rescheduling and booking IDs in BookingStore"""
+import sqlite3
+import threading
+from datetime import datetime
+import pytest
+from utils import booking_store
+from utils.booking_store import (
+    BookingStore, BOOKING_ADDED, BOOKING_CANCELLED, NOT_FOUND, RESCHEDULED, RESERVED, SLOT_FULL
+)
+
+MONDAY = datetime(2030, 6, 3)
+
+def _at(hour, minute=0, day=MONDAY):
+    return day.replace(hour=hour, minute=minute)
+
+def _fill(store, booking, count=3):
+    for _ in range(count):
+        assert store.reserve_booking(booking, max_slots_per_time=3)['status'] == RESERVED
+
+def test_reserves_until_capacity_is_reached(store, make_booking):
+    results = [store.reserve_booking(make_booking(_at(16)), max_slots_per_time=3) for _ in range(4)]
+
+    assert [result['status'] for result in results] == [RESERVED, RESERVED, RESERVED, SLOT_FULL]
+    assert [result['booked'] for result in results] == [1, 2, 3, 3]
+    assert results[2]['is_full']
+    assert results[3]['booking_id'] is None
+    assert len(store.bookings_between(MONDAY, _at(23))) == 3
+
+def test_longer_lesson_overlapping_a_full_hour_is_refused(store, make_booking):
+    _fill(store, make_booking(_at(17)))
+
+    # 16:30-18:00 runs into the full 17:00 hour
+    result = store.reserve_booking(make_booking(_at(16, 30), duration_minutes=90), max_slots_per_time=3)
+
+    assert result['status'] == SLOT_FULL
+    assert result['booked'] == 3
+
+def test_full_hour_refuses_lesson_that_starts_inside_it(store, make_booking):
+    _fill(store, make_booking(_at(16), duration_minutes=90))
+
+    assert store.reserve_booking(make_booking(_at(17)), max_slots_per_time=3)['status'] == SLOT_FULL
+    # 17:30 is after the 90-minute lessons end
+    assert store.reserve_booking(make_booking(_at(17, 30)), max_slots_per_time=3)['status'] == RESERVED
+
+def test_back_to_back_lessons_do_not_overlap(store, make_booking):
+    _fill(store, make_booking(_at(16)))
+
+    assert store.reserve_booking(make_booking(_at(17)), max_slots_per_time=3)['status'] == RESERVED
+    assert store.reserve_booking(make_booking(_at(15)), max_slots_per_time=3)['status'] == RESERVED
+
+def test_coaches_have_separate_capacity(store, make_booking):
+    _fill(store, make_booking(_at(16), coach_id='coach-a'))
+
+    assert store.reserve_booking(make_booking(_at(16), coach_id='coach-a'), max_slots_per_time=3)['status'] == SLOT_FULL
+    result = store.reserve_booking(make_booking(_at(16), coach_id='coach-b'), max_slots_per_time=3)
+    assert result['status'] == RESERVED
+    assert result['booked'] == 1
+
+def test_lesson_crossing_midnight_counts_on_the_next_day(store, make_booking):
+    _fill(store, make_booking(_at(23, 30)))
+
+    next_day = MONDAY.replace(day=MONDAY.day + 1)
+    assert store.reserve_booking(make_booking(_at(0, day=next_day)), max_slots_per_time=3)['status'] == SLOT_FULL
+    assert store.reserve_booking(make_booking(_at(0, 30, day=next_day)), max_slots_per_time=3)['status'] == RESERVED
+
+def test_cancelled_lessons_free_their_spot(store, make_booking):
+    booking_ids = [store.reserve_booking(make_booking(_at(16)), max_slots_per_time=3)['booking_id'] for _ in range(3)]
+    store.cancel_booking(booking_ids[0])
+
+    assert store.reserve_booking(make_booking(_at(16)), max_slots_per_time=3)['status'] == RESERVED
+
+def _reserve_concurrently(stores, make_booking, attempts):
+    """Race attempts reservations for the same hour across threads, spread over stores"""
+    barrier = threading.Barrier(attempts)
+    results = []
+    results_lock = threading.Lock()
+
+    def reserve(number):
+        barrier.wait()
+        booking = make_booking(_at(16), name=f'Student {number}')
+        result = stores[number % len(stores)].reserve_booking(booking, max_slots_per_time=3)
+        with results_lock:
+            results.append(result['status'])
+
+    threads = [threading.Thread(target=reserve, args=(number,)) for number in range(attempts)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_concurrent_reservers_never_overbook(store, make_booking):
+    results = _reserve_concurrently([store], make_booking, 12)
+
+    assert results.count(RESERVED) == 3
+    assert results.count(SLOT_FULL) == 9
+    assert len(store.bookings_between(MONDAY, _at(23))) == 3
+
+def test_concurrent_connections_never_overbook(store, make_booking, tmp_path):
+    # A second connection to the same file stands in for another process
+    other = BookingStore(str(tmp_path / 'bookings.db'))
+    try:
+        results = _reserve_concurrently([store, other], make_booking, 12)
+    finally:
+        other.close()
+
+    assert results.count(RESERVED) == 3
+    assert len(store.bookings_between(MONDAY, _at(23))) == 3
+
+def test_reschedule_notifies_cancel_then_add_with_next_sequence(store, make_booking):
+    booking_id = store.add_booking(make_booking(_at(16)))
+    events = []
+    store.add_listener(lambda event, booking: events.append((event, booking.datetime, booking.sequence)))
+
+    result = store.reschedule_booking(booking_id, _at(18), max_slots_per_time=3)
+
+    assert result['status'] == RESCHEDULED
+    assert events == [(BOOKING_CANCELLED, _at(16), 0), (BOOKING_ADDED, _at(18), 1)]
+    moved = store.get_booking(booking_id)
+    assert (moved.datetime, moved.sequence) == (_at(18), 1)
+
+def test_reschedule_rearms_the_reminder(store, make_booking):
+    booking_id = store.add_booking(make_booking(_at(16)))
+    store.mark_reminders_sent([booking_id])
+    assert store.bookings_needing_reminder(MONDAY, _at(23)) == []
+
+    store.reschedule_booking(booking_id, _at(18), max_slots_per_time=3)
+
+    assert [booking.booking_id for booking in store.bookings_needing_reminder(MONDAY, _at(23))] == [booking_id]
+
+def test_reschedule_into_a_full_window_leaves_the_booking(store, make_booking):
+    booking_id = store.add_booking(make_booking(_at(16)))
+    _fill(store, make_booking(_at(18)))
+
+    assert store.reschedule_booking(booking_id, _at(18), max_slots_per_time=3)['status'] == SLOT_FULL
+    assert store.get_booking(booking_id).datetime == _at(16)
+    assert store.reschedule_booking('missing', _at(18))['status'] == NOT_FOUND
+
+def test_generated_id_collision_is_retried(store, make_booking, monkeypatch):
+    existing_id = store.add_booking(make_booking(_at(16)))
+    ids = iter([existing_id, 'fresh-id'])
+    monkeypatch.setattr(booking_store, 'new_booking_id', lambda: next(ids))
+
+    result = store.reserve_booking(make_booking(_at(16)), max_slots_per_time=3)
+
+    assert result['status'] == RESERVED
+    assert result['booking_id'] == 'fresh-id'
+    assert store.get_booking(existing_id).datetime == _at(16)
+
+def test_supplied_duplicate_id_is_rejected(store, make_booking):
+    existing_id = store.add_booking(make_booking(_at(16)))
+
+    with pytest.raises(sqlite3.IntegrityError):
+        store.reserve_booking(dict(make_booking(_at(17)), booking_id=existing_id), max_slots_per_time=3)
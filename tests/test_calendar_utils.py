@@ -0,0 +1,75 @@
+"""Calendar events for bookings, and the booking fields they are built from"""
+import sqlite3
+from datetime import datetime, timedelta
+import pytz
+from utils.booking_record import Booking
+from utils.booking_store import BookingStore, MIGRATIONS, RESCHEDULED
+from utils.calendar_utils import create_event_block
+
+COACH_INFO = {
+    'name': 'Coach Smith',
+    'rates': '$75 per hour',
+    'payment_methods': 'Cash or Venmo',
+    'venmo_handle': '@coach'
+}
+LESSON = datetime(2030, 6, 3, 16)
+
+def _properties(block):
+    return dict(line.split(':', 1) for line in block.split('\r\n') if ':' in line)
+
+def test_dtstamp_is_the_current_utc_time(make_booking):
+    before = datetime.now(pytz.utc).replace(microsecond=0)
+    properties = _properties(create_event_block(dict(make_booking(LESSON), booking_id='b1'), COACH_INFO))
+    after = datetime.now(pytz.utc)
+
+    stamp = pytz.utc.localize(datetime.strptime(properties['DTSTAMP'], '%Y%m%dT%H%M%SZ'))
+    assert before <= stamp <= after
+
+def test_sequence_goes_up_when_a_lesson_moves(store, make_booking):
+    booking_id = store.add_booking(make_booking(LESSON))
+    assert _properties(create_event_block(store.get_booking(booking_id), COACH_INFO))['SEQUENCE'] == '0'
+
+    for moves, hours in enumerate((2, 3), start=1):
+        result = store.reschedule_booking(booking_id, LESSON + timedelta(hours=hours))
+        assert result['status'] == RESCHEDULED
+        properties = _properties(create_event_block(store.get_booking(booking_id), COACH_INFO))
+        assert properties['SEQUENCE'] == str(moves)
+        assert properties['DTSTART'] == (LESSON + timedelta(hours=hours)).strftime('%Y%m%dT%H%M%S')
+
+def test_moved_event_reaches_listeners_with_its_new_sequence(store, make_booking):
+    booking_id = store.add_booking(make_booking(LESSON))
+    events = []
+    store.add_listener(lambda event, booking: events.append(booking))
+
+    store.reschedule_booking(booking_id, LESSON + timedelta(hours=1))
+
+    assert [booking.sequence for booking in events] == [0, 1]
+
+def test_lesson_time_round_trips_through_the_record(store, make_booking):
+    booking_id = store.add_booking(make_booking(LESSON.replace(second=42)))
+    booking = store.get_booking(booking_id)
+
+    # The stored time matches the record exactly, so a copy rebuilt from it does too
+    stored = store.rows_between(LESSON - timedelta(days=1), LESSON + timedelta(days=1))[0]['datetime']
+    assert stored == '2030-06-03 16:00:00'
+    assert Booking.from_dict(dict(booking)).datetime == booking.datetime == LESSON
+
+def test_migration_trims_seconds_from_existing_lessons(tmp_path):
+    path = str(tmp_path / 'old.db')
+    connection = sqlite3.connect(path, isolation_level=None)
+    for number, script in enumerate(MIGRATIONS[:5], start=1):
+        connection.executescript(f"BEGIN; {script} PRAGMA user_version = {number}; COMMIT;")
+    connection.execute(
+        "INSERT INTO bookings (booking_id, name, email, phone, datetime, end_datetime, coach_id, created_at) "
+        "VALUES ('old', 'n', 'e', 'p', '2030-06-03 16:00:30', '2030-06-03 17:00:30', 'coach-a', '2030-05-01 09:00:00')"
+    )
+    connection.close()
+
+    store = BookingStore(path)
+    try:
+        booking = store.get_booking('old')
+        assert booking.datetime == LESSON
+        assert booking.sequence == 0
+        assert store.rows_between(LESSON, LESSON + timedelta(hours=1))[0]['datetime'] == '2030-06-03 16:00:00'
+    finally:
+        store.close()
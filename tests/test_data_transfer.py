@@ -0,0 +1,95 @@
+"""Validation in import_data"""
+import json
+import pytest
+from utils.data_transfer import EXPORT_FORMAT, EXPORT_VERSION, import_data
+
+def _export(*records):
+    header = {'type': 'header', 'format': EXPORT_FORMAT, 'version': EXPORT_VERSION}
+    return [json.dumps(record) for record in (header,) + records]
+
+def _weekly(start='09:00', end='17:00', breaks=()):
+    return {'Monday': {'enabled': True, 'start': start, 'end': end, 'breaks': list(breaks)}}
+
+def test_override_hours_past_midnight_are_rejected(store, archive):
+    result = import_data(_export(
+        {'type': 'availability_exceptions', 'data': {'coach-a': {
+            'blackout_dates': [], 'date_overrides': {'2030-06-03': [{'start': '22:00', 'end': '25:30'}]}
+        }}}
+    ), store=store, archive=archive)
+
+    assert result['settings'] == {}
+    assert len(result['errors']) == 1
+
+def test_weekly_hours_and_breaks_must_be_times_in_a_day(store, archive):
+    for weekly in (_weekly(end='24:30'), _weekly(start='9:75'), _weekly(breaks=[{'start': '12:00', 'end': '12:60'}])):
+        result = import_data(_export({'type': 'availability', 'data': {'coach-a': weekly}}), store=store, archive=archive)
+        assert result['settings'] == {}
+        assert len(result['errors']) == 1
+
+    result = import_data(_export({'type': 'availability', 'data': {'coach-a': _weekly(end='24:00')}}), store=store, archive=archive)
+    assert result['errors'] == []
+    assert result['settings']['availability']['coach-a']['Monday']['end'] == '24:00'
+
+def _booking_record(**fields):
+    record = {
+        'booking_id': 'b1',
+        'name': 'Student',
+        'email': 'student@example.com',
+        'phone': '555-0100',
+        'datetime': '2030-06-03T16:00:00',
+        'duration_minutes': 60,
+        'coach_id': 'coach-a',
+        'status': 'confirmed',
+        'created_at': '2030-05-01T09:00:00',
+        'cancelled_at': None
+    }
+    record.update(fields)
+    return {'type': 'booking', 'data': record}
+
+def test_valid_booking_is_imported(store, archive):
+    result = import_data(_export(_booking_record()), store=store, archive=archive)
+
+    assert result['errors'] == []
+    assert result['bookings_imported'] == 1
+    assert store.get_booking('b1').duration_minutes == 60
+
+@pytest.mark.parametrize('fields', [
+    {'datetime': '2030-06-03T16:00:00+05:00'},
+    {'datetime': '2030-06-03T16:00:00Z'},
+    {'created_at': '2030-05-01T09:00:00+00:00'},
+    {'status': 'cancelled', 'cancelled_at': '2030-05-02T09:00:00-04:00'},
+    {'datetime': 'next tuesday'},
+    {'datetime': 20300603},
+    {'duration_minutes': True},
+    {'duration_minutes': 0},
+    {'duration_minutes': 24 * 60},
+    {'duration_minutes': '60'},
+    {'status': 'pending'},
+    {'sequence': -1},
+    {'sequence': False},
+    {'name': ''},
+])
+def test_invalid_booking_is_skipped_and_reported(store, archive, fields):
+    result = import_data(_export(_booking_record(**fields)), store=store, archive=archive)
+
+    assert result['bookings_imported'] == 0
+    assert result['bookings_skipped'] == 1
+    assert len(result['errors']) == 1 and result['errors'][0].startswith('Line 2:')
+    assert store.get_booking('b1') is None
+
+def test_bad_record_does_not_stop_the_rest(store, archive):
+    lines = _export(_booking_record(datetime='2030-06-03T16:00:00+05:00'), _booking_record(booking_id='b2'))
+
+    result = import_data(lines, store=store, archive=archive)
+
+    assert result['bookings_imported'] == 1
+    # The store stays readable for every view that iterates it
+    assert [booking.booking_id for booking in store.iter_bookings()] == ['b2']
+
+def test_bad_header_stops_the_import(store, archive):
+    lines = [json.dumps({'type': 'header', 'format': EXPORT_FORMAT, 'version': True}), json.dumps(_booking_record())]
+
+    result = import_data(lines, store=store, archive=archive)
+
+    assert result['bookings_imported'] == 0
+    assert len(result['errors']) == 1
@@ -0,0 +1,129 @@
+"""SMTP connection pool and email dispatcher, against a local aiosmtpd server"""
+import socket
+import time
+from email.message import EmailMessage
+import pytest
+
+aiosmtpd_controller = pytest.importorskip('aiosmtpd.controller')
+
+from utils.email_queue import EmailDispatcher, SMTPConnectionPool, SENT
+
+class RecordingHandler:
+    """aiosmtpd handler that records each session's greeting and every message"""
+
+    def __init__(self):
+        self.greetings = 0
+        self.messages = []
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.greetings += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return '250 Message accepted for delivery'
+
+def _free_port():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+@pytest.fixture
+def smtp_server():
+    """Start a local SMTP server; yields (handler, restart) where restart drops every open connection"""
+    handler = RecordingHandler()
+    port = _free_port()
+    controllers = [aiosmtpd_controller.Controller(handler, hostname='127.0.0.1', port=port)]
+    controllers[0].start()
+
+    def restart():
+        controllers[0].stop()
+        controllers[0] = aiosmtpd_controller.Controller(handler, hostname='127.0.0.1', port=port)
+        controllers[0].start()
+
+    handler.port = port
+    yield handler, restart
+    controllers[0].stop()
+
+def _config(port, **overrides):
+    config = {
+        'smtp_server': '127.0.0.1',
+        'smtp_port': port,
+        'sender_email': 'coach@example.com',
+        'sender_password': '',
+        'enabled': True,
+        'use_tls': False,
+        'timeout': 5,
+        'pool_size': 1,
+        'worker_count': 1,
+        'queue_size': 10,
+        'max_retries': 1,
+        'retry_backoff_seconds': 0
+    }
+    config.update(overrides)
+    return config
+
+def _message(number):
+    message = EmailMessage()
+    message['From'] = 'coach@example.com'
+    message['To'] = f'student{number}@example.com'
+    message['Subject'] = f'Lesson {number}'
+    message.set_content('See you at the field')
+    return message
+
+def test_pool_reuses_one_connection(smtp_server):
+    handler, _ = smtp_server
+    pool = SMTPConnectionPool(_config(handler.port), size=1)
+
+    for number in range(3):
+        with pool.connection() as server:
+            server.send_message(_message(number))
+    pool.close()
+
+    assert len(handler.messages) == 3
+    assert handler.greetings == 1
+
+def test_pool_replaces_connection_dropped_while_idle(smtp_server):
+    handler, restart = smtp_server
+    pool = SMTPConnectionPool(_config(handler.port), size=1)
+
+    with pool.connection() as server:
+        server.send_message(_message(1))
+    restart()  # the server drops the pooled connection while it sits idle
+
+    # The dead connection is caught on checkout, not by a failed send
+    with pool.connection() as server:
+        server.send_message(_message(2))
+    pool.close()
+
+    assert [envelope.rcpt_tos for envelope in handler.messages] == [['student1@example.com'], ['student2@example.com']]
+    assert handler.greetings == 2
+
+def test_dispatcher_delivers_queued_job(smtp_server):
+    handler, _ = smtp_server
+    dispatcher = EmailDispatcher(_config(handler.port))
+    dispatcher.start()
+
+    job_id = dispatcher.submit([_message(1), _message(2)])
+    deadline = time.monotonic() + 5
+    while dispatcher.get_status(job_id)['status'] != SENT and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    status = dispatcher.get_status(job_id)
+    assert status['status'] == SENT
+    assert status['sent'] == 2
+    assert status['attempts'] == 1
+    assert len(handler.messages) == 2
+    dispatcher.pool.close()
+
+def test_send_batch_uses_one_session(smtp_server):
+    handler, _ = smtp_server
+    dispatcher = EmailDispatcher(_config(handler.port))
+
+    sent = dispatcher.send_batch([_message(number) for number in range(5)])
+    dispatcher.pool.close()
+
+    assert sent == [0, 1, 2, 3, 4]
+    assert len(handler.messages) == 5
+    assert handler.greetings == 1
@@ -0,0 +1,69 @@
+"""Overlap counts and peak concurrency in LessonIntervals"""
+import random
+from datetime import datetime, timedelta
+from utils.intervals import LessonIntervals
+
+MONDAY = datetime(2030, 6, 3)
+
+def _at(hour, minute=0):
+    return MONDAY.replace(hour=hour, minute=minute)
+
+def _lesson(hour, minute=0, duration_minutes=60):
+    start = _at(hour, minute)
+    return start, start + timedelta(minutes=duration_minutes)
+
+def test_overlap_count_treats_lessons_as_half_open():
+    intervals = LessonIntervals.from_ranges([_lesson(16), _lesson(17)])
+
+    assert intervals.overlap_count(_at(16), _at(17)) == 1
+    assert intervals.overlap_count(_at(16, 59), _at(17, 1)) == 2
+    assert intervals.overlap_count(_at(18), _at(19)) == 0
+    assert intervals.overlap_count(_at(15), _at(16)) == 0
+
+def test_peak_counts_lessons_of_mixed_lengths():
+    # 16:00-17:30, 16:30-17:00 and 17:00-19:00: at most two at once
+    intervals = LessonIntervals.from_ranges([_lesson(16, 0, 90), _lesson(16, 30, 30), _lesson(17, 0, 120)])
+
+    assert intervals.peak(_at(16), _at(19)) == 2
+    assert intervals.overlap_count(_at(16), _at(19)) == 3
+    assert intervals.peak(_at(17, 30), _at(19)) == 1
+    assert intervals.peak(_at(19), _at(20)) == 0
+
+def test_back_to_back_lessons_never_peak_together():
+    intervals = LessonIntervals.from_ranges([_lesson(16, 0, 30), _lesson(16, 30, 45), _lesson(17, 15, 90)])
+
+    assert intervals.peak(_at(16), _at(19)) == 1
+
+def test_remove_drops_one_lesson_and_ignores_unknown_ones():
+    intervals = LessonIntervals()
+    intervals.add(*_lesson(16))
+    intervals.add(*_lesson(16))
+    intervals.add(*_lesson(16, 30, 90))
+
+    intervals.remove(*_lesson(16))
+    intervals.remove(*_lesson(9))
+
+    assert len(intervals) == 2
+    assert intervals.peak(_at(16), _at(17)) == 2
+    assert intervals.active_at(_at(17, 30)) == 1
+
+def test_peak_matches_a_minute_by_minute_count():
+    rng = random.Random(11)
+    lessons = [_lesson(rng.randrange(8, 20), rng.choice((0, 15, 30, 45)), rng.choice((30, 45, 60, 90, 120)))
+               for _ in range(60)]
+    intervals = LessonIntervals()
+    for lesson in lessons:
+        intervals.add(*lesson)
+    for lesson in rng.sample(lessons, 20):
+        intervals.remove(*lesson)
+        lessons.remove(lesson)
+
+    for _ in range(200):
+        start = _at(rng.randrange(7, 22), rng.randrange(60))
+        end = start + timedelta(minutes=rng.randrange(1, 180))
+        minutes = [start + timedelta(minutes=offset) for offset in range(int((end - start).total_seconds() // 60))]
+        expected_peak = max(sum(begin <= moment < finish for begin, finish in lessons) for moment in minutes)
+        expected_overlap = sum(begin < end and start < finish for begin, finish in lessons)
+
+        assert intervals.peak(start, end) == expected_peak
+        assert intervals.overlap_count(start, end) == expected_overlap
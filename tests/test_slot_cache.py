@@ -0,0 +1,56 @@
+"""Invalidation of the shared open slot cache"""
+from datetime import date, datetime, time
+import pytest
+from utils import slot_cache
+from utils.availability_rules import WEEKDAYS, compile_availability
+from utils.booking_store import BookingStore
+
+MONDAY = date(2030, 6, 3)
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    slot_cache._slot_cache.clear()
+
+def _rules(start='16:00', end='18:00'):
+    return compile_availability({
+        day: {'enabled': day == 'Monday', 'start': start, 'end': end, 'breaks': []} for day in WEEKDAYS
+    })
+
+def _spots(store, rules=None):
+    slots = slot_cache.get_open_slots(MONDAY, {'coach-a': rules or _rules()}, max_slots_per_time=3, store=store)
+    return {slot['time'].hour: slot['available_spots'] for slot in slots}
+
+def test_booking_and_cancellation_refresh_open_slots(store, make_booking):
+    assert _spots(store) == {16: 3, 17: 3}
+
+    booking_id = store.add_booking(make_booking(datetime.combine(MONDAY, time(16))))
+    assert _spots(store) == {16: 2, 17: 3}
+
+    store.cancel_booking(booking_id)
+    assert _spots(store) == {16: 3, 17: 3}
+
+def test_availability_edit_refreshes_open_slots(store):
+    assert _spots(store) == {16: 3, 17: 3}
+    assert _spots(store, _rules(end='19:00')) == {16: 3, 17: 3, 18: 3}
+
+def test_writes_from_another_connection_refresh_open_slots(store, make_booking, tmp_path):
+    assert _spots(store) == {16: 3, 17: 3}
+
+    # A second connection to the same file stands in for another process
+    other = BookingStore(str(tmp_path / 'bookings.db'))
+    try:
+        booking_id = other.add_booking(make_booking(datetime.combine(MONDAY, time(17))))
+        assert _spots(store) == {16: 3, 17: 2}
+
+        other.cancel_booking(booking_id)
+        assert _spots(store) == {16: 3, 17: 3}
+    finally:
+        other.close()
+
+def test_unchanged_data_is_served_from_cache(store):
+    _spots(store)
+    hits = slot_cache.slot_cache_stats()['hits']
+
+    _spots(store)
+
+    assert slot_cache.slot_cache_stats()['hits'] == hits + 1
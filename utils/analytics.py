@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from config.settings import APP_SETTINGS
+from utils.availability_rules import as_compiled_availability, WEEKDAYS
+from utils.booking_archive import booking_history_columns
+from utils.booking_store import get_booking_store
+from utils.lru_cache import LRUCache
+
+# Results keyed on date range, booking data version and availability
+_analytics_cache = LRUCache(maxsize=32)
+
+def load_booking_history(start_date, end_date, store=None, coach_id=None, archive=None):
+    """Get a columnar DataFrame of bookings (any status, live or archived) with lessons in [start_date, end_date]"""
+    columns = booking_history_columns(
+        datetime.combine(start_date, datetime.min.time()),
+        datetime.combine(end_date + timedelta(days=1), datetime.min.time()),
+        coach_id=coach_id,
+        store=store,
+        archive=archive
+    )
+    history = pd.DataFrame({
+        'datetime': pd.to_datetime(pd.Series(columns['datetime'], dtype=object), format='ISO8601'),
+        'created_at': pd.to_datetime(pd.Series(columns['created_at'], dtype=object), format='ISO8601'),
+        'status': pd.Categorical(columns['status']),
+        'experience_level': pd.Categorical(columns['experience_level']),
+        'duration_minutes': pd.Series(columns['duration_minutes'], dtype=np.int64)
+    })
+    return history
+
+def compute_fill_rates(history, start_date, end_date, availabilities, max_slots_per_time,
+                       duration_minutes=None, granularity_minutes=None):
+    """
+    Get the share of capacity booked for each weekday and hour
+    Both sides are counted in student-minutes. Capacity is every minute of
+    each hour that an offered lesson (duration_minutes starting every
+    granularity_minutes) covers in every given coach's availability over the
+    date range, times max_slots_per_time, so holidays and date overrides
+    are reflected. Each confirmed lesson counts towards every hour it runs
+    through, for the minutes it spends in that hour.
+    """
+    duration_minutes = duration_minutes or APP_SETTINGS['session_duration_minutes']
+    granularity_minutes = granularity_minutes or APP_SETTINGS['slot_granularity_minutes']
+    days = (end_date - start_date).days + 1
+
+    # Sum each date's bookable minutes onto its weekday row
+    weekdays = (start_date.weekday() + np.arange(days)) % 7
+    capacity = np.zeros((7, 24), dtype=np.int64)
+    for availability in availabilities:
+        np.add.at(
+            capacity, weekdays,
+            availability.hourly_bookable_minutes(start_date, days, duration_minutes, granularity_minutes)
+        )
+    capacity *= max_slots_per_time
+
+    # Minute-of-week occupancy: +1 where a lesson starts, -1 where it ends,
+    # then a running sum. Lessons running past Sunday midnight spill into a
+    # second week that is folded back onto Monday.
+    week_minutes = 7 * 24 * 60
+    confirmed = history[history['status'] == 'confirmed']
+    starts = (
+        confirmed['datetime'].dt.dayofweek.to_numpy() * 24 * 60
+        + confirmed['datetime'].dt.hour.to_numpy() * 60
+        + confirmed['datetime'].dt.minute.to_numpy()
+    )
+    changes = np.zeros(2 * week_minutes + 1, dtype=np.int64)
+    np.add.at(changes, starts, 1)
+    np.add.at(changes, starts + confirmed['duration_minutes'].to_numpy(), -1)
+    occupancy = np.cumsum(changes[:-1])
+    booked = (occupancy[:week_minutes] + occupancy[week_minutes:]).reshape(7, 24, 60).sum(axis=2)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fill_rates = np.where(capacity > 0, booked / capacity, np.nan)
+
+    open_hours = np.flatnonzero(capacity.any(axis=0))
+    return pd.DataFrame(fill_rates[:, open_hours], index=WEEKDAYS, columns=open_hours)
+
+def compute_lead_times(history):
+    """Get summary statistics for days between booking and lesson"""
+    lead_days = (history['datetime'] - history['created_at']).dt.total_seconds().to_numpy() / 86400
+    lead_days = lead_days[~np.isnan(lead_days)]
+    if not len(lead_days):
+        return {'median_days': None, 'mean_days': None, 'histogram': pd.Series(dtype=np.int64)}
+
+    # Bucket into whole days, clipping same-day bookings made after the fact
+    buckets = np.clip(np.floor(lead_days), 0, None).astype(np.int64)
+    histogram = pd.Series(np.bincount(buckets)).rename_axis('days_ahead')
+    return {
+        'median_days': float(np.median(lead_days)),
+        'mean_days': float(np.mean(lead_days)),
+        'histogram': histogram
+    }
+
+def compute_booking_analytics(start_date, end_date, availability, max_slots_per_time=3, store=None, coach_id=None,
+                              duration_minutes=None, granularity_minutes=None):
+    """
+    Get fill rates, lead times, cancellation rate and experience-level mix
+    for lessons between start_date and end_date, for one coach or (with a
+    list of every coach's availability) the whole shop. Capacity assumes
+    lessons of duration_minutes offered every granularity_minutes, as the
+    booking page does. Results are cached until bookings or availability
+    change.
+    """
+    store = store or get_booking_store()
+    availabilities = [
+        as_compiled_availability(rules)
+        for rules in (availability if isinstance(availability, list) else [availability])
+    ]
+    cache_key = (
+        start_date,
+        end_date,
+        store.version,
+        tuple(rules.fingerprint for rules in availabilities),
+        max_slots_per_time,
+        coach_id,
+        duration_minutes,
+        granularity_minutes
+    )
+
+    def build():
+        history = load_booking_history(start_date, end_date, store=store, coach_id=coach_id)
+        total = len(history)
+        cancelled = int((history['status'] == 'cancelled').sum())
+        confirmed_levels = history.loc[history['status'] == 'confirmed', 'experience_level']
+
+        return {
+            'total': total,
+            'confirmed': total - cancelled,
+            'cancelled': cancelled,
+            'cancellation_rate': cancelled / total if total else 0.0,
+            'fill_rates': compute_fill_rates(
+                history, start_date, end_date, availabilities, max_slots_per_time,
+                duration_minutes=duration_minutes, granularity_minutes=granularity_minutes
+            ),
+            'lead_times': compute_lead_times(history),
+            'level_mix': confirmed_levels.value_counts(normalize=True).sort_values(ascending=False)
+        }
+
+    return _analytics_cache.get_or_create(cache_key, build)
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+from utils.availability_rules import as_compiled_availability
+
+def get_availability_matrix(start_date, days, availability, lessons, max_slots_per_time=3):
+    """
+    Get remaining spots for every date and hour in a booking window
+    Returns a DataFrame indexed by date with one column per hour; closed
+    slots are NaN and full slots are 0. ``availability`` may be compiled
+    rules (honouring breaks, holidays and overrides) or the weekly template,
+    and ``lessons`` is a list of (start, end) datetime pairs. Each hour's
+    booked count is the most lessons in progress at once during that hour.
+    """
+    dates = pd.date_range(start_date, periods=days, freq='D')
+
+    # Open slots for every date from the compiled rules
+    open_mask = as_compiled_availability(availability).hourly_slot_mask(start_date, days)
+
+    # Minute-by-minute occupancy for the window: +1 where a lesson starts,
+    # -1 where it ends, then a running sum
+    minutes = np.zeros(days * 24 * 60 + 1, dtype=np.int64)
+    if lessons:
+        lesson_df = pd.DataFrame(lessons, columns=['start', 'end'])
+        window_start = dates[0]
+        start_offsets = (pd.DatetimeIndex(lesson_df['start']) - window_start) // pd.Timedelta(minutes=1)
+        end_offsets = (pd.DatetimeIndex(lesson_df['end']) - window_start) // pd.Timedelta(minutes=1)
+        np.add.at(minutes, np.clip(start_offsets, 0, len(minutes) - 1), 1)
+        np.add.at(minutes, np.clip(end_offsets, 0, len(minutes) - 1), -1)
+    occupancy = np.cumsum(minutes[:-1]).reshape(days, 24, 60)
+    counts = occupancy.max(axis=2)
+
+    remaining = np.where(open_mask, np.clip(max_slots_per_time - counts, 0, None), np.nan)
+
+    # Keep only the hours that are open on at least one day
+    open_hours = np.flatnonzero(open_mask.any(axis=0))
+    return pd.DataFrame(
+        remaining[:, open_hours],
+        index=dates.date,
+        columns=open_hours
+    )
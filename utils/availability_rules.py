@@ -0,0 +1,222 @@
+import json
+from bisect import bisect_left, bisect_right
+from datetime import date as date_type, time
+from utils.lru_cache import LRUCache
+
+MINUTES_PER_DAY = 24 * 60
+
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Compiled rules for availability dicts passed in directly, keyed on content
+_compiled_cache = LRUCache(maxsize=32)
+
+def default_exceptions():
+    """Get an empty set of date exceptions"""
+    return {'blackout_dates': [], 'date_overrides': {}}
+
+def availability_fingerprint(availability, exceptions=None):
+    """Get a stable string identifying a set of availability rules"""
+    return json.dumps([availability, exceptions or default_exceptions()], sort_keys=True, default=str)
+
+def parse_minutes(value):
+    """Convert 'HH:MM' (or a time) to minutes since midnight, from 00:00 up to 24:00"""
+    if isinstance(value, time):
+        return value.hour * 60 + value.minute
+    hours, minutes = (int(part) for part in value.split(':'))
+    if hours < 0 or not 0 <= minutes < 60 or hours * 60 + minutes > MINUTES_PER_DAY:
+        raise ValueError(f"{value} is not a time between 00:00 and 24:00")
+    return hours * 60 + minutes
+
+def format_minutes(minutes):
+    """Convert minutes since midnight to 'HH:MM'"""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+def parse_ranges(text):
+    """Parse '12:00-13:00, 15:00-15:15' into a list of {'start', 'end'} dicts"""
+    ranges = []
+    for part in (text or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        start, end = (piece.strip() for piece in part.split('-'))
+        if parse_minutes(end) <= parse_minutes(start):
+            raise ValueError(f"{part} ends before it starts")
+        ranges.append({'start': format_minutes(parse_minutes(start)), 'end': format_minutes(parse_minutes(end))})
+    return ranges
+
+def format_ranges(ranges):
+    """Format a list of {'start', 'end'} dicts as '12:00-13:00, 15:00-15:15'"""
+    return ', '.join(f"{item['start']}-{item['end']}" for item in ranges)
+
+def _subtract(intervals, removals):
+    """Remove sorted (start, end) removals from sorted, non-overlapping intervals"""
+    result = []
+    for start, end in intervals:
+        for removal_start, removal_end in removals:
+            if removal_end <= start or removal_start >= end:
+                continue
+            if removal_start > start:
+                result.append((start, removal_start))
+            start = max(start, removal_end)
+            if start >= end:
+                break
+        if start < end:
+            result.append((start, end))
+    return result
+
+def _merge(intervals):
+    """Sort and merge overlapping (start, end) intervals"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def _fit_slots(intervals, slot_minutes, step_minutes):
+    """Get start minutes of every slot that fits entirely inside an interval"""
+    starts = []
+    for start, end in intervals:
+        current = start
+        while current + slot_minutes <= end:
+            starts.append(current)
+            current += step_minutes
+    return starts
+
+def _to_ordinal(value):
+    """Convert a date or ISO date string to a day ordinal"""
+    if isinstance(value, str):
+        value = date_type.fromisoformat(value)
+    return value.toordinal()
+
+class CompiledAvailability:
+    """
+    Weekly template, breaks and date exceptions compiled to sorted intervals
+    Open intervals are minute offsets from midnight. Looking up a date is a
+    bisect into the sorted blackout and override ordinals, falling back to
+    the weekday's precomputed intervals.
+    """
+
+    def __init__(self, availability, exceptions=None):
+        exceptions = exceptions or default_exceptions()
+        self.fingerprint = availability_fingerprint(availability, exceptions)
+
+        # Weekday intervals with breaks subtracted
+        self.weekly = []
+        for day_name in WEEKDAYS:
+            day_info = availability.get(day_name)
+            if not day_info or not day_info['enabled']:
+                self.weekly.append([])
+                continue
+            hours = [(parse_minutes(day_info['start']), parse_minutes(day_info['end']))]
+            breaks = _merge(
+                (parse_minutes(item['start']), parse_minutes(item['end']))
+                for item in day_info.get('breaks', [])
+            )
+            self.weekly.append(_subtract(hours, breaks))
+
+        self._blackouts = sorted({_to_ordinal(day) for day in exceptions.get('blackout_dates', [])})
+
+        overrides = sorted(
+            (_to_ordinal(day), _merge((parse_minutes(item['start']), parse_minutes(item['end'])) for item in ranges))
+            for day, ranges in exceptions.get('date_overrides', {}).items()
+        )
+        self._override_days = [day for day, _ in overrides]
+        self._override_intervals = [intervals for _, intervals in overrides]
+
+    def _find(self, ordinals, ordinal):
+        """Get the index of ordinal in a sorted list, or -1"""
+        position = bisect_left(ordinals, ordinal)
+        if position < len(ordinals) and ordinals[position] == ordinal:
+            return position
+        return -1
+
+    def open_intervals(self, date):
+        """Get the sorted (start_minute, end_minute) open intervals for a date"""
+        ordinal = date.toordinal()
+        if self._find(self._blackouts, ordinal) >= 0:
+            return []
+        position = self._find(self._override_days, ordinal)
+        if position >= 0:
+            return self._override_intervals[position]
+        return self.weekly[date.weekday()]
+
+    def is_open(self, date, start_minute, end_minute):
+        """Check whether [start_minute, end_minute) falls inside one open interval"""
+        intervals = self.open_intervals(date)
+        position = bisect_right(intervals, (start_minute, float('inf'))) - 1
+        return position >= 0 and intervals[position][1] >= end_minute
+
+    def slot_starts(self, date, slot_minutes=60, step_minutes=60):
+        """Get start minutes for every slot of slot_minutes that fits in an open interval"""
+        return _fit_slots(self.open_intervals(date), slot_minutes, step_minutes)
+
+    def exception_dates_between(self, start_date, end_date):
+        """Get dates in [start_date, end_date] that have a blackout or override"""
+        low = start_date.toordinal()
+        high = end_date.toordinal()
+        ordinals = set()
+        for days in (self._blackouts, self._override_days):
+            ordinals.update(days[bisect_left(days, low):bisect_right(days, high)])
+        return [date_type.fromordinal(ordinal) for ordinal in sorted(ordinals)]
+
+    def hourly_slot_mask(self, start_date, days):
+        """
+        Get a days x 24 boolean mask of hourly slot starts from start_date on
+        Regular days come from a per-weekday mask; only exception dates are
+        resolved individually
+        """
+        import numpy as np
+
+        weekly_mask = np.zeros((7, 24), dtype=bool)
+        for weekday in range(7):
+            for start in _fit_slots(self.weekly[weekday], 60, 60):
+                weekly_mask[weekday, start // 60] = True
+
+        weekdays = (start_date.weekday() + np.arange(days)) % 7
+        mask = weekly_mask[weekdays]
+        if days:
+            end_date = date_type.fromordinal(start_date.toordinal() + days - 1)
+            for day in self.exception_dates_between(start_date, end_date):
+                row = mask[day.toordinal() - start_date.toordinal()]
+                row[:] = False
+                for start in self.slot_starts(day):
+                    row[start // 60] = True
+        return mask
+
+    def hourly_bookable_minutes(self, start_date, days, slot_minutes=60, step_minutes=60):
+        """
+        Get a days x 24 array of the minutes in each hour that an offered lesson covers
+        Lessons of slot_minutes start every step_minutes, as the booking page
+        offers them; a minute counts once however many offered lessons cover
+        it. Like hourly_slot_mask, only exception dates are resolved
+        individually.
+        """
+        import numpy as np
+
+        def covered(intervals):
+            minutes = np.zeros(MINUTES_PER_DAY, dtype=bool)
+            for start in _fit_slots(intervals, slot_minutes, step_minutes):
+                minutes[start:start + slot_minutes] = True
+            return minutes.reshape(24, 60).sum(axis=1)
+
+        weekly_minutes = np.array([covered(intervals) for intervals in self.weekly])
+        weekdays = (start_date.weekday() + np.arange(days)) % 7
+        minutes = weekly_minutes[weekdays]
+        if days:
+            end_date = date_type.fromordinal(start_date.toordinal() + days - 1)
+            for day in self.exception_dates_between(start_date, end_date):
+                minutes[day.toordinal() - start_date.toordinal()] = covered(self.open_intervals(day))
+        return minutes
+
+def compile_availability(availability, exceptions=None):
+    """Compile availability rules into a CompiledAvailability"""
+    return CompiledAvailability(availability, exceptions)
+
+def as_compiled_availability(availability):
+    """Return compiled rules, compiling (and caching) a plain weekly dict if needed"""
+    if isinstance(availability, CompiledAvailability):
+        return availability
+    key = json.dumps(availability, sort_keys=True)
+    return _compiled_cache.get_or_create(key, lambda: CompiledAvailability(availability))
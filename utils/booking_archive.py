@@ -0,0 +1,239 @@
+import gzip
+import heapq
+import json
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+from config.settings import RETENTION_CONFIG
+from utils.booking_record import Booking, to_epoch_minutes
+from utils.booking_store import get_booking_store, _to_db_datetime
+
+_PARTITION_PATTERN = re.compile(r'^bookings-(\d{4}-\d{2})\.ndjson\.gz$')
+MANIFEST_NAME = 'manifest.json'
+
+def _month_start(value):
+    """Get midnight on the first of value's month"""
+    return datetime(value.year, value.month, 1)
+
+def _next_month(value):
+    """Get midnight on the first of the month after value's"""
+    return datetime(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+def _row_to_booking(row):
+    """Convert an archived row into a Booking record"""
+    return Booking(
+        row['booking_id'], row['name'], row['email'], row['phone'],
+        to_epoch_minutes(datetime.fromisoformat(row['datetime'])), row['duration_minutes'],
+        row['experience_level'], row['special_requests'], row['coach_id'], row['location_id'],
+        row.get('sequence', 0)  # partitions written before sequences were tracked
+    )
+
+def _partition_counts(rows):
+    """Get the manifest entry for a partition: row count, confirmed lessons per coach and lesson days"""
+    confirmed = {}
+    days = set()
+    for row in rows:
+        if row['status'] == 'confirmed':
+            confirmed[row['coach_id']] = confirmed.get(row['coach_id'], 0) + 1
+            days.add(row['datetime'][:10])
+    return {'rows': len(rows), 'confirmed': confirmed, 'days': len(days)}
+
+class BookingArchive:
+    """
+    Cold tier for past lessons: one gzipped NDJSON file per lesson month
+    Each line is a full bookings row of any status, with times in the
+    database's text format, so partitions read back losslessly. A
+    partition is rewritten whole (merged by booking ID, sorted, then
+    atomically replaced), so archiving the same rows twice is harmless. A
+    small manifest keeps per-month counts so totals never open partitions.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._manifest = self._load_manifest()
+
+    def _path(self, month):
+        """Get the partition file for a month ('YYYY-MM')"""
+        return os.path.join(self.directory, f"bookings-{month}.ndjson.gz")
+
+    def _load_manifest(self):
+        """Read the manifest, recounting any partition it is missing"""
+        try:
+            with open(os.path.join(self.directory, MANIFEST_NAME), encoding='utf-8') as manifest_file:
+                saved = json.load(manifest_file)
+        except (OSError, ValueError):
+            saved = {}
+        return {
+            month: saved.get(month) or _partition_counts(list(self.read_partition(month)))
+            for month in self.months()
+        }
+
+    def _write_file(self, path, write, compress=False):
+        """Write a file through a temporary copy, synced to disk before it replaces path"""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as raw_file:
+            output = gzip.GzipFile(fileobj=raw_file, mode='wb') if compress else raw_file
+            try:
+                write(output)
+            finally:
+                if compress:
+                    output.close()
+            raw_file.flush()
+            os.fsync(raw_file.fileno())
+        os.replace(temp_path, path)
+
+    def months(self):
+        """Get the archived months ('YYYY-MM'), oldest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(match.group(1) for match in map(_PARTITION_PATTERN.match, os.listdir(self.directory)) if match)
+
+    def read_partition(self, month):
+        """Yield one month's archived rows in lesson order"""
+        path = self._path(month)
+        if not os.path.exists(path):
+            return
+        with gzip.open(path, 'rt', encoding='utf-8') as partition_file:
+            for line in partition_file:
+                yield json.loads(line)
+
+    def booking_ids(self, month):
+        """Get the set of booking IDs archived in one month's partition"""
+        return {row['booking_id'] for row in self.read_partition(month)}
+
+    def write_partition(self, month, rows):
+        """Merge rows (dicts of ARCHIVE_COLUMNS) into a month's partition, returning its new size"""
+        with self._lock:
+            merged = {row['booking_id']: row for row in self.read_partition(month)}
+            merged.update((row['booking_id'], row) for row in rows)
+            ordered = sorted(merged.values(), key=lambda row: (row['datetime'], row['booking_id']))
+
+            os.makedirs(self.directory, exist_ok=True)
+            self._write_file(
+                self._path(month),
+                lambda output: output.writelines((json.dumps(row) + '\n').encode('utf-8') for row in ordered),
+                compress=True
+            )
+            self._manifest[month] = _partition_counts(ordered)
+            manifest = json.dumps(self._manifest, sort_keys=True).encode('utf-8')
+            self._write_file(os.path.join(self.directory, MANIFEST_NAME), lambda output: output.write(manifest))
+        return len(ordered)
+
+    def iter_rows(self, start=None, end=None):
+        """Yield archived rows (any status) with start <= lesson time < end, in lesson order"""
+        start_text = _to_db_datetime(start) if start else ''
+        end_text = _to_db_datetime(end) if end else '9999'
+        for month in self.months():
+            # Only open partitions that overlap the range
+            if month < start_text[:7] or month > end_text[:7]:
+                continue
+            for row in self.read_partition(month):
+                if start_text <= row['datetime'] < end_text:
+                    yield row
+
+    def iter_bookings(self, start=None, end=None, coach_id=None):
+        """Yield archived confirmed bookings as Booking records, in lesson order"""
+        for row in self.iter_rows(start, end):
+            if row['status'] == 'confirmed' and (coach_id is None or row['coach_id'] == coach_id):
+                yield _row_to_booking(row)
+
+    def history_columns(self, start, end, coach_id=None):
+        """Get archived rows of any status as columns, like BookingStore.booking_history_columns"""
+        columns = {'datetime': [], 'created_at': [], 'status': [], 'experience_level': [], 'duration_minutes': []}
+        for row in self.iter_rows(start, end):
+            if coach_id is None or row['coach_id'] == coach_id:
+                for name, values in columns.items():
+                    values.append(row[name])
+        return columns
+
+    def summary(self):
+        """Get the archive's totals: partitions, rows, confirmed lessons per coach and lesson days"""
+        with self._lock:
+            entries = list(self._manifest.values())
+        confirmed = {}
+        for entry in entries:
+            for coach_id, count in entry['confirmed'].items():
+                confirmed[coach_id] = confirmed.get(coach_id, 0) + count
+        return {
+            'partitions': len(entries),
+            'rows': sum(entry['rows'] for entry in entries),
+            'confirmed': confirmed,
+            'days': sum(entry['days'] for entry in entries)
+        }
+
+_archive = None
+_archive_lock = threading.Lock()
+
+def get_booking_archive():
+    """Get the process-wide booking archive, opening it on first use"""
+    global _archive
+    if _archive is None:
+        with _archive_lock:
+            if _archive is None:
+                _archive = BookingArchive(RETENTION_CONFIG['path'])
+    return _archive
+
+def retention_cutoff(archive_after_days=None, now=None):
+    """Get midnight archive_after_days before today; lessons before it belong in the archive"""
+    days = RETENTION_CONFIG['archive_after_days'] if archive_after_days is None else archive_after_days
+    today = datetime.combine((now or datetime.now()).date(), datetime.min.time())
+    return today - timedelta(days=days)
+
+def archive_bookings(cutoff=None, store=None, archive=None):
+    """
+    Move every booking (any status) with a lesson before cutoff from the
+    store into the archive, one month at a time
+    Each month's rows are written and synced to their partition before
+    they are deleted from the database. Returns the number of bookings
+    moved and the months touched.
+    """
+    store = store or get_booking_store()
+    archive = archive or get_booking_archive()
+    cutoff = cutoff or retention_cutoff()
+
+    archived = 0
+    months = []
+    oldest = store.oldest_lesson()
+    month_start = _month_start(oldest) if oldest else cutoff
+    while month_start < cutoff:
+        rows = store.rows_between(month_start, min(_next_month(month_start), cutoff))
+        if rows:
+            month = month_start.strftime('%Y-%m')
+            archive.write_partition(month, rows)
+            archived += store.delete_bookings([row['booking_id'] for row in rows], notify=False)
+            months.append(month)
+        month_start = _next_month(month_start)
+
+    if archived:
+        store.notify_reloaded()
+    return {'archived': archived, 'months': months}
+
+def iter_all_bookings(start=None, end=None, chunk_size=1000, store=None, archive=None):
+    """Yield confirmed bookings from the archive and the store with start <= lesson time < end, in lesson order"""
+    store = store or get_booking_store()
+    archive = archive or get_booking_archive()
+    return heapq.merge(
+        archive.iter_bookings(start, end),
+        store.iter_bookings(start, end, chunk_size=chunk_size),
+        key=lambda booking: booking.start_minute
+    )
+
+def iter_all_rows(start=None, end=None, chunk_size=1000, store=None, archive=None):
+    """Yield rows (any status) from the archive and the store with start <= lesson time < end, in lesson order"""
+    store = store or get_booking_store()
+    archive = archive or get_booking_archive()
+    return heapq.merge(
+        archive.iter_rows(start, end),
+        store.iter_rows(start, end, chunk_size=chunk_size),
+        key=lambda row: row['datetime']
+    )
+
+def booking_history_columns(start, end, coach_id=None, store=None, archive=None):
+    """Get bookings of any status with start <= lesson time < end from both tiers as columns"""
+    store = store or get_booking_store()
+    archive = archive or get_booking_archive()
+    archived = archive.history_columns(start, end, coach_id)
+    live = store.booking_history_columns(start, end, coach_id=coach_id)
+    return {name: archived[name] + live[name] for name in live}
@@ -0,0 +1,245 @@
+import secrets
+import sys
+import time
+from array import array
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from config.settings import DEFAULT_COACH_ID, DEFAULT_LOCATION_ID
+from utils.intervals import DEFAULT_DURATION_MINUTES
+
+BOOKING_FIELDS = (
+    'booking_id', 'name', 'email', 'phone', 'datetime',
+    'experience_level', 'special_requests', 'duration_minutes', 'coach_id', 'location_id', 'sequence'
+)
+
+EPOCH = datetime(1970, 1, 1)
+MINUTES_PER_DAY = 24 * 60
+_MINUTE = timedelta(minutes=1)
+
+def to_epoch_minutes(value):
+    """
+    Get a naive datetime as whole minutes since 1970-01-01, dropping seconds
+    Lesson times are stored to the whole minute, so this is lossless for them
+    """
+    return (value - EPOCH) // _MINUTE
+
+def from_epoch_minutes(minutes):
+    """Get the naive datetime for a count of minutes since 1970-01-01"""
+    return EPOCH + timedelta(minutes=minutes)
+
+# Crockford base32 without the easily misread i, l, o and u
+_ID_ALPHABET = '0123456789abcdefghjkmnpqrstvwxyz'
+_ID_RANDOM_BITS = 30
+_ID_LENGTH = 15  # 9 characters of millisecond timestamp, 6 random
+
+def new_booking_id():
+    """
+    Make a 15-character booking ID that sorts by creation time, to the millisecond
+    The millisecond timestamp leads and 30 random bits follow, so two IDs
+    can only collide when made in the same millisecond (about a one in a
+    billion chance even then). The store still rejects a duplicate, and
+    retries with a fresh ID.
+    """
+    value = (time.time_ns() // 1000000) << _ID_RANDOM_BITS | secrets.randbits(_ID_RANDOM_BITS)
+    characters = []
+    for _ in range(_ID_LENGTH):
+        value, digit = divmod(value, 32)
+        characters.append(_ID_ALPHABET[digit])
+    return ''.join(reversed(characters))
+
+def _shared(value):
+    """Intern a low-cardinality string so every booking holding it shares one object"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+class Booking(Mapping):
+    """
+    Compact, read-only booking record
+    Attributes live in __slots__ and the lesson time is one integer of epoch
+    minutes, so a record is a fraction of the size of the equivalent dict.
+    The sequence is the calendar event's revision, bumped on every move.
+    Experience levels, coach and location IDs are interned. Records also
+    read like the booking dicts used across the app (booking['datetime'],
+    booking.get('coach_id'), dict(booking)), so callers need not change.
+    """
+
+    __slots__ = (
+        'booking_id', 'name', 'email', 'phone', 'start_minute', 'duration_minutes',
+        'experience_level', 'special_requests', 'coach_id', 'location_id', 'sequence'
+    )
+
+    def __init__(self, booking_id, name, email, phone, start_minute,
+                 duration_minutes=DEFAULT_DURATION_MINUTES, experience_level=None, special_requests=None,
+                 coach_id=DEFAULT_COACH_ID, location_id=DEFAULT_LOCATION_ID, sequence=0):
+        self.booking_id = booking_id
+        self.name = name
+        self.email = email
+        self.phone = phone
+        self.start_minute = start_minute
+        self.duration_minutes = duration_minutes
+        self.experience_level = _shared(experience_level)
+        self.special_requests = special_requests
+        self.coach_id = _shared(coach_id)
+        self.location_id = _shared(location_id)
+        self.sequence = sequence
+
+    @classmethod
+    def from_dict(cls, booking):
+        """Build a record from a booking dict"""
+        return cls(
+            booking['booking_id'],
+            booking['name'],
+            booking['email'],
+            booking['phone'],
+            to_epoch_minutes(booking['datetime']),
+            booking.get('duration_minutes') or DEFAULT_DURATION_MINUTES,
+            booking.get('experience_level'),
+            booking.get('special_requests'),
+            booking.get('coach_id') or DEFAULT_COACH_ID,
+            booking.get('location_id') or DEFAULT_LOCATION_ID,
+            booking.get('sequence') or 0
+        )
+
+    @property
+    def datetime(self):
+        """Lesson start as a naive datetime"""
+        return from_epoch_minutes(self.start_minute)
+
+    def to_dict(self):
+        """Get the booking as a plain dict"""
+        return {field: getattr(self, field) for field in BOOKING_FIELDS}
+
+    def __getitem__(self, field):
+        if field not in BOOKING_FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def get(self, field, default=None):
+        return getattr(self, field) if field in BOOKING_FIELDS else default
+
+    def __iter__(self):
+        return iter(BOOKING_FIELDS)
+
+    def __len__(self):
+        return len(BOOKING_FIELDS)
+
+    def __contains__(self, field):
+        return field in BOOKING_FIELDS
+
+    def __repr__(self):
+        return f"Booking({self.booking_id!r}, {self.datetime.isoformat(sep=' ')}, {self.coach_id!r})"
+
+class _CodedColumn:
+    """
+    Dictionary-encoded string column
+    Each distinct value is stored once; rows hold a 32-bit code into the
+    value table. Values are never dropped from the table, which only grows
+    with the number of distinct values.
+    """
+
+    __slots__ = ('codes', 'values', '_codes_by_value')
+
+    def __init__(self):
+        self.codes = array('I')
+        self.values = []
+        self._codes_by_value = {}
+
+    def code(self, value):
+        """Get the code for a value, adding it to the table if new"""
+        code = self._codes_by_value.get(value)
+        if code is None:
+            code = self._codes_by_value[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def __getitem__(self, position):
+        return self.values[self.codes[position]]
+
+    def __len__(self):
+        return len(self.codes)
+
+# Columns that repeat heavily across bookings: the same student books many
+# lessons, and levels, coaches and locations have a handful of values each
+_CODED_FIELDS = ('name', 'email', 'phone', 'experience_level', 'special_requests', 'coach_id', 'location_id')
+
+class BookingColumns:
+    """
+    Array-backed columnar storage for many bookings
+    Lesson starts are an array of epoch minutes (sorted if rows are kept in
+    time order, so it can be bisected directly), lengths an array of 16-bit
+    minutes, calendar sequences an array of counts, and repeated strings are
+    dictionary-encoded. Only booking IDs
+    are kept as one string per row. Rows are materialized as Booking records
+    on access.
+    """
+
+    def __init__(self, bookings=()):
+        self.booking_ids = []
+        self.start_minutes = array('q')
+        self.durations = array('H')
+        self.sequences = array('I')
+        self._coded = {field: _CodedColumn() for field in _CODED_FIELDS}
+        for booking in bookings:
+            self.append(booking)
+
+    def append(self, booking):
+        """Add a booking (record or dict) as the last row"""
+        if not isinstance(booking, Booking):
+            booking = Booking.from_dict(booking)
+        self.booking_ids.append(booking.booking_id)
+        self.start_minutes.append(booking.start_minute)
+        self.durations.append(booking.duration_minutes)
+        self.sequences.append(booking.sequence)
+        for field, column in self._coded.items():
+            column.codes.append(column.code(getattr(booking, field)))
+
+    def insert(self, position, booking):
+        """Add a booking (record or dict) before row position"""
+        if not isinstance(booking, Booking):
+            booking = Booking.from_dict(booking)
+        self.booking_ids.insert(position, booking.booking_id)
+        self.start_minutes.insert(position, booking.start_minute)
+        self.durations.insert(position, booking.duration_minutes)
+        self.sequences.insert(position, booking.sequence)
+        for field, column in self._coded.items():
+            column.codes.insert(position, column.code(getattr(booking, field)))
+
+    def __delitem__(self, position):
+        del self.booking_ids[position]
+        del self.start_minutes[position]
+        del self.durations[position]
+        del self.sequences[position]
+        for column in self._coded.values():
+            del column.codes[position]
+
+    def column(self, field):
+        """Get a read-only, indexable view of one field's values (lesson starts are start_minutes)"""
+        if field == 'booking_id':
+            return self.booking_ids
+        if field == 'duration_minutes':
+            return self.durations
+        if field == 'sequence':
+            return self.sequences
+        return self._coded[field]
+
+    def __getitem__(self, position):
+        coded = self._coded
+        return Booking(
+            self.booking_ids[position],
+            coded['name'][position],
+            coded['email'][position],
+            coded['phone'][position],
+            self.start_minutes[position],
+            self.durations[position],
+            coded['experience_level'][position],
+            coded['special_requests'][position],
+            coded['coach_id'][position],
+            coded['location_id'][position],
+            self.sequences[position]
+        )
+
+    def __iter__(self):
+        for position in range(len(self.booking_ids)):
+            yield self[position]
+
+    def __len__(self):
+        return len(self.booking_ids)
@@ -0,0 +1,181 @@
+import re
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+from utils.booking_archive import get_booking_archive
+from utils.booking_record import MINUTES_PER_DAY, to_epoch_minutes
+from utils.booking_store import (
+    get_booking_store, BOOKING_ADDED, BOOKING_CANCELLED, BOOKINGS_CLEARED, BOOKINGS_RELOADED
+)
+
+_RATE_PATTERN = re.compile(r'\$?\s*(\d+(?:,\d{3})*(?:\.\d+)?)')
+
+# Spare days kept on each side of the Fenwick tree so new bookings rarely force a rebuild
+_DAY_MARGIN = 366
+
+def parse_rate(rates):
+    """Get the numeric price from a rate string like '$75 per hour session'"""
+    match = _RATE_PATTERN.search(rates or '')
+    if not match:
+        return None
+    return float(match.group(1).replace(',', ''))
+
+class _DayTree:
+    """Fenwick tree of lesson counts over a contiguous run of days"""
+
+    def __init__(self, first_day, size, day_counts):
+        self.first_day = first_day
+        self.size = size
+        self._tree = [0] * (size + 1)
+        for day, count in day_counts.items():
+            self.add(day, count)
+
+    def covers(self, day):
+        """Whether day falls inside the tree"""
+        return self.first_day <= day < self.first_day + self.size
+
+    def add(self, day, delta):
+        """Add delta to one day's count in O(log n)"""
+        index = day - self.first_day + 1
+        while index <= self.size:
+            self._tree[index] += delta
+            index += index & -index
+
+    def count_before(self, day):
+        """Number of lessons on days before day, in O(log n)"""
+        index = min(max(day - self.first_day, 0), self.size)
+        total = 0
+        while index:
+            total += self._tree[index]
+            index -= index & -index
+        return total
+
+class BookingStats:
+    """
+    Booking counters kept current from store change events
+    Totals and per-coach counts update in O(1) per insert or cancel and the
+    per-day counts in O(log d) through a Fenwick tree over days. An
+    upcoming window sums its whole days from the tree and bisects only the
+    few lessons on its first and last day. Totals, revenue and the daily
+    average include archived lessons, taken from the archive's manifest.
+    """
+
+    def __init__(self, store, archive):
+        self._store = store
+        self._archive = archive
+        self._lock = threading.Lock()
+        self._reload()
+        store.add_listener(self._on_booking_change)
+
+    def _reload(self):
+        """Rebuild the counters from the store and the archive manifest"""
+        day_lessons = {}
+        coach_counts = {}
+        for booking in self._store.iter_bookings():
+            # Lessons come back in start order, so each day's list stays sorted
+            day_lessons.setdefault(booking.start_minute // MINUTES_PER_DAY, []).append(booking.start_minute)
+            coach_counts[booking['coach_id']] = coach_counts.get(booking['coach_id'], 0) + 1
+        archived = self._archive.summary()
+
+        with self._lock:
+            self._day_lessons = day_lessons
+            self._live_total = sum(map(len, day_lessons.values()))
+            self._coach_counts = coach_counts
+            self._archived_coach_counts = archived['confirmed']
+            self._archived_total = sum(archived['confirmed'].values())
+            self._archived_days = archived['days']
+            self._build_day_tree(to_epoch_minutes(datetime.now()) // MINUTES_PER_DAY)
+
+    def _build_day_tree(self, day):
+        """Rebuild the day tree to span every day with lessons plus day, with a margin either side"""
+        days = list(self._day_lessons) + [day]
+        first_day = min(days) - _DAY_MARGIN
+        self._day_tree = _DayTree(
+            first_day,
+            max(days) + _DAY_MARGIN - first_day + 1,
+            {day: len(lessons) for day, lessons in self._day_lessons.items()}
+        )
+
+    def _on_booking_change(self, event, booking):
+        """Apply one store change to the counters"""
+        if event in (BOOKINGS_CLEARED, BOOKINGS_RELOADED):
+            self._reload()
+            return
+
+        lesson_time = booking.start_minute
+        day = lesson_time // MINUTES_PER_DAY
+        coach_id = booking.coach_id
+        with self._lock:
+            if event == BOOKING_ADDED:
+                insort(self._day_lessons.setdefault(day, []), lesson_time)
+                self._live_total += 1
+                self._coach_counts[coach_id] = self._coach_counts.get(coach_id, 0) + 1
+                if self._day_tree.covers(day):
+                    self._day_tree.add(day, 1)
+                else:
+                    self._build_day_tree(day)
+            elif event == BOOKING_CANCELLED:
+                lessons = self._day_lessons.get(day, [])
+                position = bisect_left(lessons, lesson_time)
+                if position < len(lessons) and lessons[position] == lesson_time:
+                    del lessons[position]
+                    if not lessons:
+                        del self._day_lessons[day]
+                    self._live_total -= 1
+                    self._coach_counts[coach_id] -= 1
+                    self._day_tree.add(day, -1)
+
+    @property
+    def total(self):
+        """Number of confirmed bookings, live and archived"""
+        return self._live_total + self._archived_total
+
+    def upcoming(self, days_ahead, now=None):
+        """Number of bookings from now through the next days_ahead days"""
+        now = now or datetime.now()
+        start = to_epoch_minutes(now)
+        end = to_epoch_minutes(now + timedelta(days=days_ahead))
+        first_day = start // MINUTES_PER_DAY
+        last_day = end // MINUTES_PER_DAY
+        with self._lock:
+            first_lessons = self._day_lessons.get(first_day, [])
+            last_lessons = self._day_lessons.get(last_day, [])
+            if first_day == last_day:
+                return bisect_right(first_lessons, end) - bisect_left(first_lessons, start)
+            whole_days = self._day_tree.count_before(last_day) - self._day_tree.count_before(first_day + 1)
+            return (len(first_lessons) - bisect_left(first_lessons, start)
+                    + whole_days
+                    + bisect_right(last_lessons, end))
+
+    def revenue(self, rates_by_coach):
+        """Total revenue at each coach's rate, or None if no rate can be parsed"""
+        with self._lock:
+            coach_counts = dict(self._coach_counts)
+            for coach_id, count in self._archived_coach_counts.items():
+                coach_counts[coach_id] = coach_counts.get(coach_id, 0) + count
+        total = None
+        for coach_id, rates in rates_by_coach.items():
+            rate = parse_rate(rates)
+            if rate is not None:
+                total = (total or 0) + rate * coach_counts.get(coach_id, 0)
+        return total
+
+    def average_per_day(self):
+        """Average bookings per day that has at least one lesson"""
+        with self._lock:
+            days = len(self._day_lessons) + self._archived_days
+            if not days:
+                return 0
+            return (self._live_total + self._archived_total) / days
+
+_stats = None
+_stats_lock = threading.Lock()
+
+def get_booking_stats():
+    """Get the process-wide booking statistics, loading them on first use"""
+    global _stats
+    if _stats is None:
+        with _stats_lock:
+            if _stats is None:
+                _stats = BookingStats(get_booking_store(), get_booking_archive())
+    return _stats
@@ -0,0 +1,655 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from config.settings import DATABASE_CONFIG, DEFAULT_COACH_ID, DEFAULT_LOCATION_ID
+from utils.booking_record import Booking, new_booking_id, to_epoch_minutes
+from utils.intervals import LessonIntervals, booking_duration, booking_end
+
+# Schema migrations, applied in order and tracked with PRAGMA user_version
+MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS bookings (
+        booking_id TEXT NOT NULL,
+        name TEXT NOT NULL,
+        email TEXT NOT NULL,
+        phone TEXT NOT NULL,
+        datetime TEXT NOT NULL,
+        experience_level TEXT,
+        special_requests TEXT,
+        status TEXT NOT NULL DEFAULT 'confirmed',
+        created_at TEXT NOT NULL,
+        cancelled_at TEXT
+    );
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_bookings_booking_id ON bookings(booking_id);
+    CREATE INDEX IF NOT EXISTS idx_bookings_datetime ON bookings(datetime);
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS reminders_sent (
+        booking_id TEXT PRIMARY KEY,
+        sent_at TEXT NOT NULL
+    );
+    """,
+    """
+    ALTER TABLE bookings ADD COLUMN duration_minutes INTEGER NOT NULL DEFAULT 60;
+    ALTER TABLE bookings ADD COLUMN end_datetime TEXT;
+    UPDATE bookings SET end_datetime = datetime(datetime, '+' || duration_minutes || ' minutes');
+    """,
+    # Bookings are partitioned per coach; (coach_id, datetime) keeps each
+    # coach's capacity checks to that coach's rows
+    f"""
+    ALTER TABLE bookings ADD COLUMN coach_id TEXT NOT NULL DEFAULT '{DEFAULT_COACH_ID}';
+    ALTER TABLE bookings ADD COLUMN location_id TEXT NOT NULL DEFAULT '{DEFAULT_LOCATION_ID}';
+    CREATE INDEX IF NOT EXISTS idx_bookings_coach_datetime ON bookings(coach_id, datetime);
+    """,
+    # Admin-edited settings (coaches, locations, availability, ...), one JSON
+    # document per section, shared by every session like the bookings
+    """
+    CREATE TABLE IF NOT EXISTS settings (
+        section TEXT PRIMARY KEY,
+        data TEXT NOT NULL
+    );
+    """,
+    # Calendar SEQUENCE for each booking, bumped whenever the lesson moves.
+    # Lesson times are whole minutes; trim any seconds older rows hold.
+    """
+    ALTER TABLE bookings ADD COLUMN sequence INTEGER NOT NULL DEFAULT 0;
+    UPDATE bookings SET
+        datetime = strftime('%Y-%m-%d %H:%M:00', datetime),
+        end_datetime = strftime('%Y-%m-%d %H:%M:00', end_datetime)
+    WHERE datetime != strftime('%Y-%m-%d %H:%M:00', datetime)
+        OR end_datetime != strftime('%Y-%m-%d %H:%M:00', end_datetime);
+    """,
+]
+
+# Queries are kept as module constants so sqlite3's statement cache reuses
+# the prepared statements across calls
+_SELECT_BOOKING = (
+    "SELECT booking_id, name, email, phone, datetime, experience_level, special_requests, "
+    "duration_minutes, coach_id, location_id, sequence FROM bookings"
+)
+_INSERT_BOOKING_SQL = (
+    "INSERT INTO bookings (booking_id, name, email, phone, datetime, experience_level, "
+    "special_requests, duration_minutes, end_datetime, coach_id, location_id, created_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+# Most of one coach's lessons in progress at any moment in [start, end).
+# Concurrency only rises when a lesson starts, so it is enough to count the
+# lessons in progress at the window start and at each start inside the
+# window. Lessons are shorter than a day, which bounds the index scan behind
+# each point. One booking ID can be left out, so a lesson being moved does
+# not compete with itself ('' leaves nothing out). Parameters: coach,
+# excluded ID, day-before-start, start, coach, excluded ID, start, end.
+_PEAK_OVERLAP_SQL = (
+    "SELECT COALESCE(MAX(("
+    "SELECT COUNT(*) FROM bookings b WHERE b.coach_id = ? AND b.status = 'confirmed' AND b.booking_id != ? "
+    "AND b.datetime > ? AND b.datetime <= points.t AND b.end_datetime > points.t"
+    ")), 0) FROM ("
+    "SELECT ? AS t UNION SELECT datetime FROM bookings "
+    "WHERE coach_id = ? AND status = 'confirmed' AND booking_id != ? AND datetime > ? AND datetime < ?"
+    ") AS points"
+)
+# Check-and-insert in one statement, so the capacity check and the insert
+# cannot interleave with another writer
+_RESERVE_BOOKING_SQL = (
+    "INSERT INTO bookings (booking_id, name, email, phone, datetime, experience_level, "
+    "special_requests, duration_minutes, end_datetime, coach_id, location_id, created_at) "
+    "SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ? "
+    f"WHERE ({_PEAK_OVERLAP_SQL}) < ?"
+)
+# Check-and-move in one statement, with the lesson itself left out of the
+# count; a move is a new revision of the calendar event
+_RESCHEDULE_BOOKING_SQL = (
+    "UPDATE bookings SET datetime = ?, end_datetime = ?, duration_minutes = ?, sequence = sequence + 1 "
+    "WHERE booking_id = ? AND status = 'confirmed' "
+    f"AND ({_PEAK_OVERLAP_SQL}) < ?"
+)
+# Keyset pagination over (datetime, rowid) so each chunk is a fresh
+# index-ordered query and no cursor is held open between chunks
+_BOOKINGS_CHUNK_SQL = (
+    "SELECT rowid, booking_id, name, email, phone, datetime, experience_level, special_requests, "
+    "duration_minutes, coach_id, location_id, sequence FROM bookings WHERE (datetime, rowid) > (?, ?) AND datetime < ? AND status = 'confirmed' "
+    "ORDER BY datetime, rowid LIMIT ?"
+)
+# Restores keep each row's status and timestamps; existing IDs are skipped
+_IMPORT_BOOKING_SQL = (
+    "INSERT OR IGNORE INTO bookings (booking_id, name, email, phone, datetime, experience_level, "
+    "special_requests, duration_minutes, end_datetime, coach_id, location_id, created_at, status, cancelled_at, "
+    "sequence) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+# All statuses, for analytics over booking history
+_HISTORY_SQL = (
+    "SELECT datetime, created_at, status, experience_level, duration_minutes FROM bookings "
+    "WHERE datetime >= ? AND datetime < ?"
+)
+_COACH_HISTORY_SQL = (
+    "SELECT datetime, created_at, status, experience_level, duration_minutes FROM bookings "
+    "WHERE coach_id = ? AND datetime >= ? AND datetime < ?"
+)
+_GET_BOOKING_SQL = _SELECT_BOOKING + " WHERE booking_id = ? AND status = 'confirmed'"
+_ALL_BOOKINGS_SQL = _SELECT_BOOKING + " WHERE status = 'confirmed' ORDER BY datetime"
+_BOOKINGS_BETWEEN_SQL = (
+    _SELECT_BOOKING + " WHERE datetime >= ? AND datetime <= ? AND status = 'confirmed' "
+    "ORDER BY datetime"
+)
+_COACH_BOOKINGS_BETWEEN_SQL = (
+    _SELECT_BOOKING + " WHERE coach_id = ? AND datetime >= ? AND datetime <= ? "
+    "AND status = 'confirmed' ORDER BY datetime"
+)
+# Confirmed lessons overlapping [start, end), bounded by a day of lookback
+_LESSONS_OVERLAPPING_SQL = (
+    "SELECT coach_id, datetime, end_datetime FROM bookings "
+    "WHERE datetime > ? AND datetime < ? AND end_datetime > ? AND status = 'confirmed' "
+    "ORDER BY datetime"
+)
+_COACH_LESSONS_OVERLAPPING_SQL = (
+    "SELECT coach_id, datetime, end_datetime FROM bookings "
+    "WHERE coach_id = ? AND datetime > ? AND datetime < ? AND end_datetime > ? "
+    "AND status = 'confirmed' ORDER BY datetime"
+)
+_PENDING_REMINDERS_SQL = (
+    _SELECT_BOOKING + " WHERE datetime >= ? AND datetime <= ? AND status = 'confirmed' "
+    "AND NOT EXISTS (SELECT 1 FROM reminders_sent r WHERE r.booking_id = bookings.booking_id) "
+    "ORDER BY datetime"
+)
+_MARK_REMINDER_SENT_SQL = (
+    "INSERT OR IGNORE INTO reminders_sent (booking_id, sent_at) VALUES (?, ?)"
+)
+_CANCEL_BOOKING_SQL = (
+    "UPDATE bookings SET status = 'cancelled', cancelled_at = ? "
+    "WHERE booking_id = ? AND status = 'confirmed'"
+)
+_CLEAR_BOOKINGS_SQL = (
+    "UPDATE bookings SET status = 'cancelled', cancelled_at = ? WHERE status = 'confirmed'"
+)
+# Every column of a row, for archiving and exporting bookings of any status
+ARCHIVE_COLUMNS = (
+    'booking_id', 'name', 'email', 'phone', 'datetime', 'experience_level', 'special_requests',
+    'duration_minutes', 'coach_id', 'location_id', 'status', 'created_at', 'cancelled_at', 'sequence'
+)
+_ROWS_BETWEEN_SQL = (
+    f"SELECT {', '.join(ARCHIVE_COLUMNS)} FROM bookings WHERE datetime >= ? AND datetime < ? "
+    "ORDER BY datetime, rowid"
+)
+_ROWS_CHUNK_SQL = (
+    f"SELECT rowid, {', '.join(ARCHIVE_COLUMNS)} FROM bookings WHERE (datetime, rowid) > (?, ?) AND datetime < ? "
+    "ORDER BY datetime, rowid LIMIT ?"
+)
+_OLDEST_LESSON_SQL = "SELECT MIN(datetime) FROM bookings"
+_DELETE_BOOKING_SQL = "DELETE FROM bookings WHERE booking_id = ?"
+_DELETE_REMINDER_SQL = "DELETE FROM reminders_sent WHERE booking_id = ?"
+_LOAD_SETTINGS_SQL = "SELECT section, data FROM settings"
+_SAVE_SETTING_SQL = "INSERT OR REPLACE INTO settings (section, data) VALUES (?, ?)"
+
+# Outcomes returned by BookingStore.reserve_booking and reschedule_booking
+RESERVED = 'reserved'
+RESCHEDULED = 'rescheduled'
+SLOT_FULL = 'slot_full'
+NOT_FOUND = 'not_found'
+
+# Fresh IDs tried before a generated-ID collision is given up on
+_ID_ATTEMPTS = 3
+
+# Change events passed to BookingStore listeners
+BOOKING_ADDED = 'added'
+BOOKING_CANCELLED = 'cancelled'
+BOOKINGS_CLEARED = 'cleared'
+BOOKINGS_RELOADED = 'reloaded'  # bulk change; listeners should rebuild from the store
+
+def _to_db_datetime(value):
+    """Serialize a datetime so that text ordering matches time ordering"""
+    return value.isoformat(sep=' ', timespec='seconds')
+
+def _to_db_lesson_time(value):
+    """Serialize a lesson start or end, which are kept to the whole minute like Booking records"""
+    return _to_db_datetime(value.replace(second=0, microsecond=0))
+
+def _booking_params(booking):
+    """Get the insert parameters for a booking dict, created now unless it has a created_at"""
+    return (
+        booking['booking_id'],
+        booking['name'],
+        booking['email'],
+        booking['phone'],
+        _to_db_lesson_time(booking['datetime']),
+        booking.get('experience_level'),
+        booking.get('special_requests'),
+        booking_duration(booking),
+        _to_db_lesson_time(booking_end(booking)),
+        booking.get('coach_id') or DEFAULT_COACH_ID,
+        booking.get('location_id') or DEFAULT_LOCATION_ID,
+        _to_db_datetime(booking.get('created_at') or datetime.now()),
+    )
+
+def _import_params(booking):
+    """Get the _IMPORT_BOOKING_SQL parameters for a booking dict, confirmed unless it has a status"""
+    cancelled_at = booking.get('cancelled_at')
+    return _booking_params(booking) + (
+        booking.get('status') or 'confirmed',
+        _to_db_datetime(cancelled_at) if cancelled_at else None,
+        booking.get('sequence') or 0,
+    )
+
+def _overlap_params(coach_id, start, end, exclude_id=''):
+    """Get the _PEAK_OVERLAP_SQL parameters for one coach's window [start, end), leaving out exclude_id"""
+    return (
+        coach_id,
+        exclude_id,
+        _to_db_datetime(start - timedelta(days=1)),
+        _to_db_datetime(start),
+        coach_id,
+        exclude_id,
+        _to_db_datetime(start),
+        _to_db_datetime(end),
+    )
+
+def _capacity(booked, max_slots_per_time):
+    """Get the capacity fields reported after a reservation or move"""
+    return {
+        'booked': booked,
+        'available': max(max_slots_per_time - booked, 0),
+        'total': max_slots_per_time,
+        'is_full': booked >= max_slots_per_time
+    }
+
+def _row_to_booking(row):
+    """Convert a bookings row into a Booking record"""
+    return Booking(
+        row[0], row[1], row[2], row[3], to_epoch_minutes(datetime.fromisoformat(row[4])),
+        row[7], row[5], row[6], row[8], row[9], row[10]
+    )
+
+class BookingStore:
+    """SQLite-backed booking repository shared by every session in the process
+
+    A single connection is opened in WAL mode and guarded by a lock, since
+    Streamlit runs each session's script on its own thread. The lock is held
+    for one method call, which for a reservation or move is the
+    check-and-write statement plus a recount of the window, so the reported
+    capacity reflects that write. Capacity itself is enforced by SQLite
+    inside the check-and-write statement, so writers on other connections
+    cannot overbook either.
+    """
+
+    def __init__(self, path):
+        if path != ':memory:':
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self._lock = threading.RLock()
+        self._listeners = []
+        self.version = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._migrate()
+
+    def _migrate(self):
+        """Apply any schema migrations the database has not seen yet"""
+        with self._lock:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            for number, script in enumerate(MIGRATIONS[version:], start=version + 1):
+                self._conn.executescript(f"BEGIN; {script} PRAGMA user_version = {number}; COMMIT;")
+
+    def add_listener(self, listener):
+        """Register listener(event, booking) to be called after each change
+
+        Events are BOOKING_ADDED, BOOKING_CANCELLED (with the booking),
+        BOOKINGS_CLEARED and BOOKINGS_RELOADED (with None). Listeners let in-memory views update
+        incrementally instead of re-reading the whole table.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, event, booking):
+        """Bump the data version and tell listeners about a change"""
+        with self._lock:
+            self.version += 1
+        for listener in list(self._listeners):
+            listener(event, booking)
+
+    def _insert_new(self, sql, booking, extra_params=()):
+        """
+        Run an insert for a new booking, generating its ID if it has none
+        A generated ID that collides with a stored one is replaced and the
+        insert retried; a caller-supplied ID that collides raises
+        sqlite3.IntegrityError. Returns the cursor and the booking as inserted.
+        """
+        generated = not booking.get('booking_id')
+        for attempt in range(_ID_ATTEMPTS):
+            if generated:
+                booking = dict(booking, booking_id=new_booking_id())
+            try:
+                return self._conn.execute(sql, _booking_params(booking) + extra_params), booking
+            except sqlite3.IntegrityError:
+                if not generated or attempt == _ID_ATTEMPTS - 1:
+                    raise
+
+    def add_booking(self, booking):
+        """Insert a new confirmed booking without a capacity check, returning its ID"""
+        with self._lock:
+            _, booking = self._insert_new(_INSERT_BOOKING_SQL, booking)
+        self._notify(BOOKING_ADDED, Booking.from_dict(booking))
+        return booking['booking_id']
+
+    def reserve_booking(self, booking, max_slots_per_time=3):
+        """Atomically insert a booking only if its lesson window still has capacity
+
+        Capacity is per coach and counts every one of that coach's lessons in
+        progress at the same moment, so lessons of different lengths that
+        overlap compete for the same spots.
+        A booking without a booking_id is given a new one. Returns a dict
+        with 'status' set to RESERVED or SLOT_FULL, the 'booking_id' (None if
+        full) and the window's capacity after the attempt.
+        """
+        window = _overlap_params(
+            booking.get('coach_id') or DEFAULT_COACH_ID, booking['datetime'], booking_end(booking)
+        )
+        with self._lock:
+            cursor, booking = self._insert_new(_RESERVE_BOOKING_SQL, booking, window + (max_slots_per_time,))
+            booked = self._conn.execute(_PEAK_OVERLAP_SQL, window).fetchone()[0]
+        
+        reserved = cursor.rowcount == 1
+        if reserved:
+            self._notify(BOOKING_ADDED, Booking.from_dict(booking))
+        
+        return dict(
+            _capacity(booked, max_slots_per_time),
+            status=RESERVED if reserved else SLOT_FULL,
+            booking_id=booking['booking_id'] if reserved else None
+        )
+
+    def reschedule_booking(self, booking_id, new_datetime, duration_minutes=None, max_slots_per_time=3):
+        """Atomically move a confirmed booking to a new time if that window has capacity
+
+        The lesson keeps its coach, and its length unless duration_minutes is
+        given. Its own spot is not counted against it, so a lesson can always
+        move within its current window. Listeners see the move as a
+        cancellation of the old booking followed by an addition of the new
+        one, so every in-memory count stays consistent, its reminder is
+        re-armed and its calendar sequence goes up by one. Returns a dict with 'status' set to RESCHEDULED, SLOT_FULL
+        or NOT_FOUND, plus the new window's capacity when found.
+        """
+        with self._lock:
+            booking = self.get_booking(booking_id)
+            if booking is None:
+                return {'status': NOT_FOUND}
+            
+            moved_booking = Booking.from_dict(dict(
+                booking,
+                datetime=new_datetime,
+                duration_minutes=duration_minutes or booking.duration_minutes,
+                sequence=booking.sequence + 1
+            ))
+            start = moved_booking.datetime
+            end = booking_end(moved_booking)
+            cursor = self._conn.execute(
+                _RESCHEDULE_BOOKING_SQL,
+                (_to_db_lesson_time(start), _to_db_lesson_time(end), moved_booking.duration_minutes, booking_id)
+                + _overlap_params(booking.coach_id, start, end, exclude_id=booking_id)
+                + (max_slots_per_time,)
+            )
+            moved = cursor.rowcount == 1
+            if moved:
+                self._conn.execute(_DELETE_REMINDER_SQL, (booking_id,))
+            booked = self._conn.execute(
+                _PEAK_OVERLAP_SQL, _overlap_params(booking.coach_id, start, end)
+            ).fetchone()[0]
+        
+        if moved:
+            self._notify(BOOKING_CANCELLED, booking)
+            self._notify(BOOKING_ADDED, moved_booking)
+        
+        return dict(_capacity(booked, max_slots_per_time), status=RESCHEDULED if moved else SLOT_FULL)
+
+    def bulk_add_bookings(self, bookings, notify=True):
+        """
+        Insert a batch of bookings in one transaction, skipping existing IDs
+        A booking dict may carry status, created_at and cancelled_at (as a
+        restore does); otherwise it is a confirmed booking created now.
+        Returns the number of bookings actually inserted. Pass notify=False
+        when loading many batches and call notify_reloaded() once at the end.
+        """
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(_IMPORT_BOOKING_SQL, [_import_params(booking) for booking in bookings])
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            inserted = self._conn.total_changes - before
+        if inserted and notify:
+            self.notify_reloaded()
+        return inserted
+
+    def notify_reloaded(self):
+        """Tell listeners to rebuild their views after bulk changes"""
+        self._notify(BOOKINGS_RELOADED, None)
+
+    def cancel_booking(self, booking_id):
+        """Cancel a booking, returning False if it was not found"""
+        with self._lock:
+            booking = self.get_booking(booking_id)
+            if booking is None:
+                return False
+            self._conn.execute(
+                _CANCEL_BOOKING_SQL, (_to_db_datetime(datetime.now()), booking_id)
+            )
+        self._notify(BOOKING_CANCELLED, booking)
+        return True
+
+    def clear_bookings(self):
+        """Cancel every confirmed booking"""
+        with self._lock:
+            self._conn.execute(_CLEAR_BOOKINGS_SQL, (_to_db_datetime(datetime.now()),))
+        self._notify(BOOKINGS_CLEARED, None)
+
+    def oldest_lesson(self):
+        """Get the earliest lesson time of any row (any status), or None if the table is empty"""
+        with self._lock:
+            oldest = self._conn.execute(_OLDEST_LESSON_SQL).fetchone()[0]
+        return datetime.fromisoformat(oldest) if oldest else None
+
+    def rows_between(self, start, end):
+        """Get every row (any status) with start <= lesson time < end as dicts of ARCHIVE_COLUMNS, in order"""
+        with self._lock:
+            rows = self._conn.execute(_ROWS_BETWEEN_SQL, (_to_db_datetime(start), _to_db_datetime(end))).fetchall()
+        return [dict(zip(ARCHIVE_COLUMNS, row)) for row in rows]
+
+    def delete_bookings(self, booking_ids, notify=True):
+        """
+        Permanently delete bookings (any status) and their reminder records
+        Used once the rows are safely archived. Returns the number deleted.
+        Pass notify=False when deleting many batches and call
+        notify_reloaded() once at the end.
+        """
+        params = [(booking_id,) for booking_id in booking_ids]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(_DELETE_BOOKING_SQL, params)
+                deleted = self._conn.total_changes - before
+                self._conn.executemany(_DELETE_REMINDER_SQL, params)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        if deleted and notify:
+            self.notify_reloaded()
+        return deleted
+
+    def get_booking(self, booking_id):
+        """Look up a single confirmed booking by its ID"""
+        with self._lock:
+            row = self._conn.execute(_GET_BOOKING_SQL, (booking_id,)).fetchone()
+        return _row_to_booking(row) if row else None
+
+    def bookings_between(self, start, end, coach_id=None):
+        """Get confirmed bookings with start <= lesson time <= end, in order, optionally for one coach"""
+        bounds = (_to_db_datetime(start), _to_db_datetime(end))
+        with self._lock:
+            if coach_id is None:
+                rows = self._conn.execute(_BOOKINGS_BETWEEN_SQL, bounds).fetchall()
+            else:
+                rows = self._conn.execute(_COACH_BOOKINGS_BETWEEN_SQL, (coach_id,) + bounds).fetchall()
+        return [_row_to_booking(row) for row in rows]
+
+    def bookings_needing_reminder(self, start, end):
+        """Get bookings between start and end that have not had a reminder yet"""
+        with self._lock:
+            rows = self._conn.execute(
+                _PENDING_REMINDERS_SQL, (_to_db_datetime(start), _to_db_datetime(end))
+            ).fetchall()
+        return [_row_to_booking(row) for row in rows]
+
+    def mark_reminders_sent(self, booking_ids):
+        """Record that reminders went out for the given bookings"""
+        sent_at = _to_db_datetime(datetime.now())
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    _MARK_REMINDER_SENT_SQL, [(booking_id, sent_at) for booking_id in booking_ids]
+                )
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def iter_bookings(self, start=None, end=None, chunk_size=1000):
+        """
+        Yield confirmed bookings with start <= lesson time < end, in order
+        Rows are read chunk_size at a time so memory stays bounded
+        """
+        last_datetime = _to_db_datetime(start) if start else ''
+        last_rowid = -1
+        end_bound = _to_db_datetime(end) if end else '9999-12-31 23:59:59'
+        
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    _BOOKINGS_CHUNK_SQL, (last_datetime, last_rowid, end_bound, chunk_size)
+                ).fetchall()
+            for row in rows:
+                yield _row_to_booking(row[1:])
+            if len(rows) < chunk_size:
+                return
+            last_rowid = rows[-1][0]
+            last_datetime = rows[-1][5]
+
+    def iter_rows(self, start=None, end=None, chunk_size=1000):
+        """
+        Yield every row (any status) with start <= lesson time < end as dicts
+        of ARCHIVE_COLUMNS, in order, reading chunk_size rows at a time
+        """
+        last_datetime = _to_db_datetime(start) if start else ''
+        last_rowid = -1
+        end_bound = _to_db_datetime(end) if end else '9999-12-31 23:59:59'
+        
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    _ROWS_CHUNK_SQL, (last_datetime, last_rowid, end_bound, chunk_size)
+                ).fetchall()
+            for row in rows:
+                yield dict(zip(ARCHIVE_COLUMNS, row[1:]))
+            if len(rows) < chunk_size:
+                return
+            last_rowid = rows[-1][0]
+            last_datetime = rows[-1][5]
+
+    def booking_history_columns(self, start, end, coach_id=None):
+        """
+        Get bookings of any status with start <= lesson time < end as columns
+        Returns a dict of lists: datetime, created_at, status, experience_level,
+        duration_minutes
+        """
+        bounds = (_to_db_datetime(start), _to_db_datetime(end))
+        with self._lock:
+            if coach_id is None:
+                rows = self._conn.execute(_HISTORY_SQL, bounds).fetchall()
+            else:
+                rows = self._conn.execute(_COACH_HISTORY_SQL, (coach_id,) + bounds).fetchall()
+        columns = list(zip(*rows)) if rows else [(), (), (), (), ()]
+        return dict(zip(('datetime', 'created_at', 'status', 'experience_level', 'duration_minutes'), map(list, columns)))
+
+    def _lesson_rows(self, start, end, coach_id):
+        """Get (coach_id, start, end) rows of confirmed lessons overlapping [start, end)"""
+        bounds = (
+            _to_db_datetime(start - timedelta(days=1)),
+            _to_db_datetime(end),
+            _to_db_datetime(start),
+        )
+        with self._lock:
+            if coach_id is None:
+                return self._conn.execute(_LESSONS_OVERLAPPING_SQL, bounds).fetchall()
+            return self._conn.execute(_COACH_LESSONS_OVERLAPPING_SQL, (coach_id,) + bounds).fetchall()
+
+    def lessons_between(self, start, end, coach_id=None):
+        """Get (start, end) pairs of confirmed lessons overlapping [start, end), in order"""
+        return [
+            (datetime.fromisoformat(lesson_start), datetime.fromisoformat(lesson_end))
+            for _, lesson_start, lesson_end in self._lesson_rows(start, end, coach_id)
+        ]
+
+    def lessons_for_date(self, date, coach_id):
+        """Get LessonIntervals of one coach's lessons overlapping a date, touching only that coach's rows"""
+        day_start = datetime.combine(date, datetime.min.time())
+        return LessonIntervals.from_ranges(
+            self.lessons_between(day_start, day_start + timedelta(days=1), coach_id)
+        )
+
+    def lessons_for_date_by_coach(self, date):
+        """Get {coach_id: LessonIntervals} for every coach with lessons on a date, from one query"""
+        day_start = datetime.combine(date, datetime.min.time())
+        by_coach = {}
+        for coach_id, lesson_start, lesson_end in self._lesson_rows(day_start, day_start + timedelta(days=1), None):
+            by_coach.setdefault(coach_id, []).append(
+                (datetime.fromisoformat(lesson_start), datetime.fromisoformat(lesson_end))
+            )
+        return {coach_id: LessonIntervals.from_ranges(ranges) for coach_id, ranges in by_coach.items()}
+
+    def data_version(self):
+        """Get SQLite's data version, which changes when another connection commits"""
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def load_settings(self):
+        """Get every saved settings section as {section: data}"""
+        with self._lock:
+            rows = self._conn.execute(_LOAD_SETTINGS_SQL).fetchall()
+        return {section: json.loads(data) for section, data in rows}
+
+    def save_settings(self, sections):
+        """Save settings sections ({section: JSON-safe data}) in one transaction"""
+        params = [(section, json.dumps(data)) for section, data in sections.items()]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(_SAVE_SETTING_SQL, params)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def close(self):
+        """Close the underlying connection"""
+        with self._lock:
+            self._conn.close()
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_booking_store():
+    """Get the process-wide booking store, opening it on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = BookingStore(DATABASE_CONFIG['path'])
+    return _store
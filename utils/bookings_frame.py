@@ -0,0 +1,143 @@
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from utils.booking_record import BookingColumns, to_epoch_minutes
+from utils.booking_store import (
+    get_booking_store, BOOKING_ADDED, BOOKING_CANCELLED, BOOKINGS_CLEARED, BOOKINGS_RELOADED
+)
+from utils.lru_cache import LRUCache
+
+# Table columns the admin can sort by, mapped to booking fields
+SORTABLE_COLUMNS = {
+    'Date': 'datetime',
+    'Student': 'name',
+    'Email': 'email',
+    'Level': 'experience_level'
+}
+
+class BookingsFrame:
+    """
+    Column-oriented, datetime-sorted view of all confirmed bookings
+    Loaded from the store once, then kept current through store change
+    events. Rows live in array-backed BookingColumns, so date-range
+    filtering is a bisect on the epoch-minute start column and a page only
+    materializes the rows it shows.
+    """
+
+    def __init__(self, store):
+        self._lock = threading.RLock()
+        self._columns = BookingColumns()
+        self._orderings = LRUCache(maxsize=16)
+        self.version = 0
+        self._store = store
+        self._reload()
+        store.add_listener(self._on_booking_change)
+
+    def _reload(self):
+        """Rebuild every column from the store"""
+        columns = BookingColumns(self._store.iter_bookings())
+        with self._lock:
+            self._columns = columns
+            self._changed()
+
+    def _changed(self):
+        """Invalidate cached orderings after a change"""
+        self.version += 1
+        self._orderings.clear()
+
+    def _on_booking_change(self, event, booking):
+        """Apply a store change to the columns"""
+        with self._lock:
+            if event == BOOKING_ADDED:
+                position = bisect_right(self._columns.start_minutes, booking.start_minute)
+                self._columns.insert(position, booking)
+            elif event == BOOKING_CANCELLED:
+                position = self._position(booking.booking_id, booking.start_minute)
+                if position is None:
+                    return
+                del self._columns[position]
+            elif event == BOOKINGS_CLEARED:
+                self._columns = BookingColumns()
+            elif event == BOOKINGS_RELOADED:
+                self._reload()
+                return
+            self._changed()
+
+    def _position(self, booking_id, start_minute):
+        """Find a booking's row by bisecting on its lesson start"""
+        start_minutes = self._columns.start_minutes
+        booking_ids = self._columns.booking_ids
+        for position in range(bisect_left(start_minutes, start_minute),
+                              bisect_right(start_minutes, start_minute)):
+            if booking_ids[position] == booking_id:
+                return position
+        return None
+
+    def _date_bounds(self, start_date, end_date):
+        """Get the row range for lessons from start_date through end_date"""
+        start_minutes = self._columns.start_minutes
+        low = 0
+        high = len(start_minutes)
+        if start_date:
+            low = bisect_left(start_minutes, to_epoch_minutes(datetime.combine(start_date, datetime.min.time())))
+        if end_date:
+            high = bisect_left(
+                start_minutes, to_epoch_minutes(datetime.combine(end_date + timedelta(days=1), datetime.min.time()))
+            )
+        return low, max(low, high)
+
+    def _ordering(self, sort_by, low, high, coach_id=None):
+        """Get row positions in [low, high), optionally for one coach, sorted by a column"""
+        def build():
+            positions = range(low, high)
+            if coach_id is not None:
+                coach_ids = self._columns.column('coach_id')
+                positions = [position for position in positions if coach_ids[position] == coach_id]
+            if sort_by == 'datetime':
+                return list(positions)
+            column = self._columns.column(sort_by)
+            return sorted(positions, key=lambda position: (column[position] or '').lower())
+        return self._orderings.get_or_create((self.version, sort_by, low, high, coach_id), build)
+
+    def query(self, start_date=None, end_date=None, sort_by='datetime', descending=False, offset=0, limit=25,
+              coach_id=None):
+        """
+        Get one page of bookings and the total number of matching rows
+        Sorting all coaches by datetime slices the columns directly; other
+        sorts and per-coach views use a cached ordering of the filtered range
+        """
+        with self._lock:
+            low, high = self._date_bounds(start_date, end_date)
+
+            if sort_by == 'datetime' and coach_id is None:
+                total = high - low
+                offset = min(max(offset, 0), max(total - 1, 0))
+                if descending:
+                    positions = range(high - 1 - offset, max(high - 1 - offset - limit, low - 1), -1)
+                else:
+                    positions = range(low + offset, min(low + offset + limit, high))
+            else:
+                ordering = self._ordering(sort_by, low, high, coach_id)
+                total = len(ordering)
+                offset = min(max(offset, 0), max(total - 1, 0))
+                if descending:
+                    positions = [ordering[total - 1 - rank] for rank in range(offset, min(offset + limit, total))]
+                else:
+                    positions = ordering[offset:offset + limit]
+
+            return [self._columns[position] for position in positions], total
+
+    def __len__(self):
+        return len(self._columns)
+
+_frame = None
+_frame_lock = threading.Lock()
+
+def get_bookings_frame():
+    """Get the process-wide bookings frame, loading it on first use"""
+    global _frame
+    if _frame is None:
+        with _frame_lock:
+            if _frame is None:
+                _frame = BookingsFrame(get_booking_store())
+    return _frame
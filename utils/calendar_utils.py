@@ -1,58 +1,120 @@
-from datetime import datetime, timedelta
-from icalendar import Calendar, Event
-import uuid
+import heapq
+from datetime import datetime, time, timedelta
 import pytz
+from config.settings import APP_SETTINGS
+from utils.availability_rules import as_compiled_availability
+from utils.intervals import as_lesson_intervals, booking_duration, booking_end
+from utils.lru_cache import LRUCache
+from utils.metrics import timed
 
-def get_available_slots(selected_date, availability, existing_bookings, max_slots_per_time=3):
-    """Get available time slots for a given date with multiple bookings per slot"""
-    day_name = selected_date.strftime('%A')
+@timed()
+def get_available_slots(selected_date, availability, existing_bookings, max_slots_per_time=3,
+                        duration_minutes=None, granularity_minutes=None):
+    """Get available time slots for a given date with multiple bookings per slot
+
+    ``availability`` may be CompiledAvailability rules or the weekly template
+    dict, and ``existing_bookings`` LessonIntervals or a plain list of
+    bookings. A slot starts every granularity_minutes and is offered when a
+    lesson of duration_minutes fits the open hours and fewer than
+    max_slots_per_time lessons are in progress at any point during it.
+    """
+    duration_minutes = duration_minutes or APP_SETTINGS['session_duration_minutes']
+    granularity_minutes = granularity_minutes or APP_SETTINGS['slot_granularity_minutes']
+    slot_starts = as_compiled_availability(availability).slot_starts(
+        selected_date, duration_minutes, granularity_minutes
+    )
     
-    if not availability[day_name]['enabled']:
+    if not slot_starts:
         return []
     
-    start_time = datetime.strptime(availability[day_name]['start'], '%H:%M').time()
-    end_time = datetime.strptime(availability[day_name]['end'], '%H:%M').time()
+    lessons = as_lesson_intervals(existing_bookings)
+    day_start = datetime.combine(selected_date, time())
+    duration = timedelta(minutes=duration_minutes)
     
-    # Generate hourly slots
     slots = []
-    current_time = datetime.combine(selected_date, start_time)
-    end_datetime = datetime.combine(selected_date, end_time)
-    
-    while current_time < end_datetime:
-        # Count how many bookings exist for this time slot
-        bookings_count = sum(
-            1 for booking in existing_bookings
-            if (booking['datetime'].date() == selected_date and 
-                booking['datetime'].time() == current_time.time())
-        )
+    for start_minute in slot_starts:
+        slot_start = day_start + timedelta(minutes=start_minute)
+        
+        # Most students already on the field at once during this lesson
+        bookings_count = lessons.peak(slot_start, slot_start + duration)
         
         # Add slot if there's still capacity
         if bookings_count < max_slots_per_time:
             slots_remaining = max_slots_per_time - bookings_count
             slots.append({
-                'time': current_time.time(),
+                'time': slot_start.time(),
                 'available_spots': slots_remaining,
                 'total_spots': max_slots_per_time
             })
-        
-        current_time += timedelta(hours=1)
     
     return slots
 
-def create_calendar_invite(booking_info, coach_info):
-    """Create an iCal calendar invite"""
-    cal = Calendar()
-    cal.add('prodid', '-//Pitching Lessons Scheduler//mxm.dk//')
-    cal.add('version', '2.0')
-    
-    event = Event()
-    event.add('summary', f'Pitching Lesson with {coach_info["name"]}')
-    event.add('dtstart', booking_info['datetime'])
-    event.add('dtend', booking_info['datetime'] + timedelta(hours=1))  # 1-hour sessions
-    event.add('dtstamp', datetime.now())
-    event.add('uid', str(uuid.uuid4()))
+@timed()
+def get_available_slots_any_coach(selected_date, coach_partitions, max_slots_per_time=3,
+                                  duration_minutes=None, granularity_minutes=None):
+    """
+    Get open slots across every coach, ordered by start time
+    ``coach_partitions`` maps coach_id to (availability, existing_bookings).
+    Each coach's slot list is already sorted, so they are combined with a
+    k-way heapq.merge instead of concatenating and re-sorting. Each slot
+    carries the 'coach_id' it belongs to.
+    """
+    per_coach = []
+    for coach_id, (availability, existing_bookings) in coach_partitions.items():
+        slots = get_available_slots(
+            selected_date, availability, existing_bookings, max_slots_per_time,
+            duration_minutes=duration_minutes, granularity_minutes=granularity_minutes
+        )
+        per_coach.append([dict(slot, coach_id=coach_id) for slot in slots])
     
-    description = f"""
+    return list(heapq.merge(*per_coach, key=lambda slot: slot['time']))
+
+ICS_PRODID = '-//Pitching Lessons Scheduler//mxm.dk//'
+DEFAULT_LOCATION_NAME = 'Pitching Facility'
+
+# Serialized invites keyed on booking and coach content
+_invite_cache = LRUCache(maxsize=1024)
+
+def _escape_text(value):
+    """Escape a TEXT property value per RFC 5545 section 3.3.11"""
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+def _fold_line(line):
+    """Fold a content line at 75 octets without splitting UTF-8 characters"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line
+
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        # Back up to the start of a multi-byte character
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+        limit = 74  # continuation lines start with a space
+    return '\r\n '.join(parts)
+
+def _format_local(value):
+    """Format a naive datetime as an RFC 5545 floating local time"""
+    return value.strftime('%Y%m%dT%H%M%S')
+
+def _format_utc(value):
+    """Format a timezone-aware datetime as an RFC 5545 UTC time"""
+    return value.astimezone(pytz.utc).strftime('%Y%m%dT%H%M%SZ')
+
+def create_invite_description(booking_info, coach_info):
+    """Create the description text for a lesson's calendar event"""
+    return f"""
 Pitching Lesson Details:
 Student: {booking_info['name']}
 Email: {booking_info['email']}
@@ -63,40 +125,87 @@ Payment: {coach_info['payment_methods']}
 
 Please bring payment in cash or send via Venmo to {coach_info.get('venmo_handle', 'TBD')} after the lesson.
     """
-    event.add('description', description)
-    event.add('location', 'Pitching Facility')
-    
-    cal.add_component(event)
-    return cal.to_ical()
 
-def is_slot_available(date, time, existing_bookings, max_slots_per_time=3):
-    """Check if a specific date/time slot has available capacity"""
-    booking_datetime = datetime.combine(date, time)
-    
-    # Count existing bookings for this time slot
-    bookings_count = sum(
-        1 for booking in existing_bookings
-        if booking['datetime'] == booking_datetime
+def create_event_block(booking_info, coach_info, location=None, now=None):
+    """
+    Serialize one booking as an RFC 5545 VEVENT block
+    UID comes from the booking ID and SEQUENCE from its revision count, so
+    a calendar replaces a moved lesson instead of adding a second one.
+    DTSTAMP is when the block was serialized (now, a UTC datetime).
+    """
+    start = booking_info['datetime']
+    now = now or datetime.now(pytz.utc)
+    properties = [
+        ('UID', f"{booking_info['booking_id']}@pitching-lessons"),
+        ('SEQUENCE', booking_info.get('sequence') or 0),
+        ('DTSTAMP', _format_utc(now)),
+        ('DTSTART', _format_local(start)),
+        ('DTEND', _format_local(booking_end(booking_info))),
+        ('SUMMARY', _escape_text(f"Pitching Lesson with {coach_info['name']}")),
+        ('DESCRIPTION', _escape_text(create_invite_description(booking_info, coach_info))),
+        ('LOCATION', _escape_text(location or DEFAULT_LOCATION_NAME)),
+    ]
+
+    lines = ['BEGIN:VEVENT']
+    lines.extend(_fold_line(f"{name}:{value}") for name, value in properties)
+    lines.append('END:VEVENT')
+    return '\r\n'.join(lines) + '\r\n'
+
+def wrap_calendar(event_blocks):
+    """Wrap serialized VEVENT blocks in a VCALENDAR"""
+    return (
+        'BEGIN:VCALENDAR\r\n'
+        f'PRODID:{ICS_PRODID}\r\n'
+        'VERSION:2.0\r\n'
+        + ''.join(event_blocks)
+        + 'END:VCALENDAR\r\n'
+    ).encode('utf-8')
+
+def _invite_cache_key(booking_info, coach_info, location):
+    """Key an invite on every field that appears in it"""
+    return (
+        location,
+        booking_info['booking_id'],
+        booking_info['datetime'],
+        booking_duration(booking_info),
+        booking_info.get('sequence') or 0,
+        booking_info['name'],
+        booking_info['email'],
+        booking_info['phone'],
+        coach_info['name'],
+        coach_info['rates'],
+        coach_info['payment_methods'],
+        coach_info.get('venmo_handle')
     )
-    
-    return bookings_count < max_slots_per_time
 
-def get_slot_capacity_info(date, time, existing_bookings, max_slots_per_time=3):
-    """Get capacity information for a specific time slot"""
-    booking_datetime = datetime.combine(date, time)
-    
-    bookings_count = sum(
-        1 for booking in existing_bookings
-        if booking['datetime'] == booking_datetime
+@timed()
+def create_calendar_invite(booking_info, coach_info, location=None):
+    """Create an iCal calendar invite, reusing a cached copy when unchanged"""
+    return _invite_cache.get_or_create(
+        _invite_cache_key(booking_info, coach_info, location),
+        lambda: wrap_calendar([create_event_block(booking_info, coach_info, location)])
     )
+
+@timed()
+def is_slot_available(date, time, existing_bookings, max_slots_per_time=3, duration_minutes=None):
+    """Check if a lesson starting at date/time has available capacity for its whole length"""
+    return get_slot_capacity_info(date, time, existing_bookings, max_slots_per_time, duration_minutes)['available'] > 0
+
+@timed()
+def get_slot_capacity_info(date, time, existing_bookings, max_slots_per_time=3, duration_minutes=None):
+    """Get capacity information for a lesson starting at date/time"""
+    start = datetime.combine(date, time)
+    end = start + timedelta(minutes=duration_minutes or APP_SETTINGS['session_duration_minutes'])
+    bookings_count = as_lesson_intervals(existing_bookings).peak(start, end)
     
     return {
         'booked': bookings_count,
-        'available': max_slots_per_time - bookings_count,
+        'available': max(max_slots_per_time - bookings_count, 0),
         'total': max_slots_per_time,
         'is_full': bookings_count >= max_slots_per_time
     }
 
+@timed()
 def get_upcoming_bookings(bookings, days_ahead=7):
     """Get bookings for the next N days"""
     now = datetime.now()
@@ -109,14 +218,17 @@ def get_upcoming_bookings(bookings, days_ahead=7):
     
     return sorted(upcoming, key=lambda x: x['datetime'])
 
+@timed()
 def format_booking_summary(booking):
     """Format booking information for display"""
+    lesson_time = booking['datetime']
     return {
-        'Date': booking['datetime'].strftime('%Y-%m-%d'),
-        'Time': booking['datetime'].strftime('%I:%M %p'),
+        'Date': lesson_time.strftime('%Y-%m-%d'),
+        'Time': lesson_time.strftime('%I:%M %p'),
         'Student': booking['name'],
         'Email': booking['email'],
         'Phone': booking['phone'],
+        'Duration': f"{booking_duration(booking)} min",
         'Level': booking['experience_level'],
         'ID': booking['booking_id']
     }
@@ -0,0 +1,24 @@
+import re
+
+def new_entity_id(name, existing_ids):
+    """Make a short, stable ID from a name that does not collide with existing IDs"""
+    base = re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-') or 'item'
+    entity_id = base
+    suffix = 2
+    while entity_id in existing_ids:
+        entity_id = f"{base}-{suffix}"
+        suffix += 1
+    return entity_id
+
+def location_label(locations, location_id):
+    """Get 'Name, Address' for a location ID, or None if it is unknown"""
+    location = locations.get(location_id)
+    if not location:
+        return None
+    if location.get('address'):
+        return f"{location['name']}, {location['address']}"
+    return location['name']
+
+def coach_for_booking(coaches, booking):
+    """Get the profile of the coach a booking is with, or None if the coach was removed"""
+    return coaches.get(booking.get('coach_id'))
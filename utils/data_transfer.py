@@ -0,0 +1,292 @@
+import json
+import os
+import tempfile
+from datetime import date, datetime
+from config.settings import DEFAULT_COACH_ID, DEFAULT_LOCATION_ID
+from utils.availability_rules import default_exceptions, parse_minutes
+from utils.booking_archive import get_booking_archive, iter_all_rows
+from utils.booking_store import get_booking_store
+from utils.intervals import DEFAULT_DURATION_MINUTES, booking_duration
+
+EXPORT_FORMAT = 'pitching-lessons'
+# 2: settings partitioned per coach, with locations
+# 3: every booking of any status, with status, created_at and cancelled_at
+# 4: bookings carry their calendar sequence
+EXPORT_VERSION = 4
+
+REQUIRED_BOOKING_FIELDS = ('booking_id', 'name', 'email', 'phone', 'datetime')
+OPTIONAL_BOOKING_FIELDS = ('experience_level', 'special_requests', 'coach_id', 'location_id')
+TIMESTAMP_FIELDS = ('created_at', 'cancelled_at')
+BOOKING_STATUSES = ('confirmed', 'cancelled')
+REQUIRED_COACH_FIELDS = ('name', 'email', 'phone', 'bio', 'rates', 'payment_methods')
+
+def _booking_record(row):
+    """Convert a bookings row (a dict of ARCHIVE_COLUMNS) into a JSON-safe record"""
+    record = {field: row.get(field) for field in REQUIRED_BOOKING_FIELDS + OPTIONAL_BOOKING_FIELDS}
+    record['datetime'] = datetime.fromisoformat(row['datetime']).isoformat()
+    record['duration_minutes'] = booking_duration(row)
+    record['status'] = row['status']
+    record['sequence'] = row.get('sequence') or 0
+    for field in TIMESTAMP_FIELDS:
+        record[field] = datetime.fromisoformat(row[field]).isoformat() if row.get(field) else None
+    return record
+
+def iter_export_lines(settings, store=None):
+    """
+    Yield the full data export as newline-delimited JSON
+    Settings sections (keyed as in SETTINGS_VALIDATORS) come first; bookings
+    of every status follow one record per line, streamed from the archive
+    and the store
+    """
+    store = store or get_booking_store()
+
+    yield json.dumps({
+        'type': 'header',
+        'format': EXPORT_FORMAT,
+        'version': EXPORT_VERSION,
+        'exported_at': datetime.now().isoformat(timespec='seconds')
+    }) + '\n'
+    for section in SETTINGS_VALIDATORS:
+        if section in settings:
+            yield json.dumps({'type': section, 'data': settings[section]}) + '\n'
+
+    for row in iter_all_rows(store=store):
+        yield json.dumps({'type': 'booking', 'data': _booking_record(row)}) + '\n'
+
+def export_all_data(settings, directory=None, store=None):
+    """Stream the full data export into a temporary .ndjson file and return its path"""
+    handle, path = tempfile.mkstemp(prefix='pitching_lessons_', suffix='.ndjson', dir=directory)
+    try:
+        with os.fdopen(handle, 'w', encoding='utf-8') as export_file:
+            for line in iter_export_lines(settings, store=store):
+                export_file.write(line)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+def _parse_local_datetime(value, field):
+    """Parse an ISO datetime, which must be naive local time like every stored time"""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid {field}: {value!r}")
+    if parsed.tzinfo is not None:
+        raise ValueError(f"{field} must be a local time without a UTC offset: {value!r}")
+    return parsed
+
+def parse_booking_record(data):
+    """Validate an imported booking record and convert it to a booking dict"""
+    if not isinstance(data, dict):
+        raise ValueError("booking record must be an object")
+
+    missing = [field for field in REQUIRED_BOOKING_FIELDS if not data.get(field)]
+    if missing:
+        raise ValueError(f"missing fields: {', '.join(missing)}")
+
+    booking = {field: str(data[field]) for field in REQUIRED_BOOKING_FIELDS}
+    for field in OPTIONAL_BOOKING_FIELDS:
+        booking[field] = str(data[field]) if data.get(field) is not None else ''
+    booking['coach_id'] = booking['coach_id'] or DEFAULT_COACH_ID
+    booking['location_id'] = booking['location_id'] or DEFAULT_LOCATION_ID
+
+    booking['datetime'] = _parse_local_datetime(data['datetime'], 'datetime')
+
+    # Exports from before lesson lengths existed have no duration
+    duration = data.get('duration_minutes', DEFAULT_DURATION_MINUTES)
+    if not isinstance(duration, int) or isinstance(duration, bool) or not 0 < duration < 24 * 60:
+        raise ValueError(f"invalid duration_minutes: {duration!r}")
+    booking['duration_minutes'] = duration
+
+    # Exports before version 3 hold confirmed bookings only, without timestamps
+    status = data.get('status') or 'confirmed'
+    if status not in BOOKING_STATUSES:
+        raise ValueError(f"invalid status: {status!r}")
+    booking['status'] = status
+
+    sequence = data.get('sequence', 0)
+    if not isinstance(sequence, int) or isinstance(sequence, bool) or sequence < 0:
+        raise ValueError(f"invalid sequence: {sequence!r}")
+    booking['sequence'] = sequence
+    for field in TIMESTAMP_FIELDS:
+        booking[field] = _parse_local_datetime(data[field], field) if data.get(field) else None
+    return booking
+
+def _keyed(validate, label):
+    """Make a validator for an {id: section} mapping from a single-section validator"""
+    def validate_keyed(data):
+        if not isinstance(data, dict):
+            raise ValueError(f"{label} must be an object keyed by ID")
+        return {key: validate(section) for key, section in data.items()}
+    return validate_keyed
+
+def _validate_availability(data):
+    """Check an imported weekly availability mapping"""
+    if not isinstance(data, dict):
+        raise ValueError("availability must be an object")
+    for day, day_info in data.items():
+        if not isinstance(day_info, dict) or not {'enabled', 'start', 'end'} <= set(day_info):
+            raise ValueError(f"availability for {day} needs enabled, start and end")
+        if not isinstance(day_info['start'], str) or not isinstance(day_info['end'], str):
+            raise ValueError(f"availability for {day} needs 'HH:MM' start and end times")
+        parse_minutes(day_info['start'])
+        parse_minutes(day_info['end'])
+        _validate_ranges(day_info.get('breaks', []), f"breaks for {day}")
+    return data
+
+def _validate_ranges(ranges, label):
+    """Check a list of {'start', 'end'} time ranges"""
+    if not isinstance(ranges, list):
+        raise ValueError(f"{label} must be a list")
+    for item in ranges:
+        if not isinstance(item, dict) or parse_minutes(str(item.get('end'))) <= parse_minutes(str(item.get('start'))):
+            raise ValueError(f"{label} must be start/end pairs that end after they start")
+
+def _validate_availability_exceptions(data):
+    """Check imported blackout dates and date overrides"""
+    if not isinstance(data, dict):
+        raise ValueError("availability_exceptions must be an object")
+    exceptions = default_exceptions()
+    exceptions.update(data)
+    if not isinstance(exceptions['blackout_dates'], list):
+        raise ValueError("blackout_dates must be a list of dates")
+    if not isinstance(exceptions['date_overrides'], dict):
+        raise ValueError("date_overrides must be an object keyed by date")
+    for day in exceptions['blackout_dates']:
+        date.fromisoformat(str(day))
+    for day, ranges in exceptions['date_overrides'].items():
+        date.fromisoformat(str(day))
+        _validate_ranges(ranges, f"override for {day}")
+    return exceptions
+
+def _validate_coach_info(data):
+    """Check an imported coach_info mapping has every field the pages use"""
+    if not isinstance(data, dict):
+        raise ValueError("coach_info must be an object")
+    missing = [field for field in REQUIRED_COACH_FIELDS if field not in data]
+    if missing:
+        raise ValueError(f"coach_info is missing: {', '.join(missing)}")
+    return data
+
+def _validate_coach(data):
+    """Check one imported coach profile"""
+    _validate_coach_info(data)
+    if not isinstance(data.get('location_id'), str):
+        raise ValueError("coach is missing location_id")
+    return data
+
+def _validate_location(data):
+    """Check one imported location"""
+    if not isinstance(data, dict) or not isinstance(data.get('name'), str):
+        raise ValueError("location needs a name")
+    return data
+
+def _validate_testimonials(data):
+    """Check an imported testimonials list"""
+    if not isinstance(data, list) or not all(isinstance(item, dict) and 'name' in item and 'text' in item for item in data):
+        raise ValueError("testimonials must be a list of {name, text} objects")
+    return data
+
+SETTINGS_VALIDATORS = {
+    'locations': _keyed(_validate_location, "locations"),
+    'coaches': _keyed(_validate_coach, "coaches"),
+    'availability': _keyed(_validate_availability, "availability"),
+    'availability_exceptions': _keyed(_validate_availability_exceptions, "availability_exceptions"),
+    'testimonials': _validate_testimonials
+}
+
+def _upgrade_v1_section(record_type, data):
+    """Convert a single-coach version 1 settings section to its per-coach form"""
+    if record_type == 'coach_info':
+        coach = dict(_validate_coach_info(data), location_id=DEFAULT_LOCATION_ID)
+        return 'coaches', {DEFAULT_COACH_ID: coach}
+    if record_type == 'availability':
+        return record_type, {DEFAULT_COACH_ID: _validate_availability(data)}
+    if record_type == 'availability_exceptions':
+        return record_type, {DEFAULT_COACH_ID: _validate_availability_exceptions(data)}
+    return record_type, SETTINGS_VALIDATORS[record_type](data)
+
+def import_data(lines, batch_size=500, max_errors=20, store=None, archive=None):
+    """
+    Validate and load an NDJSON export, reading it line by line
+    Bookings are inserted in batches with their status and timestamps.
+    Booking IDs already in the store or the archive are skipped, so
+    restoring an export into the instance it came from adds nothing.
+    Settings sections are validated and returned for the caller to apply.
+    A line that fails validation is reported and skipped, except a bad
+    header, which stops the import before anything is loaded.
+    """
+    store = store or get_booking_store()
+    archive = archive or get_booking_archive()
+    archived_months = set(archive.months())
+    archived_ids = {}  # month -> IDs in its partition, read on first use
+    result = {
+        'settings': {},
+        'bookings_imported': 0,
+        'bookings_skipped': 0,
+        'errors': []
+    }
+
+    def add_error(line_number, message):
+        if len(result['errors']) < max_errors:
+            result['errors'].append(f"Line {line_number}: {message}")
+
+    def is_archived(booking):
+        month = booking['datetime'].strftime('%Y-%m')
+        if month not in archived_months:
+            return False
+        if month not in archived_ids:
+            archived_ids[month] = archive.booking_ids(month)
+        return booking['booking_id'] in archived_ids[month]
+
+    def flush(batch):
+        live = [booking for booking in batch if not is_archived(booking)]
+        inserted = store.bulk_add_bookings(live, notify=False) if live else 0
+        result['bookings_imported'] += inserted
+        result['bookings_skipped'] += len(batch) - inserted
+
+    batch = []
+    version = EXPORT_VERSION
+    for line_number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line.strip():
+            continue
+
+        record_type = None
+        try:
+            record = json.loads(line)
+            record_type = record.get('type') if isinstance(record, dict) else None
+
+            if record_type == 'header':
+                version = record.get('version', 0)
+                if (record.get('format') != EXPORT_FORMAT or not isinstance(version, int)
+                        or isinstance(version, bool) or version > EXPORT_VERSION):
+                    raise ValueError("not a supported pitching lessons export")
+            elif record_type == 'booking':
+                batch.append(parse_booking_record(record.get('data')))
+            elif version < 2 and record_type in ('coach_info', 'availability', 'availability_exceptions', 'testimonials'):
+                section, data = _upgrade_v1_section(record_type, record.get('data'))
+                result['settings'][section] = data
+            elif record_type in SETTINGS_VALIDATORS:
+                result['settings'][record_type] = SETTINGS_VALIDATORS[record_type](record.get('data'))
+            else:
+                raise ValueError(f"unknown record type {record_type!r}")
+        except (ValueError, TypeError, AttributeError) as e:
+            # Well-formed JSON can still hold values of the wrong type
+            add_error(line_number, str(e) if isinstance(e, ValueError) else f"invalid value ({e})")
+            if record_type == 'header':
+                return dict(result, settings={})
+            result['bookings_skipped'] += record_type == 'booking'
+            continue
+
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+
+    if batch:
+        flush(batch)
+    if result['bookings_imported']:
+        store.notify_reloaded()
+
+    return result
@@ -0,0 +1,234 @@
+import queue
+import smtplib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from config.settings import EMAIL_CONFIG
+
+# Job states reported by EmailDispatcher.get_status
+QUEUED = 'queued'
+SENDING = 'sending'
+RETRYING = 'retrying'
+SENT = 'sent'
+FAILED = 'failed'
+
+class SMTPConnectionPool:
+    """Pool of authenticated SMTP connections reused across messages
+
+    Connecting, STARTTLS and login happen once per pooled connection instead
+    of once per message. Idle connections are checked with NOOP on checkout,
+    so one the server has dropped is replaced before a send fails on it. A
+    connection that fails mid-send is discarded and replaced on the next
+    checkout.
+    """
+
+    def __init__(self, config, size=2):
+        self.config = config
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self):
+        """Open and authenticate a new SMTP connection"""
+        server = smtplib.SMTP(
+            self.config['smtp_server'],
+            self.config['smtp_port'],
+            timeout=self.config.get('timeout', 10)
+        )
+        if self.config.get('use_tls', True):
+            server.starttls()
+        if self.config.get('sender_password'):
+            server.login(self.config['sender_email'], self.config['sender_password'])
+        return server
+
+    def _checkout(self):
+        """Get a live idle connection, closing any the server has dropped, or open a new one"""
+        while True:
+            try:
+                server = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except (smtplib.SMTPException, OSError):
+                pass
+            _close_quietly(server)
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection, returning it to the pool when done"""
+        self._slots.acquire()
+        try:
+            server = self._checkout()
+            try:
+                yield server
+            except smtplib.SMTPServerDisconnected:
+                _close_quietly(server)
+                raise
+            except smtplib.SMTPException:
+                # Protocol-level error (e.g. refused recipient); connection is still usable
+                self._idle.put(server)
+                raise
+            except OSError:
+                _close_quietly(server)
+                raise
+            else:
+                self._idle.put(server)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                _close_quietly(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+def _close_quietly(server):
+    """Close an SMTP connection, ignoring errors from a dead socket"""
+    try:
+        server.quit()
+    except (smtplib.SMTPException, OSError):
+        server.close()
+
+class EmailDispatcher:
+    """Background email delivery with a bounded queue and retry with backoff
+
+    ``submit`` returns immediately with a job ID; the page can poll
+    ``get_status`` for progress while worker threads deliver the messages.
+    """
+
+    def __init__(self, config, transport=None):
+        self.config = config
+        self.pool = SMTPConnectionPool(config, size=config.get('pool_size', 2))
+        self._transport = transport or self.send_now
+        self._queue = queue.Queue(maxsize=config.get('queue_size', 100))
+        self._jobs = OrderedDict()
+        self._jobs_lock = threading.Lock()
+        self._workers = []
+
+    def start(self):
+        """Start the worker threads"""
+        for number in range(self.config.get('worker_count', 2)):
+            worker = threading.Thread(
+                target=self._run, name=f"email-worker-{number}", daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, messages):
+        """Queue a list of email messages for delivery and return the job ID
+
+        If the queue is full the job is marked failed straight away rather
+        than blocking the caller.
+        """
+        job_id = uuid.uuid4().hex
+        self._set_status(job_id, status=QUEUED, attempts=0, error=None, total=len(messages), sent=0)
+
+        try:
+            self._queue.put_nowait((job_id, list(messages)))
+        except queue.Full:
+            self._set_status(job_id, status=FAILED, error="Email queue is full")
+        return job_id
+
+    def get_status(self, job_id):
+        """Get a snapshot of a job's delivery status, or None if unknown"""
+        with self._jobs_lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _set_status(self, job_id, **fields):
+        """Update a job's status, keeping only the most recent jobs"""
+        with self._jobs_lock:
+            job = self._jobs.setdefault(job_id, {'job_id': job_id})
+            job.update(fields)
+            self._jobs.move_to_end(job_id)
+            while len(self._jobs) > self.config.get('status_history', 1000):
+                self._jobs.popitem(last=False)
+
+    def _run(self):
+        """Worker loop: deliver queued jobs until the process exits"""
+        while True:
+            job_id, messages = self._queue.get()
+            try:
+                self._deliver(job_id, messages)
+            finally:
+                self._queue.task_done()
+
+    def _deliver(self, job_id, messages):
+        """Send a job's messages, retrying failures with exponential backoff"""
+        max_retries = self.config.get('max_retries', 3)
+        backoff = self.config.get('retry_backoff_seconds', 2)
+        pending = list(messages)
+        sent = 0
+
+        for attempt in range(1, max_retries + 2):
+            self._set_status(job_id, status=SENDING, attempts=attempt)
+            try:
+                while pending:
+                    self._transport(pending[0])
+                    pending.pop(0)
+                    sent += 1
+                    self._set_status(job_id, sent=sent)
+            except Exception as e:
+                print(f"Email delivery attempt {attempt} failed: {str(e)}")
+                if attempt > max_retries:
+                    self._set_status(job_id, status=FAILED, error=str(e))
+                    return
+                self._set_status(job_id, status=RETRYING, error=str(e))
+                time.sleep(backoff * 2 ** (attempt - 1))
+            else:
+                self._set_status(job_id, status=SENT, error=None)
+                return
+
+    def send_batch(self, messages):
+        """Send messages back to back over a single SMTP session
+
+        Returns the indexes of the messages that were accepted, so callers
+        can record partial progress if the session drops part way through.
+        """
+        sent = []
+        if not self.config.get('enabled', False):
+            for number, message in enumerate(messages):
+                self.send_now(message)
+                sent.append(number)
+            return sent
+
+        try:
+            with self.pool.connection() as server:
+                for number, message in enumerate(messages):
+                    try:
+                        server.send_message(message)
+                        sent.append(number)
+                    except smtplib.SMTPRecipientsRefused as e:
+                        print(f"Email to {message['To']} refused: {str(e)}")
+        except (smtplib.SMTPException, OSError) as e:
+            print(f"Batch email session failed: {str(e)}")
+        return sent
+
+    def send_now(self, message):
+        """Send one message immediately over a pooled SMTP connection"""
+        if not self.config.get('enabled', False):
+            # SMTP not configured; simulate delivery
+            print(f"Email sent to {message['To']}: {message['Subject']}")
+            return
+
+        with self.pool.connection() as server:
+            server.send_message(message)
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+def get_email_dispatcher():
+    """Get the process-wide email dispatcher, starting its workers on first use"""
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                dispatcher = EmailDispatcher(EMAIL_CONFIG)
+                dispatcher.start()
+                _dispatcher = dispatcher
+    return _dispatcher
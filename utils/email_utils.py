@@ -1,12 +1,17 @@
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
 import streamlit as st
 from config.settings import EMAIL_CONFIG
+from utils.metrics import timed
+from utils.calendar_utils import create_calendar_invite, DEFAULT_LOCATION_NAME
+from utils.intervals import booking_duration
+from utils.email_queue import get_email_dispatcher
+from utils.settings_store import get_settings_store
 
-def create_email_body(booking_info, coach_info):
+@timed()
+def create_email_body(booking_info, coach_info, location=None):
     """Create the email body for booking confirmation"""
     
     subject = f"Pitching Lesson Confirmation - {booking_info['datetime'].strftime('%B %d, %Y at %I:%M %p')}"
@@ -19,7 +24,8 @@ Your pitching lesson has been confirmed!
 Lesson Details:
 Date: {booking_info['datetime'].strftime('%A, %B %d, %Y')}
 Time: {booking_info['datetime'].strftime('%I:%M %p')}
-Duration: 1 hour
+Duration: {booking_duration(booking_info)} minutes
+Location: {location or DEFAULT_LOCATION_NAME}
 Coach: {coach_info['name']}
 Rate: {coach_info['rates']}
 
@@ -39,7 +45,8 @@ Best regards,
     
     return subject, body
 
-def create_coach_notification_email(booking_info, coach_info):
+@timed()
+def create_coach_notification_email(booking_info, coach_info, location=None):
     """Create email notification for the coach"""
     
     subject = f"New Booking: {booking_info['name']} - {booking_info['datetime'].strftime('%B %d, %Y at %I:%M %p')}"
@@ -56,7 +63,8 @@ Experience Level: {booking_info['experience_level']}
 Lesson Details:
 Date: {booking_info['datetime'].strftime('%A, %B %d, %Y')}
 Time: {booking_info['datetime'].strftime('%I:%M %p')}
-Duration: 1 hour
+Duration: {booking_duration(booking_info)} minutes
+Location: {location or DEFAULT_LOCATION_NAME}
 
 Special Requests:
 {booking_info['special_requests'] if booking_info['special_requests'] else 'None'}
@@ -66,25 +74,75 @@ Booking ID: {booking_info['booking_id']}
     
     return subject, body
 
-def send_confirmation_email(booking_info, coach_info):
+@timed()
+def build_email_message(to_email, subject, body, attachment=None):
+    """Build a plain-text email, optionally with a calendar invite attached"""
+    
+    msg = MIMEMultipart()
+    msg['From'] = EMAIL_CONFIG['sender_email']
+    msg['To'] = to_email
+    msg['Subject'] = subject
+    
+    msg.attach(MIMEText(body, 'plain'))
+    
+    if attachment:
+        part = MIMEBase('text', 'calendar')
+        part.set_payload(attachment)
+        encoders.encode_base64(part)
+        part.add_header(
+            'Content-Disposition',
+            'attachment; filename="calendar_invite.ics"'
+        )
+        msg.attach(part)
+    
+    return msg
+
+@timed()
+def create_confirmation_messages(booking_info, coach_info, location=None):
+    """Build the student confirmation (with calendar invite) and the coach notification"""
+    
+    student_subject, student_body = create_email_body(booking_info, coach_info, location)
+    coach_subject, coach_body = create_coach_notification_email(booking_info, coach_info, location)
+    invite = create_calendar_invite(booking_info, coach_info, location)
+    
+    return [
+        build_email_message(booking_info['email'], student_subject, student_body, attachment=invite),
+        build_email_message(coach_info['email'], coach_subject, coach_body)
+    ]
+
+def email_notifications_enabled():
+    """Whether booking confirmation emails are switched on in the shared notification settings"""
+    sections, _ = get_settings_store().snapshot()
+    return sections['notification_settings']['email_notifications']
+
+@timed()
+def queue_confirmation_email(booking_info, coach_info, location=None):
+    """
+    Queue confirmation emails for background delivery
+    Returns a job ID that can be polled with get_email_status, or None
+    when email notifications are switched off
+    """
+    
+    if not email_notifications_enabled():
+        return None
+    
+    messages = create_confirmation_messages(booking_info, coach_info, location)
+    return get_email_dispatcher().submit(messages)
+
+def get_email_status(job_id):
+    """Get the delivery status of a queued email job"""
+    return get_email_dispatcher().get_status(job_id)
+
+@timed()
+def send_confirmation_email(booking_info, coach_info, location=None):
     """
     Send confirmation email to student and notification to coach
-    Note: This is a template - in production you'd need to configure SMTP
+    Blocks until both are delivered; prefer queue_confirmation_email in pages
     """
     
     try:
-        # In a real implementation, you would:
-        # 1. Set up SMTP connection
-        # 2. Create email with calendar invite
-        # 3. Send to both student and coach
-        
-        # For now, we'll simulate successful email sending
-        student_subject, student_body = create_email_body(booking_info, coach_info)
-        coach_subject, coach_body = create_coach_notification_email(booking_info, coach_info)
-        
-        # Simulate email sending
-        print(f"Email sent to {booking_info['email']}: {student_subject}")
-        print(f"Notification sent to {coach_info['email']}: {coach_subject}")
+        for message in create_confirmation_messages(booking_info, coach_info, location):
+            get_email_dispatcher().send_now(message)
         
         return True
         
@@ -92,42 +150,17 @@ def send_confirmation_email(booking_info, coach_info):
         print(f"Email sending failed: {str(e)}")
         return False
 
+@timed()
 def send_email_smtp(to_email, subject, body, attachment=None):
     """
-    Production-ready email sending function
-    Uncomment and configure for actual email sending
+    Send a single email over a pooled SMTP connection
+    Set EMAIL_CONFIG['enabled'] to True to deliver for real
     """
     
-    # Uncomment below for production use:
-    """
     try:
-        msg = MIMEMultipart()
-        msg['From'] = EMAIL_CONFIG['sender_email']
-        msg['To'] = to_email
-        msg['Subject'] = subject
-        
-        msg.attach(MIMEText(body, 'plain'))
-        
-        if attachment:
-            part = MIMEBase('application', 'octet-stream')
-            part.set_payload(attachment)
-            encoders.encode_base64(part)
-            part.add_header(
-                'Content-Disposition',
-                'attachment; filename= calendar_invite.ics'
-            )
-            msg.attach(part)
-        
-        server = smtplib.SMTP(EMAIL_CONFIG['smtp_server'], EMAIL_CONFIG['smtp_port'])
-        server.starttls()
-        server.login(EMAIL_CONFIG['sender_email'], EMAIL_CONFIG['sender_password'])
-        text = msg.as_string()
-        server.sendmail(EMAIL_CONFIG['sender_email'], to_email, text)
-        server.quit()
-        
+        message = build_email_message(to_email, subject, body, attachment)
+        get_email_dispatcher().send_now(message)
         return True
     except Exception as e:
         print(f"SMTP Error: {str(e)}")
         return False
-    """
-    pass
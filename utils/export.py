@@ -0,0 +1,68 @@
+import csv
+import gzip
+import io
+import os
+import tempfile
+from utils.booking_archive import iter_all_bookings
+from utils.calendar_utils import format_booking_summary
+from utils.coaches import coach_for_booking
+
+# Columns available for export, in the order they are written
+EXPORT_COLUMNS = ['Date', 'Time', 'Duration', 'Coach', 'Student', 'Email', 'Phone', 'Level', 'ID', 'Special Requests']
+
+def _export_row(booking, coaches):
+    """Format one booking with every exportable column"""
+    row = format_booking_summary(booking)
+    coach_info = coach_for_booking(coaches, booking)
+    row['Coach'] = coach_info['name'] if coach_info else booking['coach_id']
+    row['Special Requests'] = booking.get('special_requests') or ''
+    return row
+
+def iter_bookings_csv(start=None, end=None, columns=None, chunk_size=1000, store=None, coaches=None):
+    """
+    Yield a bookings CSV as text chunks, one chunk per block of rows
+    Bookings are streamed from the archive and the store, so only one chunk
+    is ever in memory. The Coach column holds the name from coaches
+    ({coach_id: profile}), or the coach ID for a coach no longer listed.
+    """
+    coaches = coaches or {}
+    columns = columns or EXPORT_COLUMNS
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore')
+    writer.writeheader()
+
+    rows_in_buffer = 0
+    for booking in iter_all_bookings(start, end, chunk_size=chunk_size, store=store):
+        writer.writerow(_export_row(booking, coaches))
+        rows_in_buffer += 1
+        if rows_in_buffer >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            rows_in_buffer = 0
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def export_bookings_csv(start=None, end=None, columns=None, compress=False, directory=None, store=None, coaches=None):
+    """
+    Stream a bookings CSV into a temporary file and return its path
+    With compress=True the file is gzipped as it is written
+    """
+    suffix = '.csv.gz' if compress else '.csv'
+    handle, path = tempfile.mkstemp(prefix='bookings_', suffix=suffix, dir=directory)
+
+    try:
+        with os.fdopen(handle, 'wb') as raw_file:
+            output = gzip.GzipFile(fileobj=raw_file, mode='wb') if compress else raw_file
+            try:
+                for chunk in iter_bookings_csv(start, end, columns, store=store, coaches=coaches):
+                    output.write(chunk.encode('utf-8'))
+            finally:
+                if compress:
+                    output.close()
+    except Exception:
+        os.remove(path)
+        raise
+
+    return path
@@ -0,0 +1,149 @@
+import hashlib
+import heapq
+import os
+import threading
+from datetime import datetime
+from config.settings import ICS_FEED_CONFIG
+from utils.booking_store import (
+    get_booking_store, BOOKING_ADDED, BOOKING_CANCELLED, BOOKINGS_CLEARED, BOOKINGS_RELOADED
+)
+from utils.calendar_utils import create_event_block, wrap_calendar
+from utils.coaches import location_label
+
+def _coach_key(coach_info, locations):
+    """Key on the coach and location fields that appear in events"""
+    return (
+        coach_info['name'],
+        coach_info['rates'],
+        coach_info['payment_methods'],
+        coach_info.get('venmo_handle'),
+        tuple(sorted((location_id, location_label(locations, location_id)) for location_id in locations))
+    )
+
+def _event_digest(block):
+    """Get a 64-bit digest of one serialized event"""
+    return int.from_bytes(hashlib.sha1(block.encode('utf-8')).digest()[:8], 'big')
+
+class CoachFeed:
+    """
+    Multi-event .ics feed of one coach's upcoming bookings
+    Events are serialized once and kept; booking changes only re-serialize
+    the affected events. The ETag is an XOR of per-event digests, so it is
+    updated in O(1) per change and an unchanged feed is served from cache.
+    """
+
+    def __init__(self, store, coach_id):
+        self._store = store
+        self.coach_id = coach_id
+        self._lock = threading.Lock()
+        self._events = {}
+        self._expiry = []
+        self._pending = {}
+        self._loaded = False
+        self._coach_key = None
+        self._digest = 0
+        self._rendered = None
+        self._written_etag = None
+        store.add_listener(self._on_booking_change)
+
+    def _on_booking_change(self, event, booking):
+        """Queue a changed booking for re-serialization on the next render"""
+        with self._lock:
+            if event in (BOOKINGS_CLEARED, BOOKINGS_RELOADED):
+                self._loaded = False
+            elif booking['coach_id'] != self.coach_id:
+                return
+            elif event == BOOKING_ADDED:
+                self._pending[booking['booking_id']] = booking
+            elif event == BOOKING_CANCELLED:
+                self._pending[booking['booking_id']] = None
+
+    def _add_event(self, booking, coach_info, locations):
+        """Serialize one booking into the feed"""
+        block = create_event_block(booking, coach_info, location_label(locations, booking['location_id']))
+        digest = _event_digest(block)
+        self._events[booking['booking_id']] = (booking['datetime'], block, digest)
+        heapq.heappush(self._expiry, (booking['datetime'], booking['booking_id']))
+        self._digest ^= digest
+
+    def _remove_event(self, booking_id):
+        """Drop one booking from the feed"""
+        removed = self._events.pop(booking_id, None)
+        if removed:
+            self._digest ^= removed[2]
+        return removed is not None
+
+    def _reload(self, coach_info, locations, now):
+        """Serialize every upcoming booking from scratch"""
+        self._events = {}
+        self._expiry = []
+        self._pending = {}
+        self._digest = 0
+        for booking in self._store.bookings_between(now, datetime.max, coach_id=self.coach_id):
+            self._add_event(booking, coach_info, locations)
+        self._coach_key = _coach_key(coach_info, locations)
+        self._loaded = True
+        self._rendered = None
+
+    def _apply_pending(self, coach_info, locations, now):
+        """Re-serialize only the bookings that changed since the last render"""
+        changed = False
+        for booking_id, booking in self._pending.items():
+            changed |= self._remove_event(booking_id)
+            if booking is not None and booking['datetime'] >= now:
+                self._add_event(booking, coach_info, locations)
+                changed = True
+        self._pending = {}
+
+        # Drop lessons that have started since the last render
+        while self._expiry and self._expiry[0][0] < now:
+            start, booking_id = heapq.heappop(self._expiry)
+            event = self._events.get(booking_id)
+            if event and event[0] == start:
+                changed |= self._remove_event(booking_id)
+
+        if changed:
+            self._rendered = None
+
+    def render(self, coach_info, locations, now=None):
+        """Get (etag, ics bytes) for the feed, reusing the last output when unchanged"""
+        now = now or datetime.now()
+        with self._lock:
+            if not self._loaded or _coach_key(coach_info, locations) != self._coach_key:
+                self._reload(coach_info, locations, now)
+            else:
+                self._apply_pending(coach_info, locations, now)
+
+            if self._rendered is None:
+                blocks = [block for _, block, _ in sorted(self._events.values())]
+                etag = f'"{self._digest:016x}-{len(self._events)}"'
+                self._rendered = (etag, wrap_calendar(blocks))
+            return self._rendered
+
+    def write_if_changed(self, coach_info, locations, path=None):
+        """Write the feed to disk unless the file already holds this version"""
+        path = path or ICS_FEED_CONFIG['path'].format(coach_id=self.coach_id)
+        etag, data = self.render(coach_info, locations)
+        if etag == self._written_etag and os.path.exists(path):
+            return etag
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as feed_file:
+            feed_file.write(data)
+        os.replace(temp_path, path)
+        self._written_etag = etag
+        return etag
+
+_feeds = {}
+_feeds_lock = threading.Lock()
+
+def get_coach_feed(coach_id):
+    """Get the process-wide calendar feed for one coach"""
+    feed = _feeds.get(coach_id)
+    if feed is None:
+        with _feeds_lock:
+            feed = _feeds.get(coach_id)
+            if feed is None:
+                feed = _feeds[coach_id] = CoachFeed(get_booking_store(), coach_id)
+    return feed
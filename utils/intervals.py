@@ -0,0 +1,98 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import timedelta
+
+# Bookings made before lesson lengths existed were all one hour
+DEFAULT_DURATION_MINUTES = 60
+
+def booking_duration(booking):
+    """Get a booking's lesson length in minutes"""
+    return booking.get('duration_minutes') or DEFAULT_DURATION_MINUTES
+
+def booking_end(booking):
+    """Get the datetime a booking's lesson ends"""
+    return booking['datetime'] + timedelta(minutes=booking_duration(booking))
+
+def _remove_sorted(values, value):
+    """Remove one occurrence of value from a sorted list, returning whether it was there"""
+    position = bisect_left(values, value)
+    if position < len(values) and values[position] == value:
+        del values[position]
+        return True
+    return False
+
+class LessonIntervals:
+    """
+    Half-open [start, end) lesson intervals kept as two sorted arrays
+    Starts and ends are sorted independently, so the number of lessons
+    overlapping a window is two bisects: lessons that start before the window
+    ends minus lessons that ended by the time it starts. Peak concurrency
+    inside a window sweeps only the starts and ends that fall within it.
+    """
+
+    def __init__(self):
+        self._starts = []
+        self._ends = []
+
+    @classmethod
+    def from_bookings(cls, bookings):
+        """Build intervals from a plain list of booking dicts"""
+        return cls.from_ranges((booking['datetime'], booking_end(booking)) for booking in bookings)
+
+    @classmethod
+    def from_ranges(cls, ranges):
+        """Build intervals from (start, end) pairs"""
+        intervals = cls()
+        for start, end in ranges:
+            intervals._starts.append(start)
+            intervals._ends.append(end)
+        intervals._starts.sort()
+        intervals._ends.sort()
+        return intervals
+
+    def add(self, start, end):
+        """Record a lesson"""
+        insort(self._starts, start)
+        insort(self._ends, end)
+
+    def remove(self, start, end):
+        """Drop a lesson, ignoring ones that were never added"""
+        if _remove_sorted(self._starts, start):
+            _remove_sorted(self._ends, end)
+
+    def overlap_count(self, start, end):
+        """Get the number of lessons that overlap [start, end) at all"""
+        return bisect_left(self._starts, end) - bisect_right(self._ends, start)
+
+    def active_at(self, moment):
+        """Get the number of lessons in progress at a moment"""
+        return bisect_right(self._starts, moment) - bisect_right(self._ends, moment)
+
+    def peak(self, start, end):
+        """Get the most lessons in progress at any one moment in [start, end)"""
+        active = self.active_at(start)
+        peak = active
+
+        # Sweep the starts and ends inside the window; at equal times the end
+        # is applied first since intervals are half-open
+        start_index = bisect_right(self._starts, start)
+        start_stop = bisect_left(self._starts, end)
+        end_index = bisect_right(self._ends, start)
+        end_stop = bisect_left(self._ends, end)
+        while start_index < start_stop:
+            if end_index < end_stop and self._ends[end_index] <= self._starts[start_index]:
+                active -= 1
+                end_index += 1
+            else:
+                active += 1
+                start_index += 1
+                peak = max(peak, active)
+        return peak
+
+    def __len__(self):
+        return len(self._starts)
+
+def as_lesson_intervals(existing_bookings):
+    """Return LessonIntervals, building them from a plain booking list if needed"""
+    if isinstance(existing_bookings, LessonIntervals):
+        return existing_bookings
+    return LessonIntervals.from_bookings(existing_bookings)
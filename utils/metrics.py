@@ -0,0 +1,152 @@
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from config.settings import METRICS_CONFIG
+
+# Upper bounds in seconds, from ten microseconds to ten seconds
+BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025,
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_NAME = 'pitching_function_duration_seconds'
+
+class Histogram:
+    """
+    Thread-safe latency histogram with fixed buckets
+    Observing is a bisect and two additions under a lock, so it is cheap
+    enough to run on every call of a hot function.
+    """
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(buckets) + 1)  # last slot counts values over every bound
+        self._count = 0
+        self._sum = 0.0
+
+    def observe(self, seconds):
+        """Record one measurement"""
+        position = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[position] += 1
+            self._count += 1
+            self._sum += seconds
+
+    def snapshot(self):
+        """Get the count, sum and per-bucket counts at one moment"""
+        with self._lock:
+            return {'count': self._count, 'sum': self._sum, 'counts': list(self._counts)}
+
+    def quantile(self, fraction, snapshot=None):
+        """Estimate a quantile by interpolating within its bucket, as Prometheus does"""
+        snapshot = snapshot or self.snapshot()
+        if not snapshot['count']:
+            return None
+        rank = fraction * snapshot['count']
+        seen = 0
+        for position, count in enumerate(snapshot['counts']):
+            if seen + count >= rank and count:
+                if position == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[position - 1] if position else 0.0
+                return lower + (self.buckets[position] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+_enabled = METRICS_CONFIG['enabled']
+
+def metrics_enabled():
+    """Check whether timings are being recorded"""
+    return _enabled
+
+def set_metrics_enabled(enabled):
+    """Turn timing on or off for the whole process"""
+    global _enabled
+    _enabled = bool(enabled)
+
+def get_histogram(name):
+    """Get the histogram for a metric name, creating it on first use"""
+    histogram = _histograms.get(name)
+    if histogram is None:
+        with _histograms_lock:
+            histogram = _histograms.setdefault(name, Histogram())
+    return histogram
+
+def timed(name=None):
+    """
+    Decorator that records each call's duration under name (default: module.function)
+    While metrics are disabled the wrapper only checks one flag before calling through.
+    """
+    def decorate(func):
+        metric = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                get_histogram(metric).observe(time.perf_counter() - started)
+        return wrapper
+    return decorate
+
+def reset_metrics():
+    """Drop every recorded measurement"""
+    with _histograms_lock:
+        _histograms.clear()
+
+def metrics_summary():
+    """Get call counts, total time and estimated percentiles per metric, slowest total first"""
+    rows = []
+    for name, histogram in list(_histograms.items()):
+        snapshot = histogram.snapshot()
+        if not snapshot['count']:
+            continue
+        rows.append({
+            'Function': name,
+            'Calls': snapshot['count'],
+            'Total (ms)': round(snapshot['sum'] * 1000, 1),
+            'Mean (ms)': round(snapshot['sum'] / snapshot['count'] * 1000, 2),
+            'p50 (ms)': round(histogram.quantile(0.50, snapshot) * 1000, 2),
+            'p95 (ms)': round(histogram.quantile(0.95, snapshot) * 1000, 2),
+            'p99 (ms)': round(histogram.quantile(0.99, snapshot) * 1000, 2)
+        })
+    return sorted(rows, key=lambda row: row['Total (ms)'], reverse=True)
+
+def _label_value(value):
+    """Escape a Prometheus label value"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def render_prometheus():
+    """Render every histogram in the Prometheus text exposition format"""
+    lines = [
+        f"# HELP {METRIC_NAME} Time spent in page renders and calendar/email calls.",
+        f"# TYPE {METRIC_NAME} histogram"
+    ]
+    for name, histogram in sorted(_histograms.items()):
+        snapshot = histogram.snapshot()
+        label = f'function="{_label_value(name)}"'
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, snapshot['counts']):
+            cumulative += count
+            lines.append(f'{METRIC_NAME}_bucket{{{label},le="{bound}"}} {cumulative}')
+        lines.append(f'{METRIC_NAME}_bucket{{{label},le="+Inf"}} {snapshot["count"]}')
+        lines.append(f'{METRIC_NAME}_sum{{{label}}} {snapshot["sum"]:.6f}')
+        lines.append(f'{METRIC_NAME}_count{{{label}}} {snapshot["count"]}')
+    return '\n'.join(lines) + '\n'
+
+def write_prometheus(path=None):
+    """Write the metrics to a text-format file (e.g. for a node_exporter textfile collector)"""
+    path = path or METRICS_CONFIG['path']
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as metrics_file:
+        metrics_file.write(render_prometheus())
+    os.replace(temp_path, path)
+    return path
@@ -0,0 +1,176 @@
+import threading
+from datetime import datetime, timedelta
+from string import Template
+from utils.booking_store import get_booking_store
+from utils.calendar_utils import DEFAULT_LOCATION_NAME
+from utils.coaches import coach_for_booking, location_label
+from utils.email_queue import get_email_dispatcher
+from utils.email_utils import build_email_message
+from utils.settings_store import get_settings_store
+
+REMINDER_SUBJECT = "Reminder: Pitching Lesson on $date at $time"
+
+REMINDER_BODY = """
+Dear $student,
+
+This is a friendly reminder about your upcoming pitching lesson.
+
+Lesson Details:
+Date: $long_date
+Time: $time
+Location: $location
+Coach: $coach
+Rate: $rates
+
+Payment Information:
+$payment_methods
+Venmo: $venmo
+
+Please arrive 10 minutes early and bring your glove and water bottle.
+If you can no longer make it, please contact the coach at $coach_email or $coach_phone.
+
+Best regards,
+$coach
+"""
+
+def create_reminder_templates(coach_info):
+    """Pre-render the coach details into the reminder templates
+
+    The result only needs booking fields substituted, so a batch renders the
+    shared parts of the message once.
+    """
+    coach_fields = {
+        'coach': coach_info['name'],
+        'rates': coach_info['rates'],
+        'payment_methods': coach_info['payment_methods'],
+        'venmo': coach_info.get('venmo_handle', 'Ask coach for details'),
+        'coach_email': coach_info['email'],
+        'coach_phone': coach_info['phone']
+    }
+    # Escape '$' (e.g. in "$75 per hour") so the second pass leaves it alone
+    coach_fields = {key: str(value).replace('$', '$$') for key, value in coach_fields.items()}
+    return (
+        Template(REMINDER_SUBJECT),
+        Template(Template(REMINDER_BODY).safe_substitute(coach_fields))
+    )
+
+def create_reminder_message(booking, templates, location=None):
+    """Render a reminder email for one booking from pre-rendered templates"""
+    subject_template, body_template = templates
+    fields = {
+        'location': location or DEFAULT_LOCATION_NAME,
+        'student': booking['name'],
+        'date': booking['datetime'].strftime('%B %d, %Y'),
+        'long_date': booking['datetime'].strftime('%A, %B %d, %Y'),
+        'time': booking['datetime'].strftime('%I:%M %p')
+    }
+    return build_email_message(
+        booking['email'],
+        subject_template.substitute(fields),
+        body_template.substitute(fields)
+    )
+
+def send_reminder_emails(coaches, locations, hours_ahead=24, now=None, store=None):
+    """
+    Send reminders for every lesson in the next `hours_ahead` hours
+    Bookings that already had a reminder are skipped, so re-running is safe.
+    Each reminder is signed by the booking's own coach.
+    """
+    store = store or get_booking_store()
+    now = now or datetime.now()
+
+    # One indexed range query, already excluding reminded bookings
+    bookings = store.bookings_needing_reminder(now, now + timedelta(hours=hours_ahead))
+    if not bookings:
+        return {'sent': 0, 'failed': 0}
+
+    # Coach details are rendered into the templates once per coach
+    templates = {}
+    messages = []
+    reminded = []
+    for booking in bookings:
+        coach_id = booking.get('coach_id')
+        if coach_id not in templates:
+            coach_info = coach_for_booking(coaches, booking)
+            templates[coach_id] = create_reminder_templates(coach_info) if coach_info else None
+        if templates[coach_id] is None:
+            continue
+        messages.append(create_reminder_message(
+            booking, templates[coach_id], location_label(locations, booking.get('location_id'))
+        ))
+        reminded.append(booking)
+
+    # Whole batch over a single SMTP session
+    sent = get_email_dispatcher().send_batch(messages) if messages else []
+    store.mark_reminders_sent([reminded[number]['booking_id'] for number in sent])
+
+    return {'sent': len(sent), 'failed': len(bookings) - len(sent)}
+
+class ReminderScheduler:
+    """
+    Background thread that sends due reminders on a fixed interval
+    Each run signs reminders with the coaches and locations currently in
+    the settings store, so profile edits apply without a restart.
+    """
+
+    def __init__(self, interval_minutes=15, hours_ahead=24):
+        self.interval_minutes = interval_minutes
+        self.hours_ahead = hours_ahead
+        self._enabled = False
+        self._wake = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        """Whether automatic reminders are currently switched on"""
+        return self._enabled
+
+    def enable(self):
+        """Start sending automatic reminders signed by each booking's coach; a no-op if already on"""
+        with self._lock:
+            if self._enabled:
+                return
+            self._enabled = True
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="reminder-scheduler", daemon=True
+                )
+                self._thread.start()
+        self._wake.set()
+
+    def disable(self):
+        """Stop sending automatic reminders"""
+        with self._lock:
+            self._enabled = False
+
+    def _run(self):
+        """Check for due reminders until the process exits"""
+        while True:
+            if self._enabled:
+                try:
+                    sections, _ = get_settings_store().snapshot()
+                    send_reminder_emails(sections['coaches'], sections['locations'], hours_ahead=self.hours_ahead)
+                except Exception as e:
+                    print(f"Reminder run failed: {str(e)}")
+            self._wake.wait(self.interval_minutes * 60)
+            self._wake.clear()
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_reminder_scheduler():
+    """Get the process-wide reminder scheduler"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = ReminderScheduler()
+    return _scheduler
+
+def sync_reminder_scheduler(notification_settings):
+    """Run automatic reminders exactly while the reminder_emails setting is on"""
+    if notification_settings['reminder_emails']:
+        get_reminder_scheduler().enable()
+    else:
+        get_reminder_scheduler().disable()
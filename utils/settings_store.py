@@ -0,0 +1,68 @@
+import threading
+from config.settings import default_shared_settings, default_weekly_availability
+from utils.availability_rules import availability_fingerprint, compile_availability, default_exceptions
+from utils.booking_store import get_booking_store
+
+# Sections kept in the settings store; anything else stays per session
+SHARED_SECTIONS = tuple(default_shared_settings())
+
+class SettingsStore:
+    """
+    Coaches, locations, availability and session settings shared by every session
+    Each section is saved as JSON in the booking database and cached here
+    once per process, with every coach's availability compiled once. The
+    cached sections are shared between sessions, so treat them as
+    read-only: an edit builds a new copy and goes through save(). Changes
+    saved by another process are picked up on the next snapshot().
+    """
+
+    def __init__(self, store):
+        self._store = store
+        self._lock = threading.Lock()
+        self._sections = {}
+        self._compiled = {}
+        self._data_version = store.data_version()
+        self._apply(dict(default_shared_settings(), **store.load_settings()))
+
+    def _apply(self, sections):
+        """Cache sections, giving every coach availability rules and recompiling only the ones that changed"""
+        availability = dict(sections['availability'])
+        exceptions = dict(sections['availability_exceptions'])
+        compiled = {}
+        for coach_id in sections['coaches']:
+            rules = availability.setdefault(coach_id, default_weekly_availability())
+            dates = exceptions.setdefault(coach_id, default_exceptions())
+            compiled[coach_id] = self._compiled.get(coach_id)
+            if compiled[coach_id] is None or compiled[coach_id].fingerprint != availability_fingerprint(rules, dates):
+                compiled[coach_id] = compile_availability(rules, dates)
+
+        self._sections = dict(sections, availability=availability, availability_exceptions=exceptions)
+        self._compiled = compiled
+
+    def snapshot(self):
+        """Get the current ({section: data}, {coach_id: CompiledAvailability})"""
+        with self._lock:
+            data_version = self._store.data_version()
+            if data_version != self._data_version:
+                # Another process committed a change; settings are small, so re-read them all
+                self._data_version = data_version
+                self._apply(dict(default_shared_settings(), **self._store.load_settings()))
+            return dict(self._sections), self._compiled
+
+    def save(self, sections):
+        """Save changed sections ({section: data}) for every session"""
+        with self._lock:
+            self._store.save_settings(sections)
+            self._apply(dict(self._sections, **sections))
+
+_settings_store = None
+_settings_store_lock = threading.Lock()
+
+def get_settings_store():
+    """Get the process-wide settings store, loading it on first use"""
+    global _settings_store
+    if _settings_store is None:
+        with _settings_store_lock:
+            if _settings_store is None:
+                _settings_store = SettingsStore(get_booking_store())
+    return _settings_store
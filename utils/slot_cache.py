@@ -0,0 +1,59 @@
+from utils.booking_store import get_booking_store
+from utils.calendar_utils import get_available_slots, get_available_slots_any_coach
+from utils.lru_cache import LRUCache
+from utils.metrics import timed
+
+# Open slots shared by every session, keyed on date, each coach's
+# availability fingerprint, booking data versions and slot options
+_slot_cache = LRUCache(maxsize=1024)
+
+@timed()
+def get_open_slots(selected_date, availabilities, max_slots_per_time=3, duration_minutes=None,
+                   granularity_minutes=None, store=None):
+    """
+    Get open slots on a date for one or more coaches, each tagged with its coach_id
+    ``availabilities`` maps coach_id to CompiledAvailability. A booking or
+    cancellation through this store bumps its version, one committed by
+    another connection or process changes SQLite's data version, and an
+    availability edit changes the fingerprint, so stale entries are never
+    served; they age out of the LRU. The returned list is shared, so treat
+    it as read-only.
+    """
+    store = store or get_booking_store()
+
+    # Read the versions before the bookings, so a booking that lands
+    # mid-query files this result under a key that is already out of date
+    version = (store.version, store.data_version())
+    cache_key = (
+        selected_date,
+        tuple((coach_id, rules.fingerprint) for coach_id, rules in availabilities.items()),
+        version,
+        max_slots_per_time,
+        duration_minutes,
+        granularity_minutes
+    )
+    options = {
+        'max_slots_per_time': max_slots_per_time,
+        'duration_minutes': duration_minutes,
+        'granularity_minutes': granularity_minutes
+    }
+
+    def build():
+        if len(availabilities) == 1:
+            (coach_id, rules), = availabilities.items()
+            slots = get_available_slots(selected_date, rules, store.lessons_for_date(selected_date, coach_id), **options)
+            return [dict(slot, coach_id=coach_id) for slot in slots]
+
+        # One query for the date, partitioned per coach
+        lessons_by_coach = store.lessons_for_date_by_coach(selected_date)
+        partitions = {
+            coach_id: (rules, lessons_by_coach.get(coach_id, []))
+            for coach_id, rules in availabilities.items()
+        }
+        return get_available_slots_any_coach(selected_date, partitions, **options)
+
+    return _slot_cache.get_or_create(cache_key, build)
+
+def slot_cache_stats():
+    """Get hit/miss counts and size of the open slot cache"""
+    return _slot_cache.stats()